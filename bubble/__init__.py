@@ -5,6 +5,9 @@ from bubble.main import (
     AsyncWeb3,
     Web3,
 )
+from bubble.providers.async_ipc import (  # noqa: E402
+    AsyncIPCProvider,
+)
 from bubble.providers.async_rpc import (  # noqa: E402
     AsyncHTTPProvider,
 )
@@ -14,6 +17,9 @@ from bubble.providers.bub_tester import (  # noqa: E402
 from bubble.providers.ipc import (  # noqa: E402
     IPCProvider,
 )
+from bubble.providers.pool import (  # noqa: E402
+    PooledProvider,
+)
 from bubble.providers.rpc import (  # noqa: E402
     HTTPProvider,
 )
@@ -30,7 +36,9 @@ __all__ = [
     "HTTPProvider",
     "IPCProvider",
     "WebsocketProvider",
+    "PooledProvider",
     "BubbleTesterProvider",
     "Account",
     "AsyncHTTPProvider",
+    "AsyncIPCProvider",
 ]
@@ -0,0 +1,404 @@
+import asyncio
+import logging
+from types import (
+    TracebackType,
+)
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Coroutine,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+
+from bubble._utils.batching import (
+    BATCH_IDLE_TIMEOUT,
+    DEFAULT_MAX_BATCH_SIZE,
+    BatchRequestInformation,
+    _active_collector,
+)
+from bubble.exceptions import (
+    ProviderConnectionError,
+    Web3ValidationError,
+)
+from bubble.types import (
+    RPCEndpoint,
+    RPCResponse,
+)
+
+if TYPE_CHECKING:
+    from bubble import AsyncWeb3  # noqa: F401
+    from bubble.providers import AsyncBaseProvider  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_WINDOW = 0.002
+
+_PendingRequest = Tuple[RPCEndpoint, Any, "asyncio.Future[RPCResponse]"]
+
+
+def _set_batch_results(
+    pending: Sequence[_PendingRequest],
+    responses: Optional[Sequence[RPCResponse]] = None,
+    exc: Optional[BaseException] = None,
+) -> None:
+    for index, (_method, _params, future) in enumerate(pending):
+        # the caller may have been cancelled while the batch was in flight
+        if future.done():
+            continue
+        if exc is not None:
+            future.set_exception(exc)
+        else:
+            future.set_result(responses[index])
+
+
+def async_route_to_batch(
+    provider: "AsyncBaseProvider",
+    make_request: Callable[[RPCEndpoint, Any], Coroutine[Any, Any, RPCResponse]],
+) -> Callable[[RPCEndpoint, Any], Coroutine[Any, Any, RPCResponse]]:
+    """
+    The bottom of the async middleware onion of ``provider``, see
+    ``route_to_batch``.
+    """
+
+    async def request_fn(method: RPCEndpoint, params: Any) -> RPCResponse:
+        collector = _active_collector.get()
+        if collector is None or collector.provider is not provider:
+            return await make_request(method, params)
+        return await collector.make_request(method, params)
+
+    return request_fn
+
+
+class AsyncRequestCoalescer:
+    """
+    Coalesces requests issued concurrently on the same event loop into JSON-RPC
+    batch arrays.
+
+    A request waits at most ``batch_window`` seconds for others to join it, and a
+    batch is sent straight away once it holds ``max_batch_size`` requests. The
+    responses are fanned back out to the awaiting callers, so everything above the
+    provider (middlewares and method formatters) is unaffected.
+    """
+
+    def __init__(
+        self,
+        make_request: Callable[[RPCEndpoint, Any], Coroutine[Any, Any, RPCResponse]],
+        make_batch_request: Callable[
+            [Sequence[Tuple[RPCEndpoint, Any]]],
+            Coroutine[Any, Any, List[RPCResponse]],
+        ],
+        batch_window: float = DEFAULT_BATCH_WINDOW,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    ) -> None:
+        if batch_window < 0:
+            raise Web3ValidationError("batch_window may not be negative")
+        if max_batch_size < 1:
+            raise Web3ValidationError("max_batch_size must be a positive integer")
+
+        self._make_request = make_request
+        self._make_batch_request = make_batch_request
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: List[_PendingRequest] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # strong references to in-flight batches, so they are not garbage collected
+        self._in_flight: Set["asyncio.Task[None]"] = set()
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._abandon_loop()
+            self._loop = loop
+
+        future: "asyncio.Future[RPCResponse]" = loop.create_future()
+        self._pending.append((method, params, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self.flush)
+
+        return await future
+
+    def _abandon_loop(self) -> None:
+        # the provider moved to another event loop, the requests queued on the
+        # previous one fail there rather than waiting forever for their batch
+        pending, self._pending = self._pending, []
+        flush_handle, self._flush_handle = self._flush_handle, None
+        if self._loop is None or self._loop.is_closed():
+            return
+
+        def abandon() -> None:
+            if flush_handle is not None:
+                flush_handle.cancel()
+            _set_batch_results(
+                pending,
+                exc=ProviderConnectionError(
+                    "The provider was used from another event loop before the "
+                    "request was sent"
+                ),
+            )
+
+        self._loop.call_soon_threadsafe(abandon)
+
+    def flush(self) -> None:
+        """
+        Send whatever is queued now, without waiting for the batch window.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        task = asyncio.ensure_future(self._send(pending))
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    async def _send(self, pending: List[_PendingRequest]) -> None:
+        try:
+            if len(pending) == 1:
+                method, params, _future = pending[0]
+                responses = [await self._make_request(method, params)]
+            else:
+                logger.debug(f"Sending coalesced batch. Size: {len(pending)}")
+                responses = await self._make_batch_request(
+                    [(method, params) for method, params, _future in pending]
+                )
+        except Exception as exc:
+            _set_batch_results(pending, exc=exc)
+        else:
+            _set_batch_results(pending, responses=responses)
+
+
+class AsyncBatchCollector:
+    """
+    Stands in for ``provider.make_request`` at the bottom of the middleware onion
+    while an ``AsyncRequestBatcher`` is executed. See ``BatchCollector``.
+    """
+
+    def __init__(
+        self,
+        provider: "AsyncBaseProvider",
+        size: int,
+        idle_timeout: float = BATCH_IDLE_TIMEOUT,
+    ) -> None:
+        self.provider = provider
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self._pending: List[_PendingRequest] = []
+        self._sent = 0
+        self._finished_early = 0
+        self._closed = False
+        self._arrived: Set["asyncio.Task[Any]"] = set()
+        self._progress = asyncio.Event()
+
+    async def run(
+        self,
+        request_func: Callable[[RPCEndpoint, Any], Coroutine[Any, Any, RPCResponse]],
+        method: RPCEndpoint,
+        params: Any,
+    ) -> RPCResponse:
+        """
+        Send a request of the batch through the middlewares, in its own task
+        """
+        task = asyncio.current_task()
+        token = _active_collector.set(self)
+        try:
+            return await request_func(method, params)
+        finally:
+            _active_collector.reset(token)
+            if task not in self._arrived:
+                # answered by a middleware, or failed on the way
+                self._finished_early += 1
+                self._progress.set()
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        task = asyncio.current_task()
+        if task in self._arrived or self._closed:
+            # a middleware retried after the request was answered
+            return await self.provider.make_request(method, params)
+
+        self._arrived.add(task)
+        future: "asyncio.Future[RPCResponse]" = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._pending.append((method, params, future))
+        self._progress.set()
+        return await future
+
+    def _is_complete(self) -> bool:
+        return self._sent + len(self._pending) + self._finished_early >= self.size
+
+    async def dispatch(self) -> None:
+        while True:
+            while not self._is_complete():
+                self._progress.clear()
+                try:
+                    await asyncio.wait_for(self._progress.wait(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    if self._pending:
+                        # the requests still missing are held back by a middleware
+                        break
+            pending, self._pending = self._pending, []
+            self._sent += len(pending)
+            done = self._sent + self._finished_early >= self.size
+            self._closed = done
+
+            if pending:
+                await self._send(pending)
+            if done:
+                return
+
+    async def _send(self, pending: List[_PendingRequest]) -> None:
+        try:
+            responses = await self.provider.make_batch_request(
+                [(method, params) for method, params, _future in pending]
+            )
+        except Exception as exc:
+            _set_batch_results(pending, exc=exc)
+        else:
+            _set_batch_results(pending, responses=responses)
+
+
+class AsyncRequestBatcher:
+    """
+    Collects async module method calls and sends them as JSON-RPC batches.
+
+    .. code-block:: python
+
+        async with async_w3.batch_requests() as batch:
+            batch.add(async_w3.bub.get_block, 1)
+            batch.add(async_w3.bub.get_block, 2)
+            block_1, block_2 = await batch.execute()
+    """
+
+    def __init__(
+        self, async_w3: "AsyncWeb3", max_batch_size: int = DEFAULT_MAX_BATCH_SIZE
+    ) -> None:
+        if max_batch_size < 1:
+            raise Web3ValidationError("max_batch_size must be a positive integer")
+
+        self.async_w3 = async_w3
+        self.max_batch_size = max_batch_size
+        self._requests: List[
+            Tuple[Callable[..., Any], Tuple[Any, ...], Dict[str, Any]]
+        ] = []
+
+    def __len__(self) -> int:
+        return len(self._requests)
+
+    async def __aenter__(self) -> "AsyncRequestBatcher":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Type[BaseException],
+        exc_value: BaseException,
+        traceback: TracebackType,
+    ) -> None:
+        self.clear()
+
+    def add(self, request: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        """
+        Add a request to the batch. ``request`` is an async module method such as
+        ``async_w3.bub.get_block``, called with ``args`` and ``kwargs``, or an
+        ``AsyncInnerContractFunction`` whose ``call`` should be batched.
+        """
+        self._requests.append((request, args, kwargs))
+
+    def add_many(
+        self, request: Callable[..., Any], args_list: Sequence[Sequence[Any]]
+    ) -> None:
+        for args in args_list:
+            self.add(request, *args)
+
+    def clear(self) -> None:
+        self._requests = []
+
+    async def _capture(
+        self, request: Callable[..., Any], args: Any, kwargs: Any
+    ) -> BatchRequestInformation:
+        from bubble.inner_contract import (
+            AsyncInnerContractFunction,
+        )
+
+        if isinstance(request, AsyncInnerContractFunction):
+            # blocks the arguments refer to are requested before batching begins
+            await request._resolve_pending_kwargs()
+            request = request.call
+
+        # a captured coroutine returns without suspending, so the batching flag
+        # is never observed by another task
+        batching = self.async_w3.manager._batching
+        batching.active = True
+        batching.captured = None
+        try:
+            request_information = await request(*args, **kwargs)
+        finally:
+            batching.active = False
+            batching.captured = None
+
+        if not isinstance(request_information, BatchRequestInformation):
+            raise Web3ValidationError(
+                f"{request!r} did not issue a JSON-RPC request and cannot be batched."
+            )
+        return request_information
+
+    async def execute(self, raise_on_error: bool = True) -> List[Any]:
+        """
+        Send the batch and return the formatted results in the order the requests
+        were added.
+
+        :param raise_on_error: when ``False``, a failed request does not fail the
+            whole batch; its exception is returned in its place instead.
+        """
+        queued, self._requests = self._requests, []
+        captured: List[Union[BatchRequestInformation, Exception]] = []
+        for request, args, kwargs in queued:
+            try:
+                captured.append(await self._capture(request, args, kwargs))
+            except Exception as exc:
+                if raise_on_error:
+                    raise
+                captured.append(exc)
+        requests = [
+            request
+            for request in captured
+            if isinstance(request, BatchRequestInformation)
+        ]
+
+        formatted: List[Union[Any, Exception]] = []
+        for start in range(0, len(requests), self.max_batch_size):
+            chunk = requests[start : start + self.max_batch_size]
+            response_tasks = await self.async_w3.manager._coro_make_batch_request(
+                [(request.method, request.params) for request in chunk]
+            )
+            for request, response_task in zip(chunk, response_tasks):
+                try:
+                    formatted.append(
+                        request.format_response(self.async_w3, response_task.result())
+                    )
+                except Exception as exc:
+                    if raise_on_error:
+                        raise
+                    formatted.append(exc)
+
+        # the requests which could not be captured keep their exception in place
+        results = iter(formatted)
+        return [
+            next(results) if isinstance(request, BatchRequestInformation) else request
+            for request in captured
+        ]
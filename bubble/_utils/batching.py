@@ -0,0 +1,380 @@
+from concurrent.futures import (
+    Future,
+)
+from contextlib import (
+    contextmanager,
+)
+from contextvars import (
+    ContextVar,
+)
+import threading
+from types import (
+    TracebackType,
+)
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
+
+from bubble.exceptions import (
+    Web3ValidationError,
+)
+from bubble.module import (
+    apply_result_formatters,
+)
+from bubble.types import (
+    RPCEndpoint,
+    RPCResponse,
+)
+
+if TYPE_CHECKING:
+    from bubble import (  # noqa: F401
+        AsyncWeb3,
+        Web3,
+    )
+    from bubble.providers import BaseProvider  # noqa: F401
+
+DEFAULT_MAX_BATCH_SIZE = 100
+
+# how long a batch waits on requests held back by a middleware, e.g. behind an
+# identical request or a concurrency limit, before it sends the requests it has
+BATCH_IDLE_TIMEOUT = 0.05
+
+# the collector of the batch the current request belongs to
+_active_collector: ContextVar[Optional[Any]] = ContextVar(
+    "active_collector", default=None
+)
+
+
+def in_batch_request() -> bool:
+    """
+    Whether the current request is travelling through the middlewares as part of a
+    batch. Middlewares which hold a request back until others finish let such
+    requests through, since the batch is only sent once they reach the provider.
+    """
+    return _active_collector.get() is not None
+
+
+@contextmanager
+def outside_batch() -> Iterator[None]:
+    """
+    Send the requests made in this block on their own, e.g. a request a middleware
+    makes for itself while handling a request of a batch, which would otherwise
+    take the place of that request in the batch.
+    """
+    token = _active_collector.set(None)
+    try:
+        yield
+    finally:
+        _active_collector.reset(token)
+
+
+def route_to_batch(
+    provider: "BaseProvider", make_request: Callable[[RPCEndpoint, Any], RPCResponse]
+) -> Callable[[RPCEndpoint, Any], RPCResponse]:
+    """
+    The bottom of the middleware onion of ``provider``: requests of a batch are
+    handed to the collector of their batch, the others to ``make_request``.
+    Batches thus go through the same middleware instances as single requests.
+    """
+
+    def request_fn(method: RPCEndpoint, params: Any) -> RPCResponse:
+        collector = _active_collector.get()
+        if collector is None or collector.provider is not provider:
+            return make_request(method, params)
+        return collector.make_request(method, params)
+
+    return request_fn
+
+
+class BatchRequestInformation:
+    """
+    A request captured while building a batch, together with the formatters that
+    must be applied to its response once the batch has been sent.
+    """
+
+    def __init__(
+        self,
+        method: RPCEndpoint,
+        params: Any,
+        response_formatters: Tuple[Any, Callable[..., Any], Any],
+    ) -> None:
+        self.method = method
+        self.params = params
+        (
+            self.result_formatters,
+            self.error_formatters,
+            self.null_result_formatters,
+        ) = response_formatters
+        self.post_formatters: List[Callable[..., Any]] = []
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.method}>"
+
+    def with_result_formatter(
+        self, formatter: Callable[..., Any]
+    ) -> "BatchRequestInformation":
+        """
+        Queue a formatter to run on the result after the method's own result
+        formatters, e.g. the inner-contract result formatting of a ``bub_call``.
+        """
+        self.post_formatters.append(formatter)
+        return self
+
+    def format_response(
+        self, w3: Union["AsyncWeb3", "Web3"], response: RPCResponse
+    ) -> Any:
+        result = w3.manager.formatted_response(
+            response,
+            self.params,
+            self.error_formatters,
+            self.null_result_formatters,
+        )
+        result = apply_result_formatters(self.result_formatters, result)
+        for formatter in self.post_formatters:
+            result = formatter(result)
+        return result
+
+
+def capture_batch_request(
+    w3: "Web3",
+    request: Callable[..., Any],
+    *args: Any,
+    **kwargs: Any,
+) -> BatchRequestInformation:
+    """
+    Call ``request`` with the request manager in batching mode, so that the
+    module method it reaches returns a ``BatchRequestInformation`` instead of
+    sending the request.
+    """
+    from bubble.inner_contract import (
+        InnerContractFunction,
+    )
+
+    if isinstance(request, InnerContractFunction):
+        request = request.call
+
+    batching = w3.manager._batching
+    batching.active = True
+    batching.captured = None
+    try:
+        request_information = request(*args, **kwargs)
+    finally:
+        batching.active = False
+        batching.captured = None
+
+    if not isinstance(request_information, BatchRequestInformation):
+        raise Web3ValidationError(
+            f"{request!r} did not issue a JSON-RPC request and cannot be batched."
+        )
+    return request_information
+
+
+class BatchCollector:
+    """
+    Stands in for ``provider.make_request`` at the bottom of the middleware onion,
+    see ``route_to_batch``.
+
+    Each batched request travels through the middlewares on its own worker thread
+    and parks here until every request of the batch has either arrived or been
+    answered by a middleware. The collected requests are then sent as a single
+    batch, and every worker resumes with its own response.
+
+    A middleware may hold a request back until another one is answered. When no
+    request arrives or finishes for ``idle_timeout`` seconds, the requests which
+    have arrived are sent, and the rest follow in another batch.
+    """
+
+    def __init__(
+        self,
+        provider: "BaseProvider",
+        size: int,
+        idle_timeout: float = BATCH_IDLE_TIMEOUT,
+    ) -> None:
+        self.provider = provider
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self._condition = threading.Condition()
+        self._pending: List[Tuple[RPCEndpoint, Any, "Future[RPCResponse]"]] = []
+        self._sent = 0
+        self._finished_early = 0
+        self._closed = False
+        self._worker = threading.local()
+
+    def run(
+        self,
+        request_func: Callable[[RPCEndpoint, Any], RPCResponse],
+        method: RPCEndpoint,
+        params: Any,
+    ) -> RPCResponse:
+        """
+        Send a request of the batch through the middlewares, on a worker thread
+        """
+        self._worker.arrived = False
+        token = _active_collector.set(self)
+        try:
+            return request_func(method, params)
+        finally:
+            _active_collector.reset(token)
+            if not self._worker.arrived:
+                # answered by a middleware, or failed on the way
+                with self._condition:
+                    self._finished_early += 1
+                    self._condition.notify_all()
+
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        future: Optional["Future[RPCResponse]"]
+        with self._condition:
+            if getattr(self._worker, "arrived", False) or self._closed:
+                # a middleware retried after the request was answered, e.g. on a
+                # connection error, so this request goes out on its own
+                future = None
+            else:
+                self._worker.arrived = True
+                future = Future()
+                self._pending.append((method, params, future))
+                self._condition.notify_all()
+
+        if future is None:
+            return self.provider.make_request(method, params)
+        return future.result()
+
+    def _is_complete(self) -> bool:
+        return self._sent + len(self._pending) + self._finished_early >= self.size
+
+    def dispatch(self) -> None:
+        while True:
+            with self._condition:
+                while not self._is_complete():
+                    progressed = self._condition.wait(self.idle_timeout)
+                    if not progressed and self._pending:
+                        # the requests still missing are held back by a middleware
+                        break
+                pending, self._pending = self._pending, []
+                self._sent += len(pending)
+                done = self._sent + self._finished_early >= self.size
+                self._closed = done
+
+            if pending:
+                self._send(pending)
+            if done:
+                return
+
+    def _send(
+        self, pending: List[Tuple[RPCEndpoint, Any, "Future[RPCResponse]"]]
+    ) -> None:
+        try:
+            responses = self.provider.make_batch_request(
+                [(method, params) for method, params, _future in pending]
+            )
+        except Exception as exc:
+            for _method, _params, future in pending:
+                future.set_exception(exc)
+        else:
+            for (_method, _params, future), response in zip(pending, responses):
+                future.set_result(response)
+
+
+class RequestBatcher:
+    """
+    Collects module method calls and sends them as JSON-RPC batches.
+
+    .. code-block:: python
+
+        with w3.batch_requests() as batch:
+            batch.add(w3.bub.get_block, 1)
+            batch.add(w3.bub.get_transaction_receipt, tx_hash)
+            batch.add(w3.dpos.staking.get_candidate_info(node_id))
+            block, receipt, candidate = batch.execute()
+    """
+
+    def __init__(
+        self, w3: "Web3", max_batch_size: int = DEFAULT_MAX_BATCH_SIZE
+    ) -> None:
+        if max_batch_size < 1:
+            raise Web3ValidationError("max_batch_size must be a positive integer")
+
+        self.w3 = w3
+        self.max_batch_size = max_batch_size
+        self._requests: List[BatchRequestInformation] = []
+
+    def __len__(self) -> int:
+        return len(self._requests)
+
+    def __enter__(self) -> "RequestBatcher":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Type[BaseException],
+        exc_value: BaseException,
+        traceback: TracebackType,
+    ) -> None:
+        self.clear()
+
+    def add(self, request: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        """
+        Add a request to the batch.
+
+        :param request: a module method such as ``w3.bub.get_block``, called with
+            ``args`` and ``kwargs``, or an ``InnerContractFunction`` whose ``call``
+            should be batched.
+        """
+        self._requests.append(
+            capture_batch_request(self.w3, request, *args, **kwargs)
+        )
+
+    def add_many(
+        self, request: Callable[..., Any], args_list: Sequence[Sequence[Any]]
+    ) -> None:
+        """
+        Add one request per item of ``args_list`` to the batch.
+        """
+        for args in args_list:
+            self.add(request, *args)
+
+    def clear(self) -> None:
+        self._requests = []
+
+    def execute(self, raise_on_error: bool = True) -> List[Any]:
+        """
+        Send the batch and return the formatted results in the order the requests
+        were added.
+
+        :param raise_on_error: when ``False``, a failed request does not fail the
+            whole batch; its exception is returned in its place instead.
+        """
+        requests, self._requests = self._requests, []
+        results: List[Any] = []
+        for start in range(0, len(requests), self.max_batch_size):
+            chunk = requests[start : start + self.max_batch_size]
+            response_futures = self.w3.manager._make_batch_request(
+                [(request.method, request.params) for request in chunk]
+            )
+            for request, response_future in zip(chunk, response_futures):
+                results.append(
+                    self._format_result(request, response_future, raise_on_error)
+                )
+        return results
+
+    def _format_result(
+        self,
+        request: BatchRequestInformation,
+        response_future: "Future[RPCResponse]",
+        raise_on_error: bool,
+    ) -> Union[Any, Exception]:
+        try:
+            return request.format_response(self.w3, response_future.result())
+        except Exception as exc:
+            if raise_on_error:
+                raise
+            return exc
+
@@ -1,36 +1,287 @@
 import collections
 import hashlib
+import json
+import struct
 from typing import (
     Any,
+    Callable,
+    Dict,
+    List,
+    Tuple,
 )
+import zlib
 
-from eth_utils import (
-    is_boolean,
-    is_bytes,
-    is_dict,
-    is_list_like,
-    is_null,
-    is_number,
-    is_text,
-    to_bytes,
+from hexbytes import (
+    HexBytes,
+)
+
+from bubble.datastructures import (
+    AttributeDict,
+    MutableAttributeDict,
+)
+
+
+def _canonical_default(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray)):
+        # tagged, so that bytes and the hex string of the same bytes differ
+        return ["\x00bytes", value.hex()]
+    elif isinstance(value, collections.abc.Mapping):
+        return dict(value)
+    elif isinstance(value, collections.abc.Generator):
+        return list(value)
+    raise TypeError(
+        f"Cannot generate cache key for value {value} of type {type(value)}"
+    )
+
+
+# sorted keys and no whitespace make equal values serialize to equal bytes
+_canonical_encoder = json.JSONEncoder(
+    sort_keys=True,
+    separators=(",", ":"),
+    check_circular=False,
+    default=_canonical_default,
 )
 
 
 def generate_cache_key(value: Any) -> str:
     """
     Generates a cache key for the *args and **kwargs
+
+    The value is serialized once into canonical JSON, in which lists and tuples
+    are alike and dicts are sorted by key, and hashed with blake2b.
     """
-    if is_bytes(value):
-        return hashlib.md5(value).hexdigest()
-    elif is_text(value):
-        return generate_cache_key(to_bytes(text=value))
-    elif is_boolean(value) or is_null(value) or is_number(value):
-        return generate_cache_key(repr(value))
-    elif is_dict(value):
-        return generate_cache_key(((key, value[key]) for key in sorted(value.keys())))
-    elif is_list_like(value) or isinstance(value, collections.abc.Generator):
-        return generate_cache_key("".join((generate_cache_key(item) for item in value)))
+    return hashlib.blake2b(
+        _canonical_encoder.encode(value).encode("utf-8"), digest_size=16
+    ).hexdigest()
+
+
+# Tags of the binary encoding of cached values. Hex strings, which make up most
+# of a raw JSON-RPC response, are stored as the bytes or the integer they encode.
+_NONE = 0
+_FALSE = 1
+_TRUE = 2
+_INT = 3
+_STR = 4
+_BYTES = 5
+_HEXBYTES = 6
+_HEX_DATA = 7
+_HEX_QUANTITY = 8
+_LIST = 9
+_TUPLE = 10
+_DICT = 11
+_ATTRIBUTE_DICT = 12
+_FLOAT = 13
+_MUTABLE_ATTRIBUTE_DICT = 14
+
+_UNCOMPRESSED = b"\x00"
+_COMPRESSED = b"\x01"
+# values shorter than this are not worth compressing
+_COMPRESS_MIN_SIZE = 256
+
+
+def _encode_uint(value: int, out: bytearray) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _decode_uint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _encode_str(value: str, out: bytearray) -> None:
+    if value.startswith("0x"):
+        if len(value) % 2 == 0:
+            try:
+                data = bytes.fromhex(value[2:])
+            except ValueError:
+                pass
+            else:
+                if value[2:] == data.hex():
+                    out.append(_HEX_DATA)
+                    _encode_uint(len(data), out)
+                    out += data
+                    return
+        else:
+            try:
+                number = int(value, 16)
+            except ValueError:
+                pass
+            else:
+                if value == hex(number):
+                    out.append(_HEX_QUANTITY)
+                    _encode_uint(number, out)
+                    return
+    data = value.encode("utf-8")
+    out.append(_STR)
+    _encode_uint(len(data), out)
+    out += data
+
+
+def _encode(value: Any, out: bytearray) -> None:
+    if value is None:
+        out.append(_NONE)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif isinstance(value, int):
+        out.append(_INT)
+        # zigzag, so that small negative numbers stay short
+        _encode_uint(value * 2 if value >= 0 else -value * 2 - 1, out)
+    elif isinstance(value, str):
+        _encode_str(value, out)
+    elif isinstance(value, (bytes, bytearray)):
+        out.append(_HEXBYTES if isinstance(value, HexBytes) else _BYTES)
+        _encode_uint(len(value), out)
+        out += value
+    elif isinstance(value, (list, tuple)):
+        out.append(_TUPLE if isinstance(value, tuple) else _LIST)
+        _encode_uint(len(value), out)
+        for item in value:
+            _encode(item, out)
+    elif isinstance(value, collections.abc.Mapping):
+        if isinstance(value, AttributeDict):
+            out.append(_ATTRIBUTE_DICT)
+        elif isinstance(value, MutableAttributeDict):
+            out.append(_MUTABLE_ATTRIBUTE_DICT)
+        else:
+            out.append(_DICT)
+        _encode_uint(len(value), out)
+        for key, item in value.items():
+            _encode(key, out)
+            _encode(item, out)
+    elif isinstance(value, float):
+        out.append(_FLOAT)
+        out += struct.pack(">d", value)
     else:
-        raise TypeError(
-            f"Cannot generate cache key for value {value} of type {type(value)}"
-        )
+        raise TypeError(f"Cannot encode value {value!r} of type {type(value)}")
+
+
+def _decode_sized(data: bytes, pos: int) -> Tuple[bytes, int]:
+    length, pos = _decode_uint(data, pos)
+    return data[pos : pos + length], pos + length
+
+
+def _decode_items(data: bytes, pos: int) -> Tuple[List[Any], int]:
+    length, pos = _decode_uint(data, pos)
+    items = []
+    for _ in range(length):
+        item, pos = _decode(data, pos)
+        items.append(item)
+    return items, pos
+
+
+def _decode_pairs(data: bytes, pos: int) -> Tuple[Dict[Any, Any], int]:
+    length, pos = _decode_uint(data, pos)
+    pairs = {}
+    for _ in range(length):
+        key, pos = _decode(data, pos)
+        pairs[key], pos = _decode(data, pos)
+    return pairs, pos
+
+
+def _decode_int(data: bytes, pos: int) -> Tuple[int, int]:
+    value, pos = _decode_uint(data, pos)
+    return (value >> 1 if not value & 1 else -(value >> 1) - 1), pos
+
+
+def _decode_str(data: bytes, pos: int) -> Tuple[str, int]:
+    raw, pos = _decode_sized(data, pos)
+    return raw.decode("utf-8"), pos
+
+
+def _decode_hexbytes(data: bytes, pos: int) -> Tuple[HexBytes, int]:
+    raw, pos = _decode_sized(data, pos)
+    return HexBytes(raw), pos
+
+
+def _decode_hex_data(data: bytes, pos: int) -> Tuple[str, int]:
+    raw, pos = _decode_sized(data, pos)
+    return "0x" + raw.hex(), pos
+
+
+def _decode_hex_quantity(data: bytes, pos: int) -> Tuple[str, int]:
+    number, pos = _decode_uint(data, pos)
+    return hex(number), pos
+
+
+def _decode_tuple(data: bytes, pos: int) -> Tuple[Tuple[Any, ...], int]:
+    items, pos = _decode_items(data, pos)
+    return tuple(items), pos
+
+
+def _decode_attribute_dict(
+    data: bytes, pos: int
+) -> Tuple[AttributeDict[Any, Any], int]:
+    pairs, pos = _decode_pairs(data, pos)
+    return AttributeDict(pairs), pos
+
+
+def _decode_mutable_attribute_dict(
+    data: bytes, pos: int
+) -> Tuple[MutableAttributeDict[Any, Any], int]:
+    pairs, pos = _decode_pairs(data, pos)
+    return MutableAttributeDict(pairs), pos
+
+
+def _decode_float(data: bytes, pos: int) -> Tuple[float, int]:
+    return struct.unpack_from(">d", data, pos)[0], pos + 8
+
+
+_CONSTANTS = {_NONE: None, _FALSE: False, _TRUE: True}
+
+_DECODERS: Dict[int, Callable[[bytes, int], Tuple[Any, int]]] = {
+    _INT: _decode_int,
+    _STR: _decode_str,
+    _BYTES: _decode_sized,
+    _HEXBYTES: _decode_hexbytes,
+    _HEX_DATA: _decode_hex_data,
+    _HEX_QUANTITY: _decode_hex_quantity,
+    _LIST: _decode_items,
+    _TUPLE: _decode_tuple,
+    _DICT: _decode_pairs,
+    _ATTRIBUTE_DICT: _decode_attribute_dict,
+    _FLOAT: _decode_float,
+    _MUTABLE_ATTRIBUTE_DICT: _decode_mutable_attribute_dict,
+}
+
+
+def _decode(data: bytes, pos: int) -> Tuple[Any, int]:
+    tag = data[pos]
+    if tag in _CONSTANTS:
+        return _CONSTANTS[tag], pos + 1
+    return _DECODERS[tag](data, pos + 1)
+
+
+def encode_cache_value(value: Any) -> bytes:
+    """
+    Encodes a JSON-RPC response, raw or formatted, into compact bytes. Besides
+    the JSON types it keeps ``bytes``, ``HexBytes``, tuples, ``AttributeDict`` and
+    ``MutableAttributeDict``. Other mappings are decoded as dicts.
+    """
+    out = bytearray()
+    _encode(value, out)
+    if len(out) >= _COMPRESS_MIN_SIZE:
+        compressed = zlib.compress(out, 6)
+        if len(compressed) < len(out):
+            return _COMPRESSED + compressed
+    return _UNCOMPRESSED + bytes(out)
+
+
+def decode_cache_value(data: bytes) -> Any:
+    """
+    Decodes a value encoded with ``encode_cache_value``.
+    """
+    payload = zlib.decompress(data[1:]) if data[:1] == _COMPRESSED else data[1:]
+    value, _ = _decode(payload, 0)
+    return value
@@ -6,6 +6,7 @@ from typing import (
     Callable,
     Dict,
     Iterable,
+    List,
     Optional,
     Sequence,
     Type,
@@ -240,6 +241,77 @@ class FriendlyJsonSerde:
             raise TypeError(f"Could not encode to JSON: {exc}")
 
 
+_JSON_STRUCTURAL_BYTES = re.compile(rb'["\\{}\[\]]')
+_QUOTE, _BACKSLASH = ord('"'), ord("\\")
+_OPENING_BYTES = (ord("{"), ord("["))
+
+
+class JSONStreamSplitter:
+    """
+    Incrementally splits a stream of concatenated JSON objects or arrays, such as
+    the responses read from an IPC socket, into one ``bytes`` value per message.
+
+    Only the newly fed bytes are scanned, and only the bytes that affect nesting
+    (quotes, backslashes and brackets) are visited, so framing a large message that
+    arrives in many chunks stays linear in its size.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._scan_position = 0
+        self._message_start = 0
+        self._depth = 0
+        self._in_string = False
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def feed(self, data: bytes) -> List[bytes]:
+        buffer = self._buffer
+        buffer.extend(data)
+        messages = []
+
+        position = self._scan_position
+        while True:
+            match = _JSON_STRUCTURAL_BYTES.search(buffer, position)
+            if match is None:
+                position = len(buffer)
+                break
+
+            index = match.start()
+            byte = buffer[index]
+            if self._in_string:
+                if byte == _BACKSLASH:
+                    if index + 1 >= len(buffer):
+                        # the escaped byte has not arrived yet
+                        position = index
+                        break
+                    position = index + 2
+                    continue
+                if byte == _QUOTE:
+                    self._in_string = False
+            elif byte == _QUOTE:
+                self._in_string = True
+            elif byte in _OPENING_BYTES:
+                if self._depth == 0:
+                    self._message_start = index
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    messages.append(bytes(buffer[self._message_start : index + 1]))
+            position = index + 1
+
+        # drop everything that has been framed, keeping a partial message
+        consumed = position if self._depth == 0 else self._message_start
+        if consumed:
+            del buffer[:consumed]
+            position -= consumed
+            self._message_start = 0
+        self._scan_position = position
+        return messages
+
+
 def to_4byte_hex(hex_or_str_or_bytes: Union[HexStr, str, bytes, int]) -> HexStr:
     size_of_4bytes = 4 * 8
     byte_str = hexstr_if_str(to_bytes, hex_or_str_or_bytes)
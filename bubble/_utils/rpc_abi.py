@@ -93,8 +93,10 @@ class RPC:
     bub_sign = RPCEndpoint("bub_sign")
     bub_signTransaction = RPCEndpoint("bub_signTransaction")
     bub_signTypedData = RPCEndpoint("bub_signTypedData")
+    bub_subscribe = RPCEndpoint("bub_subscribe")
     bub_syncing = RPCEndpoint("bub_syncing")
     bub_uninstallFilter = RPCEndpoint("bub_uninstallFilter")
+    bub_unsubscribe = RPCEndpoint("bub_unsubscribe")
 
     # evm
     # evm_mine = RPCEndpoint("evm_mine")
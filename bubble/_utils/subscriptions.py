@@ -0,0 +1,149 @@
+from concurrent.futures import (
+    TimeoutError,
+)
+from types import (
+    TracebackType,
+)
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    Optional,
+    Type,
+)
+
+from eth_typing import (
+    HexStr,
+)
+from eth_utils.toolz import (
+    compose,
+)
+
+from bubble._utils.method_formatters import (
+    block_formatter,
+    log_entry_formatter,
+    to_hexbytes,
+)
+from bubble.datastructures import (
+    AttributeDict,
+)
+from bubble.exceptions import (
+    SubscriptionClosed,
+)
+from bubble.types import (
+    SubscriptionType,
+)
+
+if TYPE_CHECKING:
+    from bubble.bub import Bub  # noqa: F401
+    from bubble.providers.websocket import WebsocketProvider  # noqa: F401
+
+
+SUBSCRIPTION_RESULT_FORMATTERS: Dict[str, Callable[..., Any]] = {
+    "newHeads": compose(AttributeDict.recursive, block_formatter),
+    "logs": compose(AttributeDict.recursive, log_entry_formatter),
+    "pendingTransactions": to_hexbytes(32),
+}
+
+
+class Subscription:
+    """
+    The notifications of a ``bub_subscribe`` subscription, formatted like the
+    results of the matching polling methods: block headers for ``newHeads``, log
+    entries for ``logs`` and transaction hashes for ``pendingTransactions``.
+
+    Iterate over it with ``for`` or ``async for``. Each step waits for the next
+    notification pushed by the node. The iteration stops once the subscription is
+    cancelled, even from another thread, and raises the error if the connection is
+    lost.
+    """
+
+    def __init__(
+        self,
+        subscription_id: HexStr,
+        subscription_type: SubscriptionType,
+        bub_module: "Bub",
+    ) -> None:
+        self.subscription_id = subscription_id
+        self.subscription_type = subscription_type
+        self.bub_module = bub_module
+        self.format_entry = SUBSCRIPTION_RESULT_FORMATTERS.get(
+            subscription_type, AttributeDict.recursive
+        )
+        self.active = True
+
+    def __str__(self) -> str:
+        return f"Subscription for {self.subscription_type} {self.subscription_id}"
+
+    @property
+    def provider(self) -> "WebsocketProvider":
+        return self.bub_module.w3.provider
+
+    def get_next_entry(self, timeout: Optional[float] = None) -> Any:
+        """
+        Block until the next notification arrives, raising ``TimeoutError`` if
+        none arrived within ``timeout`` seconds, or ``SubscriptionClosed`` if the
+        subscription was cancelled.
+        """
+        try:
+            message = self.provider.get_subscription_message(
+                self.subscription_id, timeout
+            )
+        except TimeoutError:
+            raise
+        except Exception:
+            # the subscription is gone, cancelled or lost with the connection
+            self.active = False
+            raise
+        return self.format_entry(message)
+
+    def __iter__(self) -> Iterator[Any]:
+        while self.active:
+            try:
+                yield self.get_next_entry()
+            except SubscriptionClosed:
+                return
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> Any:
+        if not self.active:
+            raise StopAsyncIteration
+        try:
+            message = await self.provider.coro_get_subscription_message(
+                self.subscription_id
+            )
+        except SubscriptionClosed:
+            self.active = False
+            raise StopAsyncIteration
+        except Exception:
+            self.active = False
+            raise
+        return self.format_entry(message)
+
+    def unsubscribe(self) -> bool:
+        """
+        Cancel the subscription on the node and drop any queued notifications.
+        """
+        if not self.active:
+            return False
+        self.active = False
+        # notifications stop once the node has answered, so the queue is
+        # dropped only afterwards
+        unsubscribed = self.bub_module.unsubscribe(self.subscription_id)
+        self.provider.remove_subscription(self.subscription_id)
+        return unsubscribed
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Type[BaseException],
+        exc_val: BaseException,
+        exc_tb: TracebackType,
+    ) -> None:
+        self.unsubscribe()
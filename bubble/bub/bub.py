@@ -39,6 +39,9 @@ from bubble._utils.filters import (
 from bubble._utils.rpc_abi import (
     RPC,
 )
+from bubble._utils.subscriptions import (
+    Subscription,
+)
 from bubble._utils.threads import (
     Timeout,
 )
@@ -56,6 +59,7 @@ from bubble.bub.base_bub import (
     BaseBub,
 )
 from bubble.exceptions import (
+    MethodUnavailable,
     OffchainLookup,
     TimeExhausted,
     TooManyRequests,
@@ -77,6 +81,7 @@ from bubble.types import (
     MerkleProof,
     Nonce,
     SignedTx,
+    SubscriptionType,
     SyncStatus,
     TxData,
     TxParams,
@@ -555,6 +560,40 @@ class Bub(BaseBub):
         mungers=[default_root_munger],
     )
 
+    # bub_subscribe, bub_unsubscribe
+
+    _subscribe: Method[Callable[..., HexStr]] = Method(
+        RPC.bub_subscribe,
+        mungers=[default_root_munger],
+    )
+
+    def subscribe(
+        self,
+        subscription_type: SubscriptionType,
+        filter_params: Optional[FilterParams] = None,
+    ) -> Subscription:
+        """
+        Subscribe to ``newHeads``, ``logs`` or ``pendingTransactions`` notifications
+        pushed by the node. Requires a provider with a persistent connection, such
+        as the ``WebsocketProvider``.
+        """
+        if not getattr(self.w3.provider, "supports_subscriptions", False):
+            raise MethodUnavailable(
+                f"{self.w3.provider} does not support bub_subscribe, "
+                "use a WebsocketProvider"
+            )
+
+        if filter_params is None:
+            subscription_id = self._subscribe(subscription_type)
+        else:
+            subscription_id = self._subscribe(subscription_type, filter_params)
+        return Subscription(subscription_id, subscription_type, bub_module=self)
+
+    unsubscribe: Method[Callable[[HexStr], bool]] = Method(
+        RPC.bub_unsubscribe,
+        mungers=[default_root_munger],
+    )
+
     @overload
     def contract(self, address: None = None, **kwargs: Any) -> Type[Contract]:
         ...
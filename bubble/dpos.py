@@ -6,6 +6,10 @@ from bubble.inner_contract import (
     Delegate,
     Slashing,
     Reward,
+    AsyncStaking,
+    AsyncDelegate,
+    AsyncSlashing,
+    AsyncReward,
 )
 
 
@@ -14,3 +18,12 @@ class DPos(Module):
     delegate: Delegate
     slashing: Slashing
     reward: Reward
+
+
+class AsyncDPos(Module):
+    is_async = True
+
+    staking: AsyncStaking
+    delegate: AsyncDelegate
+    slashing: AsyncSlashing
+    reward: AsyncReward
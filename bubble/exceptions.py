@@ -214,6 +214,14 @@ class TimeExhausted(Web3Exception):
     pass
 
 
+class BlockReorganized(Web3Exception):
+    """
+    Raised when a block which was already processed is no longer part of the chain.
+    """
+
+    pass
+
+
 class TransactionNotFound(Web3Exception):
     """
     Raised when a tx hash used to lookup a tx in a jsonrpc call cannot be found.
@@ -303,6 +311,14 @@ class TransactionTypeMismatch(InvalidTransaction):
         super().__init__(message)
 
 
+class SubscriptionClosed(Web3Exception):
+    """
+    Raised when waiting for the notifications of a subscription which was cancelled
+    """
+
+    pass
+
+
 class BadResponseFormat(Web3Exception):
     """
     Raised when a JSON-RPC response comes back in an unexpected format
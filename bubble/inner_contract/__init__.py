@@ -2,6 +2,8 @@ from bubble.inner_contract.inner_contract import (
     InnerContract,
     InnerContractFunction,
     InnerContractEvent,
+    bulk_query,
+    transact_many,
 )
 from bubble.inner_contract.restricting import Restricting
 from bubble.inner_contract.staking import Staking
@@ -13,4 +15,24 @@ from bubble.inner_contract.reward import Reward
 from bubble.inner_contract.proposal import Proposal
 from bubble.inner_contract.error_code import ERROR_CODE
 from bubble.inner_contract.bubbleL2 import BubbleL2
-from bubble.inner_contract.temp_prikey import TempPrivateKey
\ No newline at end of file
+from bubble.inner_contract.temp_prikey import TempPrivateKey
+from bubble.inner_contract.async_inner_contract import (
+    AsyncInnerContract,
+    AsyncInnerContractFunction,
+    AsyncRestricting,
+    AsyncStaking,
+    AsyncDelegate,
+    AsyncSlashing,
+    AsyncReward,
+    AsyncProposal,
+    AsyncStakingL2,
+    AsyncBubble,
+    AsyncBubbleL2,
+    AsyncTempPrivateKey,
+)
+from bubble.inner_contract.indexer import (
+    InnerContractEventIndexer,
+    InnerContractEventLog,
+    IndexerCheckpoint,
+    INNER_CONTRACT_ADDRESSES,
+)
@@ -0,0 +1,239 @@
+from typing import (
+    Optional,
+    Any,
+    Callable,
+    List,
+    Sequence,
+    Union,
+    TYPE_CHECKING,
+)
+
+from eth_utils.toolz import (
+    assoc,
+)
+from hexbytes import (
+    HexBytes,
+)
+
+from bubble._utils.async_transactions import (
+    fill_transaction_defaults as async_fill_transaction_defaults,
+)
+from bubble._utils.batching import (
+    DEFAULT_MAX_BATCH_SIZE,
+)
+from bubble.inner_contract.inner_contract import (
+    InnerContract,
+    InnerContractFunction,
+    BoundBulkQuery,
+    needs_gas_price,
+)
+from bubble.inner_contract.bubble import Bubble
+from bubble.inner_contract.bubbleL2 import BubbleL2
+from bubble.inner_contract.delegate import Delegate
+from bubble.inner_contract.proposal import Proposal
+from bubble.inner_contract.restricting import Restricting
+from bubble.inner_contract.reward import Reward
+from bubble.inner_contract.slashing import Slashing
+from bubble.inner_contract.staking import Staking
+from bubble.inner_contract.stakingL2 import StakingL2
+from bubble.inner_contract.temp_prikey import TempPrivateKey
+from bubble.types import (
+    TxParams,
+    BlockIdentifier,
+    CallOverrideParams,
+)
+
+if TYPE_CHECKING:
+    from bubble import AsyncWeb3
+
+
+class _PendingBlockField:
+    """
+    A field of the block an argument refers to, requested when the function is sent
+    """
+
+    def __init__(self, web3: "AsyncWeb3", block_identifier: BlockIdentifier, field: str):
+        self.web3 = web3
+        self.block_identifier = block_identifier
+        self.field = field
+
+    async def resolve(self) -> Any:
+        block = await self.web3.bub.get_block(self.block_identifier)
+        return block[self.field]
+
+
+class AsyncInnerContract(InnerContract):
+
+    def __init__(self, web3: "AsyncWeb3"):
+        self.web3: AsyncWeb3 = web3
+        self.function = AsyncInnerContractFunction(self.web3, self.ADDRESS)
+
+    def _block_number(self, block_identifier: BlockIdentifier) -> Union[int, _PendingBlockField]:
+        if isinstance(block_identifier, int) and not isinstance(block_identifier, bool):
+            return block_identifier
+        return _PendingBlockField(self.web3, block_identifier, 'number')
+
+    def _block_hash(self, block_identifier: BlockIdentifier) -> _PendingBlockField:
+        return _PendingBlockField(self.web3, block_identifier, 'hash')
+
+    def _bind_bulk_query(self, method: Callable[..., 'AsyncInnerContractFunction']) -> 'AsyncBoundBulkQuery':
+        return AsyncBoundBulkQuery(self, method)
+
+
+class AsyncBoundBulkQuery(BoundBulkQuery):
+
+    async def many(self,
+                   args_list: Sequence[Any],
+                   transaction: Optional[TxParams] = None,
+                   block_identifier: BlockIdentifier = 'latest',
+                   max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                   ) -> List[Union[Any, Exception]]:
+        """
+        Call the query for every item of ``args_list``, sending the calls as JSON-RPC batches
+        of up to ``max_batch_size`` requests.
+
+        An item is passed as the keyword arguments if it is a mapping, as the positional
+        arguments if it is a tuple, and as the only argument otherwise.
+        The results are returned in the order of ``args_list``,
+        with the exception of a failed item in its place.
+        """
+        results: List[Union[Any, Exception]] = [None] * len(args_list)
+        indexes: List[int] = []
+        async with self.contract.web3.batch_requests(max_batch_size) as batch:
+            for index, args in enumerate(args_list):
+                try:
+                    batch.add(self._function(args), transaction, block_identifier)
+                except Exception as exc:
+                    results[index] = exc
+                else:
+                    indexes.append(index)
+
+            for index, result in zip(indexes, await batch.execute(raise_on_error=False)):
+                results[index] = result
+
+        return results
+
+
+class AsyncInnerContractFunction(InnerContractFunction):
+
+    def __init__(self, web3: "AsyncWeb3", address):
+        super().__init__(web3, address)
+        self.web3: AsyncWeb3 = web3
+
+    async def call(self,
+                   transaction: Optional[TxParams] = None,
+                   block_identifier: BlockIdentifier = 'latest',
+                   state_override: Optional[CallOverrideParams] = None,
+                   ) -> Any:
+        await self._resolve_pending_kwargs()
+        call_transaction = self._prepare_call_transaction(transaction)
+
+        return_data = await self.web3.bub.call(call_transaction,
+                                               block_identifier=block_identifier,
+                                               state_override=state_override,
+                                               )
+
+        return self._format_return_data(return_data)
+
+    async def estimate_gas(self,
+                           transaction: Optional[TxParams] = None,
+                           block_identifier: Optional[BlockIdentifier] = None
+                           ) -> int:
+        await self._resolve_pending_kwargs()
+        estimate_transaction = self._prepare_transaction(transaction)
+
+        return await self.web3.bub.estimate_gas(estimate_transaction, block_identifier)
+
+    async def build_transaction(self, transaction: Optional[TxParams] = None) -> TxParams:
+        """
+        Build the transaction dictionary without sending
+        """
+        await self._resolve_pending_kwargs()
+        built_transaction = self._prepare_transaction(transaction)
+
+        return await async_fill_transaction_defaults(self.web3, built_transaction)
+
+    async def transact(self,
+                       transaction: Optional[TxParams] = None,
+                       private_key: Optional[Any] = None,
+                       ) -> HexBytes:
+        """
+        Send the transaction of the function, and return its hash.
+
+        Without ``private_key``, it is sent with ``bub_sendTransaction`` to be signed by the node,
+        or by a ``construct_sign_and_send_raw_middleware`` account.
+        With ``private_key``, it is signed locally and sent with ``bub_sendRawTransaction``.
+        """
+        await self._resolve_pending_kwargs()
+        if private_key is None:
+            transact_transaction = self._prepare_transact_transaction(transaction)
+            return await self.web3.bub.send_transaction(transact_transaction)
+
+        from bubble.middleware.signing import (
+            format_transaction,
+            get_raw_transaction,
+            to_account,
+        )
+
+        account = to_account(private_key)
+        transact_transaction = self._prepare_transact_transaction(transaction, account.address)
+        if needs_gas_price(transact_transaction):
+            transact_transaction = assoc(transact_transaction, 'gasPrice', await self.web3.bub.gas_price)
+        transact_transaction = await async_fill_transaction_defaults(self.web3, transact_transaction)
+        if 'nonce' not in transact_transaction:
+            nonce = await self.web3.bub.get_transaction_count(account.address, 'pending')
+            transact_transaction = assoc(transact_transaction, 'nonce', nonce)
+        raw_transaction = get_raw_transaction(account.sign_transaction(format_transaction(transact_transaction)))
+
+        return await self.web3.bub.send_raw_transaction(raw_transaction)
+
+    async def _resolve_pending_kwargs(self) -> None:
+        """
+        Request the blocks the arguments refer to, e.g. the staking block of a delegate
+        """
+        if not self.kwargs:
+            return
+
+        for key, value in self.kwargs.items():
+            if isinstance(value, _PendingBlockField):
+                self.kwargs[key] = await value.resolve()
+
+
+class AsyncRestricting(AsyncInnerContract, Restricting):
+    pass
+
+
+class AsyncStaking(AsyncInnerContract, Staking):
+    pass
+
+
+class AsyncDelegate(AsyncInnerContract, Delegate):
+    pass
+
+
+class AsyncSlashing(AsyncInnerContract, Slashing):
+    pass
+
+
+class AsyncReward(AsyncInnerContract, Reward):
+    pass
+
+
+class AsyncProposal(AsyncInnerContract, Proposal):
+    pass
+
+
+class AsyncStakingL2(AsyncInnerContract, StakingL2):
+    pass
+
+
+class AsyncBubble(AsyncInnerContract, Bubble):
+    pass
+
+
+class AsyncBubbleL2(AsyncInnerContract, BubbleL2):
+    pass
+
+
+class AsyncTempPrivateKey(AsyncInnerContract, TempPrivateKey):
+    pass
@@ -26,6 +26,7 @@ from bubble.types import (
 )
 from bubble.inner_contract import (
     InnerContract,
+    bulk_query,
 )
 
 
@@ -38,6 +39,7 @@ class Bubble(InnerContract):
         """
         return self.function(InnerFunction.bubble_selectBubble)
 
+    @bulk_query
     def get_bubble_info(self, bubble_id: int):
         """
         get bubble info.
@@ -120,6 +122,7 @@ class Bubble(InnerContract):
                              bubble_id=bubble_id,
                              settlement_info=settlement_data)
 
+    @bulk_query
     def get_origin_tx(self,
                       bubble_id: int,
                       tx_hash: Union[bytes, HexStr]):
@@ -132,6 +135,7 @@ class Bubble(InnerContract):
                              bubble_id=bubble_id,
                              tx_hash=tx_hash)
 
+    @bulk_query
     def get_tx_records(self,
                        bubble_id: int,
                        tx_type: int):
@@ -143,6 +147,7 @@ class Bubble(InnerContract):
                              bubble_id=bubble_id,
                              tx_type=tx_type)
 
+    @bulk_query
     def get_L1_hash_by_L2_hash(self, bubble_id: int, tx_hash: Union[bytes, HexStr]):
         """
         Obtain main chain Hash based on the sub chain Hash.
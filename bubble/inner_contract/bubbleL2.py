@@ -27,6 +27,7 @@ from bubble.types import (
 )
 from bubble.inner_contract import (
     InnerContract,
+    bulk_query,
 )
 
 
@@ -66,6 +67,7 @@ class BubbleL2(InnerContract):
     #     """
     #     return self.function(InnerFunction.bubbleL2_getL2HashByL1Hash, tx_hash=tx_hash)
 
+    @bulk_query
     def get_L2_hash_by_L1_hash(self, tx_hash: Union[bytes, HexStr]):
         """
         Obtain sub chain Hash based on the main chain Hash.
@@ -0,0 +1,294 @@
+from concurrent.futures import (
+    ProcessPoolExecutor,
+)
+import functools
+import multiprocessing
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
+
+import rlp
+from hexbytes import HexBytes
+
+from bubble.datastructures import MutableAttributeDict
+from bubble.inner_contract.error_code import ERROR_CODE
+from bubble.inner_contract.formatters import (
+    INNER_CONTRACT_EVENT_FORMATTERS,
+)
+from bubble.types import (
+    FunctionIdentifier,
+    RLPEventData,
+)
+
+# below this many payloads, decoding them in worker processes costs more than it saves
+_MIN_PARALLEL_PAYLOADS = 1000
+
+
+class _NonCanonical(Exception):
+    pass
+
+
+def _decode_length(data: bytes, start: int, length_size: int) -> int:
+    if data[start] == 0:
+        raise _NonCanonical
+    length = int.from_bytes(data[start:start + length_size], 'big')
+    if length < 56:
+        raise _NonCanonical
+    return length
+
+
+def _decode_item(data: bytes, start: int, end: int, string_type: type) -> Tuple[Any, int]:
+    prefix = data[start]
+    if prefix < 0x80:
+        begin = start
+        stop = start + 1
+    elif prefix < 0xb8:
+        begin = start + 1
+        stop = begin + prefix - 0x80
+        if stop == begin + 1 and data[begin] < 0x80:
+            raise _NonCanonical
+    elif prefix < 0xc0:
+        begin = start + 1 + prefix - 0xb7
+        stop = begin + _decode_length(data, start + 1, prefix - 0xb7)
+    elif prefix < 0xf8:
+        begin = start + 1
+        stop = begin + prefix - 0xc0
+    else:
+        begin = start + 1 + prefix - 0xf7
+        stop = begin + _decode_length(data, start + 1, prefix - 0xf7)
+
+    if stop > end:
+        raise _NonCanonical
+    if prefix < 0xc0:
+        if string_type is bytes:
+            return data[begin:stop], stop
+        return bytes.__new__(string_type, data[begin:stop]), stop
+
+    items = []
+    position = begin
+    while position < stop:
+        item, position = _decode_item(data, position, stop, string_type)
+        items.append(item)
+    return items, stop
+
+
+def decode_rlp(data: bytes) -> Any:
+    """
+    The same as ``rlp.decode(data)``, without the sedes.
+
+    The data is decoded in a single pass, and its strings have the type of ``data``, e.g.
+    ``HexBytes``. Anything it does not accept, such as a non-canonical encoding, is decoded
+    by ``rlp.decode``, to raise its error.
+    """
+    string_type = type(data)
+    if string_type is not bytes:
+        if not isinstance(data, bytes):
+            return rlp.decode(data)
+        data = bytes(data)
+
+    try:
+        item, stop = _decode_item(data, 0, len(data), string_type)
+        if stop == len(data):
+            return item
+    except (_NonCanonical, IndexError):
+        pass
+    return rlp.decode(data if string_type is bytes else string_type(data))
+
+
+_SCALAR_TYPES = frozenset((bytes, HexBytes, str, int, bool, type(None)))
+
+
+def _to_attribute_dicts(value: Any) -> Any:
+    """
+    The same as ``MutableAttributeDict.recursive(value)``, walking only the dicts and lists
+    """
+    value_type = type(value)
+    if value_type is dict:
+        return MutableAttributeDict({key: _to_attribute_dicts(item) for key, item in value.items()})
+    elif value_type is list:
+        return [_to_attribute_dicts(item) for item in value]
+    elif value_type in _SCALAR_TYPES:
+        return value
+    return MutableAttributeDict.recursive(value)
+
+
+class InnerEventDecoder:
+    """
+    Decodes the event data of the inner contract function ``fid``, the same as
+    ``InnerContractEvent(fid).process_receipt``.
+
+    The shape of the event, the names of its fields and their formatters are resolved once,
+    then each payload is decoded in a single pass and its fields are formatted directly.
+    """
+
+    def __init__(self, fid: Optional[FunctionIdentifier]):
+        self.fid = fid
+        self.formatter = INNER_CONTRACT_EVENT_FORMATTERS.get(fid)
+
+        self._is_array = False
+        self._keys: Tuple[str, ...] = ()
+        self._formatters: Tuple[Callable[[Any], Any], ...] = ()
+        self._item_formatter: Optional[Callable[..., Any]] = None
+        if not self.formatter:
+            return
+
+        if self.formatter.__name__ == 'apply_formatters_to_dict':
+            field_formatters = self.formatter.args[0]
+        elif self.formatter.__name__ == 'apply_formatter_to_array':
+            self._is_array = True
+            self._item_formatter = self.formatter.args[0]
+            field_formatters = self._item_formatter.args[0]
+        else:
+            raise ValueError(f'Unknown formatter: {self.formatter.__name__}')
+
+        self._keys = tuple(field_formatters.keys())
+        self._formatters = tuple(field_formatters.values())
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} {self.fid}>'
+
+    @staticmethod
+    def decode_data(data: bytes) -> List[Any]:
+        """
+        The code and the decoded arguments of the event
+        """
+        unshaped_data = decode_rlp(data)
+        decoded: List[Any] = [int(unshaped_data[0])]
+        for arg in unshaped_data[1:]:
+            decoded.append(decode_rlp(arg))
+        return decoded
+
+    def _format_fields(self, args: Sequence[Any]) -> Dict[str, Any]:
+        try:
+            return {key: formatter(value) for key, formatter, value in zip(self._keys, self._formatters, args)}
+        except (ValueError, TypeError):
+            # format it again with the formatter of the function, to raise its error
+            return self._item_formatter(dict(zip(self._keys, args))) if self._is_array \
+                else self.formatter(dict(zip(self._keys, args)))
+
+    def format_args(self, args: List[Any]) -> Any:
+        """
+        The arguments of the event, formatted as the fields of its formatter
+        """
+        if not self.formatter:
+            return args
+
+        if not self._is_array:
+            return self._format_fields(args)
+
+        actual_args = args[0]
+        if type(actual_args) is not list:
+            raise ValueError('event data is inconsistent with formatter')
+        return [self._format_fields(_args) for _args in actual_args]
+
+    def decode(self, data: bytes) -> RLPEventData:
+        decoded = self.decode_data(data)
+        code = decoded[0]
+        formatted_data = {
+            'code': code,
+            'message': ERROR_CODE.get(code, 'Unknown error code'),
+            'data': self.format_args(decoded[1:]),
+        }
+        return cast(RLPEventData, _to_attribute_dicts(formatted_data))
+
+    def decode_many(self,
+                    payloads: Sequence[bytes],
+                    max_workers: Optional[int] = None,
+                    ) -> List[Union[RLPEventData, Exception]]:
+        """
+        Decode many event payloads, in the same order, with the exception of a payload which
+        fails to decode in its place.
+
+        With ``max_workers`` above 1, large lists are decoded in that many processes.
+        """
+        workers = max_workers or 1
+        if workers == 1 or len(payloads) < _MIN_PARALLEL_PAYLOADS:
+            return _decode_payloads(self.fid, payloads)
+
+        chunk_size = -(-len(payloads) // workers)
+        chunks = [payloads[start:start + chunk_size] for start in range(0, len(payloads), chunk_size)]
+        # spawned, a forked worker would inherit the locks and sockets of the providers
+        with ProcessPoolExecutor(max_workers=len(chunks), mp_context=multiprocessing.get_context('spawn')) as executor:
+            decoded = [
+                event_data
+                for decoded_chunk in executor.map(_decode_payloads_or_none, [self.fid] * len(chunks), chunks)
+                for event_data in decoded_chunk
+            ]
+        # the exceptions are not all picklable, the failed payloads are decoded again here to get them
+        return [
+            _decode_payloads(self.fid, [data])[0] if event_data is None else event_data
+            for data, event_data in zip(payloads, decoded)
+        ]
+
+    def decode_columns(self, payloads: Sequence[bytes]) -> Dict[str, List[Any]]:
+        """
+        Decode many event payloads into columns: ``code``, ``message``, and a column for each
+        field of the event, or ``data`` for the events which are not formatted as a dict.
+        The values are left as plain dicts and lists.
+        """
+        codes = []
+        args_list = []
+        for data in payloads:
+            decoded = self.decode_data(data)
+            codes.append(decoded[0])
+            args_list.append(decoded[1:])
+
+        columns: Dict[str, List[Any]] = {
+            'code': codes,
+            'message': [ERROR_CODE.get(code, 'Unknown error code') for code in codes],
+        }
+        if not self.formatter or self._is_array:
+            columns['data'] = [self.format_args(args) for args in args_list]
+            return columns
+
+        for index, key in enumerate(self._keys):
+            formatter = self._formatters[index]
+            column = columns[key] = []
+            for args in args_list:
+                if index >= len(args):
+                    column.append(None)
+                    continue
+                try:
+                    column.append(formatter(args[index]))
+                except (ValueError, TypeError):
+                    self.formatter(dict(zip(self._keys, args)))
+                    raise
+        return columns
+
+
+@functools.lru_cache(maxsize=256)
+def get_event_decoder(fid: Optional[FunctionIdentifier]) -> InnerEventDecoder:
+    """
+    The event decoder of the inner contract function ``fid``, compiled on first use.
+    """
+    return InnerEventDecoder(fid)
+
+
+def _decode_payloads(fid: Optional[FunctionIdentifier],
+                     payloads: Sequence[bytes],
+                     ) -> List[Union[RLPEventData, Exception]]:
+    decoder = get_event_decoder(fid)
+    decoded: List[Union[RLPEventData, Exception]] = []
+    for data in payloads:
+        try:
+            decoded.append(decoder.decode(data))
+        except Exception as exc:
+            decoded.append(exc)
+    return decoded
+
+
+def _decode_payloads_or_none(fid: Optional[FunctionIdentifier],
+                             payloads: Sequence[bytes],
+                             ) -> List[Optional[RLPEventData]]:
+    return [
+        None if isinstance(event_data, Exception) else event_data
+        for event_data in _decode_payloads(fid, payloads)
+    ]
@@ -13,6 +13,7 @@ from eth_utils import remove_0x_prefix
 
 from bubble.inner_contract import (
     InnerContract,
+    bulk_query,
 )
 
 from bubble.types import Wei, BlockIdentifier, InnerFunction
@@ -52,9 +53,8 @@ class Delegate(InnerContract):
         :param staking_block_identifier: the identifier of the staking block when delegate
         :param amount: withdrew amount
         """
-        block = self.web3.bub.get_block(staking_block_identifier)
         return self.function(InnerFunction.delegate_withdrewDelegate,
-                             block_number=block['number'],
+                             block_number=self._block_number(staking_block_identifier),
                              node_id=node_id,
                              amount=amount,
                              )
@@ -65,12 +65,14 @@ class Delegate(InnerContract):
         """
         return self.function(InnerFunction.delegate_redeemDelegate)
 
+    @bulk_query
     def get_delegate_list(self, address: Address):
         """
         Get all delegate information of the address.
         """
         return self.function(InnerFunction.delegate_getDelegateList, address=address)
 
+    @bulk_query
     def get_delegate_info(self,
                           address: Address,
                           node_id: Union[NodeID, HexStr],
@@ -83,13 +85,13 @@ class Delegate(InnerContract):
         :param node_id: id of the node that has been delegated
         :param staking_block_identifier: the identifier of the staking block when delegate
         """
-        block = self.web3.bub.get_block(staking_block_identifier)
         return self.function(InnerFunction.delegate_getDelegateInfo,
-                             block_number=block['number'],
+                             block_number=self._block_number(staking_block_identifier),
                              address=address,
                              node_id=node_id,
                              )
 
+    @bulk_query
     def get_delegate_lock_info(self, address: Address):
         """
         Get locked delegate information of the address.
@@ -0,0 +1,113 @@
+import functools
+from typing import (
+    Any,
+    List,
+    Mapping,
+    Sequence,
+    Tuple,
+)
+
+import rlp
+
+from bubble.inner_contract.formatters import (
+    DEFAULT_PARAM_ABIS,
+    DEFAULT_PARAM_NORMALIZERS,
+    INNER_CONTRACT_PARAM_ABIS,
+)
+from bubble.types import (
+    FunctionIdentifier,
+)
+
+
+def _length_prefix(length: int, short_offset: int) -> bytes:
+    if length < 56:
+        return bytes((short_offset + length,))
+    length_bytes = length.to_bytes((length.bit_length() + 7) // 8, 'big')
+    return bytes((short_offset + 55 + len(length_bytes),)) + length_bytes
+
+
+def _encode_string(data: bytes) -> bytes:
+    if len(data) == 1 and data[0] < 0x80:
+        return data
+    return _length_prefix(len(data), 0x80) + data
+
+
+def _encode_value(value: Any) -> bytes:
+    """
+    The rlp encoding of an argument, the same as ``rlp.encode(value)``
+    """
+    if isinstance(value, bytes):
+        return _encode_string(value)
+    elif type(value) is int and value >= 0:
+        return _encode_string(value.to_bytes((value.bit_length() + 7) // 8, 'big'))
+    return rlp.encode(value)
+
+
+def _normalize(abi_types: Tuple[str, ...], value: Any) -> Any:
+    for abi_type in abi_types:
+        for normalizer in DEFAULT_PARAM_NORMALIZERS:
+            _, value = normalizer(abi_type, value)
+    return value
+
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_cached(abi_types: Tuple[str, ...], value: Any) -> Any:
+    return _normalize(abi_types, value)
+
+
+class InnerFunctionEncoder:
+    """
+    Encodes the data of the inner contract function ``fid`` called with the arguments
+    ``fields``, in that order.
+
+    The ABI types of each argument are looked up once, and the data is built in a single
+    pass, as the rlp list of the rlp encoded function id and arguments.
+    """
+
+    def __init__(self, fid: FunctionIdentifier, fields: Tuple[str, ...]):
+        self.fid = fid
+        self.fields = fields
+
+        function_abis = INNER_CONTRACT_PARAM_ABIS.get(fid) or {}
+        # the default ABIs are applied first, then the ABIs of the function
+        self._abi_types: List[Tuple[str, Tuple[str, ...]]] = [
+            (field, tuple(abis[field] for abis in (DEFAULT_PARAM_ABIS, function_abis) if field in abis))
+            for field in fields
+        ]
+
+        self._encoded_fid = _encode_string(rlp.encode(fid))
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} {self.fid} {self.fields}>'
+
+    def format(self, params: Mapping[str, Any]) -> List[Any]:
+        """
+        The normalized arguments, in the order of the fields
+        """
+        formatted = []
+        for field, abi_types in self._abi_types:
+            value = params[field]
+            if not abi_types:
+                formatted.append(value)
+            elif isinstance(value, (str, bytes)):
+                # the same addresses and node ids are normalized over and over
+                formatted.append(_normalize_cached(abi_types, value))
+            else:
+                formatted.append(_normalize(abi_types, value))
+        return formatted
+
+    def encode(self, params: Mapping[str, Any]) -> bytes:
+        items = [self._encoded_fid]
+        for value in self.format(params):
+            items.append(b'\x80' if value is None else _encode_string(_encode_value(value)))
+        payload = b''.join(items)
+        return _length_prefix(len(payload), 0xc0) + payload
+
+
+@functools.lru_cache(maxsize=1024)
+def get_function_encoder(fid: FunctionIdentifier, fields: Sequence[str]) -> InnerFunctionEncoder:
+    """
+    The encoder of the inner contract function ``fid`` called with the arguments ``fields``,
+    compiled on first use.
+    """
+    return InnerFunctionEncoder(fid, tuple(fields))
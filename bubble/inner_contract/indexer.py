@@ -0,0 +1,255 @@
+import logging
+import time
+from typing import (
+    Any,
+    Collection,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    TYPE_CHECKING,
+)
+
+import rlp
+from eth_typing import (
+    AnyAddress,
+    BlockNumber,
+    ChecksumAddress,
+    HexStr,
+)
+from eth_utils import (
+    to_bytes,
+    to_checksum_address,
+    to_hex,
+)
+from hexbytes import HexBytes
+
+from bubble._utils.batching import (
+    DEFAULT_MAX_BATCH_SIZE,
+)
+from bubble.exceptions import (
+    BlockNotFound,
+    BlockReorganized,
+)
+from bubble.inner_contract.bubble import Bubble
+from bubble.inner_contract.bubbleL2 import BubbleL2
+from bubble.inner_contract.decoding import get_event_decoder
+from bubble.inner_contract.delegate import Delegate
+from bubble.inner_contract.proposal import Proposal
+from bubble.inner_contract.restricting import Restricting
+from bubble.inner_contract.reward import Reward
+from bubble.inner_contract.slashing import Slashing
+from bubble.inner_contract.staking import Staking
+from bubble.inner_contract.stakingL2 import StakingL2
+from bubble.inner_contract.temp_prikey import TempPrivateKey
+from bubble.types import (
+    FunctionNumber,
+    LogReceipt,
+)
+
+if TYPE_CHECKING:
+    from bubble import Web3
+
+# the staking and delegate functions share a contract
+INNER_CONTRACT_ADDRESSES = tuple(dict.fromkeys(
+    to_checksum_address(contract.ADDRESS)
+    for contract in (
+        Restricting, Staking, Delegate, Slashing, Proposal, Reward,
+        StakingL2, Bubble, BubbleL2, TempPrivateKey,
+    )
+))
+
+
+class InnerContractEventLog(NamedTuple):
+    """
+    An inner contract event, with the block and transaction of its log.
+
+    ``fid`` is the function of the transaction which emitted the event, or ``None`` when the
+    transaction input is not an inner contract call. ``code`` and ``message`` are ``None``
+    when the event data cannot be decoded, and ``data`` is then the raw data of the log.
+    """
+    fid: Optional[FunctionNumber]
+    code: Optional[int]
+    message: Optional[str]
+    data: Any
+    address: ChecksumAddress
+    block_number: BlockNumber
+    block_hash: HexBytes
+    transaction_hash: HexBytes
+    transaction_index: int
+    log_index: int
+
+
+class IndexerCheckpoint(NamedTuple):
+    """
+    The position of an indexer: every event up to ``log_index`` of ``block_number`` was yielded,
+    or every event of the block if ``log_index`` is ``None``. ``block_hash`` is the hash of the
+    block, to detect that it was reorganized out of the chain.
+    """
+    block_number: int
+    log_index: Optional[int] = None
+    block_hash: Optional[HexStr] = None
+
+
+def decode_function_number(transaction_input: Any) -> Optional[FunctionNumber]:
+    """
+    The function number of an inner contract call, the first item of its rlp encoded input
+    """
+    try:
+        encoded_fid = rlp.decode(to_bytes(hexstr=transaction_input)
+                                 if isinstance(transaction_input, str) else bytes(transaction_input))[0]
+        return FunctionNumber(int.from_bytes(rlp.decode(encoded_fid), 'big'))
+    except (rlp.DecodingError, IndexError, TypeError, ValueError):
+        return None
+
+
+class InnerContractEventIndexer:
+    """
+    Scans block ranges for the logs of the inner contracts, and yields them as
+    ``InnerContractEventLog`` in block and log order.
+
+    The logs of each range are requested with one ``bub_getLogs``, and the transactions which
+    emitted them in JSON-RPC batches, to learn the function of each event. The events are
+    decoded by the compiled decoder of their function.
+    ``checkpoint`` is the position of the last yielded event, to resume from in a new indexer.
+    ``events()`` raises ``BlockReorganized`` if the block of the checkpoint is no longer part of
+    the chain, in which case some of the events yielded were reorganized out of it.
+    """
+
+    logger = logging.getLogger("bubble.inner_contract.InnerContractEventIndexer")
+
+    def __init__(self,
+                 web3: "Web3",
+                 addresses: Optional[Collection[AnyAddress]] = None,
+                 from_block: int = 0,
+                 checkpoint: Optional[IndexerCheckpoint] = None,
+                 block_range: int = 1000,
+                 confirmations: int = 0,
+                 fids: Optional[Collection[FunctionNumber]] = None,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 ):
+        if block_range < 1:
+            raise ValueError('block_range must be positive')
+
+        self.web3 = web3
+        self.addresses = [to_checksum_address(address) for address in addresses or INNER_CONTRACT_ADDRESSES]
+        self.block_range = block_range
+        self.confirmations = confirmations
+        self.fids = None if fids is None else set(fids)
+        self.max_batch_size = max_batch_size
+
+        if checkpoint is None:
+            checkpoint = IndexerCheckpoint(from_block - 1)
+        self.checkpoint = IndexerCheckpoint(*checkpoint)
+
+    def events(self, to_block: Optional[int] = None) -> Iterator[InnerContractEventLog]:
+        """
+        The events from the checkpoint to ``to_block``, by default the latest block less the
+        confirmations
+        """
+        if to_block is None:
+            to_block = self.web3.bub.block_number - self.confirmations
+
+        self._check_checkpoint_block()
+        while self.checkpoint.block_number < to_block or self.checkpoint.log_index is not None:
+            block_number, log_index, _block_hash = self.checkpoint
+            from_block = block_number if log_index is not None else block_number + 1
+            last_block = min(from_block + self.block_range - 1, to_block)
+            if last_block < from_block:
+                return
+
+            # taken before the logs, a reorganization in between is detected on resume
+            last_block_hash = self._get_block_hash(last_block)
+            for event in self._get_events(from_block, last_block):
+                if event.block_number == block_number and log_index is not None and event.log_index <= log_index:
+                    continue
+                self.checkpoint = IndexerCheckpoint(event.block_number, event.log_index, to_hex(event.block_hash))
+                yield event
+            self.checkpoint = IndexerCheckpoint(last_block, None, last_block_hash)
+
+    def stream(self, poll_interval: float = 1.0) -> Iterator[InnerContractEventLog]:
+        """
+        The events from the checkpoint, following the new blocks until the iteration is stopped
+        """
+        while True:
+            yield from self.events()
+            time.sleep(poll_interval)
+
+    def _get_block_hash(self, block_number: int) -> HexStr:
+        return to_hex(self.web3.bub.get_block(block_number)['hash'])
+
+    def _check_checkpoint_block(self) -> None:
+        block_number, _log_index, block_hash = self.checkpoint
+        if block_hash is None or block_number < 0:
+            return
+        try:
+            current_hash = self._get_block_hash(block_number)
+        except BlockNotFound:
+            current_hash = None
+        if current_hash != to_hex(hexstr=block_hash):
+            raise BlockReorganized(
+                f'Block {block_number} of the checkpoint was {block_hash}, it is now {current_hash}'
+            )
+
+    def _get_events(self, from_block: int, to_block: int) -> List[InnerContractEventLog]:
+        logs = self.web3.bub.get_logs({
+            'address': self.addresses,
+            'fromBlock': from_block,
+            'toBlock': to_block,
+        })
+        if not logs:
+            return []
+
+        logs = sorted(logs, key=lambda log: (log['blockNumber'], log['logIndex']))
+        fids = self._get_function_numbers(logs)
+
+        events = []
+        for log in logs:
+            fid = fids[log['transactionHash']]
+            if self.fids is not None and fid not in self.fids:
+                continue
+            events.append(self._decode_log(fid, log))
+        return events
+
+    def _get_function_numbers(self, logs: List[LogReceipt]) -> Dict[HexBytes, Optional[FunctionNumber]]:
+        transaction_hashes = list(dict.fromkeys(log['transactionHash'] for log in logs))
+        with self.web3.batch_requests(self.max_batch_size) as batch:
+            for transaction_hash in transaction_hashes:
+                batch.add(self.web3.bub.get_transaction, transaction_hash)
+            transactions = batch.execute()
+
+        return {
+            transaction_hash: decode_function_number(transaction['input']) if transaction else None
+            for transaction_hash, transaction in zip(transaction_hashes, transactions)
+        }
+
+    def _decode_log(self, fid: Optional[FunctionNumber], log: LogReceipt) -> InnerContractEventLog:
+        try:
+            event_data = get_event_decoder(fid).decode(log['data'])
+            code, message, data = event_data['code'], event_data['message'], event_data['data']
+        except Exception:
+            try:
+                # the data does not have the shape of the event of the function, keep it undecoded
+                event_data = get_event_decoder(None).decode(log['data'])
+                code, message, data = event_data['code'], event_data['message'], event_data['data']
+            except Exception as exc:
+                # not an rlp encoded event at all, yielded raw so that indexing goes on
+                self.logger.warning(
+                    f"Cannot decode the event data of log {log['logIndex']} of transaction "
+                    f"{to_hex(log['transactionHash'])}: {exc!r}"
+                )
+                code, message, data = None, None, log['data']
+
+        return InnerContractEventLog(
+            fid=fid,
+            code=code,
+            message=message,
+            data=data,
+            address=log['address'],
+            block_number=log['blockNumber'],
+            block_hash=log['blockHash'],
+            transaction_hash=log['transactionHash'],
+            transaction_index=log['transactionIndex'],
+            log_index=log['logIndex'],
+        )
@@ -1,40 +1,64 @@
+from concurrent.futures import (
+    ProcessPoolExecutor,
+)
 import copy
+import functools
 import json
+import multiprocessing
 from typing import (
     Optional,
     Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Sequence,
+    Union,
     cast,
     TYPE_CHECKING,
 )
 
-import rlp
 from hexbytes import HexBytes
 
 from eth_typing import (
-    HexStr, Address, AnyAddress,
+    HexStr, Address, AnyAddress, ChecksumAddress,
 )
 from eth_utils import (
     remove_0x_prefix,
     combomethod, to_bytes,
 )
+from eth_utils.toolz import (
+    assoc,
+)
 
+from bubble.constants import DYNAMIC_FEE_TXN_PARAMS
 from bubble.datastructures import MutableAttributeDict
-from bubble.inner_contract.error_code import ERROR_CODE
+from bubble.inner_contract.decoding import (
+    InnerEventDecoder,
+    get_event_decoder,
+)
+from bubble.inner_contract.encoding import get_function_encoder
+from bubble.inner_contract.results import (
+    INNER_CONTRACT_RESULT_TYPES,
+    wrap_result,
+)
 from bubble.module import apply_result_formatters
 
+from bubble._utils.batching import (
+    DEFAULT_MAX_BATCH_SIZE,
+    BatchRequestInformation,
+)
 from bubble._utils.empty import (
     empty,
 )
-from bubble._utils.rpc_abi import (
-    apply_abi_formatters_to_dict,
+from bubble._utils.utility_methods import (
+    any_in_dict,
 )
 from bubble._utils.transactions import (
+    fill_nonce,
     fill_transaction_defaults,
 )
 from bubble.inner_contract.formatters import (
-    INNER_CONTRACT_PARAM_ABIS,
-    DEFAULT_PARAM_NORMALIZERS,
-    DEFAULT_PARAM_ABIS,
     INNER_CONTRACT_RESULT_FORMATTERS,
     INNER_CONTRACT_EVENT_FORMATTERS,
 )
@@ -63,26 +87,119 @@ class InnerContract:
         self.web3: Web3 = web3
         self.function = InnerContractFunction(self.web3, self.ADDRESS)
 
+    @property
+    def typed_results(self) -> bool:
+        """
+        Whether the query results are returned as the read-only, slotted result types
+        of ``bubble.inner_contract.results`` instead of ``AttributeDict``
+        """
+        return self.function.typed_results
+
+    @typed_results.setter
+    def typed_results(self, typed_results: bool) -> None:
+        self.function.typed_results = typed_results
+
     @combomethod
     def event(self, fid: FunctionIdentifier):
         return InnerContractEvent(fid)
 
+    def _block_number(self, block_identifier: BlockIdentifier) -> int:
+        """
+        The number of a block, only requested from the node when it is not one already
+        """
+        if isinstance(block_identifier, int) and not isinstance(block_identifier, bool):
+            return block_identifier
+        return self.web3.bub.get_block(block_identifier)['number']
+
+    def _block_hash(self, block_identifier: BlockIdentifier) -> HexBytes:
+        return self.web3.bub.get_block(block_identifier)['hash']
+
+    def _bind_bulk_query(self, method: Callable[..., 'InnerContractFunction']) -> 'BoundBulkQuery':
+        return BoundBulkQuery(self, method)
+
+
+class bulk_query:
+    """
+    Decorate a query method of an inner contract, so that it can also be called for
+    many arguments at once, e.g.
+
+        w3.dpos.delegate.get_delegate_info.many([(address, node_id, block_number), ...])
+    """
+
+    def __init__(self, method: Callable[..., 'InnerContractFunction']):
+        self.method = method
+        functools.update_wrapper(self, method)
+
+    def __get__(self, contract: Optional[InnerContract], owner: type = None):
+        if contract is None:
+            return self
+        return contract._bind_bulk_query(self.method)
+
+
+class BoundBulkQuery:
+
+    def __init__(self, contract: InnerContract, method: Callable[..., 'InnerContractFunction']):
+        self.contract = contract
+        self.method = method
+        functools.update_wrapper(self, method)
+
+    def __call__(self, *args, **kwargs) -> 'InnerContractFunction':
+        return self.method(self.contract, *args, **kwargs)
+
+    def many(self,
+             args_list: Sequence[Any],
+             transaction: Optional[TxParams] = None,
+             block_identifier: BlockIdentifier = 'latest',
+             max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+             ) -> List[Union[Any, Exception]]:
+        """
+        Call the query for every item of ``args_list``, sending the calls as JSON-RPC batches
+        of up to ``max_batch_size`` requests.
+
+        An item is passed as the keyword arguments if it is a mapping, as the positional
+        arguments if it is a tuple, and as the only argument otherwise.
+        The results are returned in the order of ``args_list``,
+        with the exception of a failed item in its place.
+        """
+        results: List[Union[Any, Exception]] = [None] * len(args_list)
+        indexes: List[int] = []
+        with self.contract.web3.batch_requests(max_batch_size) as batch:
+            for index, args in enumerate(args_list):
+                try:
+                    batch.add(self._function(args), transaction, block_identifier)
+                except Exception as exc:
+                    results[index] = exc
+                else:
+                    indexes.append(index)
+
+            for index, result in zip(indexes, batch.execute(raise_on_error=False)):
+                results[index] = result
+
+        return results
+
+    def _function(self, args: Any) -> 'InnerContractFunction':
+        if isinstance(args, Mapping):
+            return self(**args)
+        elif isinstance(args, tuple):
+            return self(*args)
+        return self(args)
+
 
 class InnerContractFunction:
     fid: FunctionIdentifier = None
     kwargs: dict = None
+    typed_results: bool = False
 
     def __init__(self, web3: "Web3", address: AnyAddress):
         self.web3: Web3 = web3
         self.address: AnyAddress = address
 
     def __call__(self, func_type: FunctionIdentifier, **kwargs) -> 'InnerContractFunction':
-        clone = copy.copy(self)
+        # a shallow copy without the overhead of copy.copy, ``kwargs`` is a new dict already
+        clone = object.__new__(self.__class__)
+        clone.__dict__.update(self.__dict__)
         clone.fid = func_type
-        if kwargs is None:
-            clone.kwargs = {}
-        else:
-            clone.kwargs = copy.copy(kwargs)
+        clone.kwargs = kwargs
 
         return clone
 
@@ -91,7 +208,16 @@ class InnerContractFunction:
              block_identifier: BlockIdentifier = 'latest',
              state_override: Optional[CallOverrideParams] = None,
              ) -> Any:
+        call_transaction = self._prepare_call_transaction(transaction)
+
+        return_data = self.web3.bub.call(call_transaction,
+                                         block_identifier=block_identifier,
+                                         state_override=state_override,
+                                         )
 
+        return self._format_return_data(return_data)
+
+    def _prepare_call_transaction(self, transaction: Optional[TxParams]) -> TxParams:
         if transaction is None:
             call_transaction: TxParams = {}
         else:
@@ -117,41 +243,68 @@ class InnerContractFunction:
 
         call_transaction['data'] = self._encode_transaction_data()
 
-        return_data = self.web3.bub.call(call_transaction,
-                                         block_identifier=block_identifier,
-                                         state_override=state_override,
-                                         )
+        return call_transaction
 
-        return self._formatter_result(self.fid, return_data)
+    def _format_return_data(self, return_data: Any) -> Any:
+        formatter = self._formatter_typed_result if self.typed_results else self._formatter_result
 
-    def transact(self):
-        # todo: wait coding
-        pass
-
-    def estimate_gas(self,
-                     transaction: Optional[TxParams] = None,
-                     block_identifier: Optional[BlockIdentifier] = None
-                     ) -> int:
-        if transaction is None:
-            estimate_transaction: TxParams = {}
-        else:
-            estimate_transaction = cast(TxParams, dict(**transaction))
+        if isinstance(return_data, BatchRequestInformation):
+            # the call is being batched, format the result once the batch is sent
+            return return_data.with_result_formatter(functools.partial(formatter, self.fid))
 
-        if 'data' in estimate_transaction:
-            raise ValueError("Cannot set data in build transaction")
+        return formatter(self.fid, return_data)
 
-        if 'to' in estimate_transaction:
-            raise ValueError("Cannot set to address in contract call build transaction")
+    def transact(self,
+                 transaction: Optional[TxParams] = None,
+                 private_key: Optional[Any] = None,
+                 ) -> HexBytes:
+        """
+        Send the transaction of the function, and return its hash.
 
-        if self.address:
-            estimate_transaction.setdefault('to', self.address)
+        Without ``private_key``, it is sent with ``bub_sendTransaction`` to be signed by the node,
+        or by a ``construct_sign_and_send_raw_middleware`` account.
+        With ``private_key``, which may be any key accepted by that middleware,
+        it is signed locally and sent with ``bub_sendRawTransaction``.
+        """
+        if private_key is None:
+            transact_transaction = self._prepare_transact_transaction(transaction)
+            return self.web3.bub.send_transaction(transact_transaction)
+
+        from bubble.middleware.signing import (
+            format_transaction,
+            get_raw_transaction,
+            to_account,
+        )
+
+        account = to_account(private_key)
+        transact_transaction = self._prepare_transact_transaction(transaction, account.address)
+        transact_transaction = fill_gas_price(self.web3, transact_transaction)
+        transact_transaction = fill_transaction_defaults(self.web3, transact_transaction)
+        transact_transaction = fill_nonce(self.web3, transact_transaction)
+        signed_transaction = account.sign_transaction(format_transaction(transact_transaction))
+        raw_transaction = get_raw_transaction(signed_transaction)
+
+        return self.web3.bub.send_raw_transaction(raw_transaction)
+
+    def _prepare_transact_transaction(self,
+                                      transaction: Optional[TxParams],
+                                      sender: Optional[ChecksumAddress] = None,
+                                      ) -> TxParams:
+        transact_transaction = self._prepare_transaction(transaction)
+
+        if sender is not None:
+            transact_transaction.setdefault('from', sender)
+        elif self.web3.bub.default_account is not empty:
+            # type ignored b/c check prevents an empty default_account
+            transact_transaction.setdefault('from', self.web3.bub.default_account)  # type: ignore
 
-        if 'to' not in estimate_transaction:
-            raise ValueError(
-                "Please ensure that this inner contract instance has an address."
-            )
+        return transact_transaction
 
-        estimate_transaction['data'] = self._encode_transaction_data()
+    def estimate_gas(self,
+                     transaction: Optional[TxParams] = None,
+                     block_identifier: Optional[BlockIdentifier] = None
+                     ) -> int:
+        estimate_transaction = self._prepare_transaction(transaction)
 
         return self.web3.bub.estimate_gas(estimate_transaction, block_identifier)
 
@@ -159,6 +312,13 @@ class InnerContractFunction:
         """
         Build the transaction dictionary without sending
         """
+        built_transaction = self._prepare_transaction(transaction)
+
+        built_transaction = fill_transaction_defaults(self.web3, built_transaction)
+
+        return built_transaction
+
+    def _prepare_transaction(self, transaction: Optional[TxParams]) -> TxParams:
         if transaction is None:
             built_transaction: TxParams = {}
         else:
@@ -180,36 +340,13 @@ class InnerContractFunction:
 
         built_transaction['data'] = self._encode_transaction_data()
 
-        built_transaction = fill_transaction_defaults(self.web3, built_transaction)
-
         return built_transaction
 
     def _encode_transaction_data(self) -> HexStr:
-        encoded_args = [rlp.encode(self.fid)]
-
-        self.kwargs = self._formatter_param(self.fid, params=self.kwargs)
-        if self.kwargs:
-            # encodes parameters sequentially
-            for key, value in self.kwargs.items():
-                if value is None:
-                    encoded_args.append(b'')
-                else:
-                    encoded_args.append(rlp.encode(value))
-
-        return rlp.encode(encoded_args)
-
-    @staticmethod
-    def _formatter_param(fid: FunctionIdentifier, params: dict):
-        """
-        Format parameters so that it can be used correctly during RPC encoding
-        """
-        params = apply_abi_formatters_to_dict(DEFAULT_PARAM_NORMALIZERS,
-                                              DEFAULT_PARAM_ABIS,
-                                              params)
-        function_abis = INNER_CONTRACT_PARAM_ABIS.get(fid)
-        if function_abis:
-            return apply_abi_formatters_to_dict(DEFAULT_PARAM_NORMALIZERS, function_abis, params)
-        return params
+        # the argument names are fixed for each function, so its encoder is compiled once
+        kwargs = self.kwargs or {}
+        encoder = get_function_encoder(self.fid, tuple(kwargs))
+        return encoder.encode(kwargs)
 
     @staticmethod
     def _formatter_result(fid: FunctionIdentifier, result: Any):
@@ -240,10 +377,196 @@ class InnerContractFunction:
 
         return rets
 
+    @staticmethod
+    def _formatter_typed_result(fid: FunctionIdentifier, result: Any):
+        """
+        Decode the result into the result type of the function in one pass,
+        its fields are formatted when they are first read
+        """
+        if isinstance(result, bytes):
+            result = json.loads(result)
+
+        if not isinstance(result, dict) or 'Code' not in result or 'Ret' not in result:
+            return wrap_result(result)
+
+        rets = result['Ret']
+
+        # the same as the dict results: the message of a failed query, and empty values as is
+        if result['Code'] != 0 or not rets:
+            return wrap_result(rets)
+
+        result_type = INNER_CONTRACT_RESULT_TYPES.get(fid)
+        if result_type:
+            return result_type(rets)
+
+        return wrap_result(rets)
+
+
+def needs_gas_price(transaction: TxParams) -> bool:
+    """
+    Whether a transaction has no fee, and needs the gas price of the node to be signed locally.
+    The sync and async transactions are priced before their defaults are filled, which would
+    otherwise ask for dynamic fees.
+    """
+    return 'gasPrice' not in transaction and not any_in_dict(DYNAMIC_FEE_TXN_PARAMS, transaction)
+
+
+def fill_gas_price(web3: "Web3", transaction: TxParams) -> TxParams:
+    """
+    Set the gas price of the node on a transaction without any fee, which is needed to sign it locally
+    """
+    if not needs_gas_price(transaction):
+        return transaction
+    return assoc(transaction, 'gasPrice', web3.bub.gas_price)
+
+
+# below this many transactions, signing them in worker processes costs more than it saves
+_MIN_PARALLEL_SIGNATURES = 16
+
+
+def _sign_transactions(private_key: bytes, transactions: List[TxParams]) -> List[Union[HexBytes, Exception]]:
+    from eth_account import Account
+    from bubble.middleware.signing import get_raw_transaction
+
+    signed: List[Union[HexBytes, Exception]] = []
+    for transaction in transactions:
+        try:
+            signed.append(get_raw_transaction(Account.sign_transaction(transaction, private_key)))
+        except Exception as exc:
+            signed.append(exc)
+    return signed
+
+
+def _sign_in_processes(private_key: bytes,
+                       transactions: List[TxParams],
+                       max_workers: Optional[int],
+                       ) -> List[Union[HexBytes, Exception]]:
+    workers = max_workers or 1
+    if workers == 1 or len(transactions) < _MIN_PARALLEL_SIGNATURES:
+        return _sign_transactions(private_key, transactions)
+
+    chunk_size = -(-len(transactions) // workers)
+    chunks = [transactions[start:start + chunk_size] for start in range(0, len(transactions), chunk_size)]
+    # spawned, a forked worker would inherit the locks and sockets of the providers
+    spawn_context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=len(chunks), mp_context=spawn_context) as executor:
+        return [
+            raw_transaction
+            for signed_chunk in executor.map(_sign_transactions, [private_key] * len(chunks), chunks)
+            for raw_transaction in signed_chunk
+        ]
+
+
+def transact_many(functions: Sequence[InnerContractFunction],
+                  private_key: Any,
+                  transaction: Optional[TxParams] = None,
+                  max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                  max_workers: Optional[int] = None,
+                  ) -> List[Union[HexBytes, Exception]]:
+    """
+    Sign the transactions of many inner contract functions with ``private_key``, and send them
+    as JSON-RPC batches of up to ``max_batch_size`` requests.
+
+    ``transaction`` holds the fields shared by all the transactions. The nonce is requested once
+    and incremented for each transaction, and the gas estimates are requested in batches.
+    With ``max_workers`` above 1, large lists are signed in that many processes.
+
+    The hashes are returned in the order of ``functions``, with the exception of a failed
+    transaction in its place. Only the transactions which are signed take a nonce, so a failure
+    before sending leaves no gap. A transaction the node rejects leaves a gap at its nonce though:
+    the transactions after it wait in the pool of the node until a transaction is sent with the
+    nonce of ``bub.get_transaction_count(address, 'pending')``.
+    """
+    from bubble.middleware.signing import (
+        format_transaction,
+        to_account,
+    )
+
+    if not functions:
+        return []
+
+    web3 = functions[0].web3
+    account = to_account(private_key)
+    results: List[Union[HexBytes, Exception]] = [None] * len(functions)
+
+    transactions = {}
+    for index, function in enumerate(functions):
+        try:
+            transactions[index] = function._prepare_transact_transaction(transaction, account.address)
+        except Exception as exc:
+            results[index] = exc
+
+    # the gas of each transaction, then the fields which are the same for all of them
+    estimated = [index for index, transact_transaction in transactions.items()
+                 if 'gas' not in transact_transaction]
+    with web3.batch_requests(max_batch_size) as batch:
+        for index in estimated:
+            batch.add(web3.bub.estimate_gas, transactions[index])
+        for index, gas in zip(estimated, batch.execute(raise_on_error=False)):
+            if isinstance(gas, Exception):
+                results[index] = gas
+                del transactions[index]
+            else:
+                transactions[index]['gas'] = gas
+
+    if not transactions:
+        return results
+
+    first_transaction = next(iter(transactions.values()))
+    shared_fields = {
+        key: value
+        for key, value in fill_transaction_defaults(web3, fill_gas_price(web3, first_transaction)).items()
+        if key not in first_transaction
+    }
+    if transaction and 'nonce' in transaction:
+        nonce = transaction['nonce']
+    else:
+        nonce = web3.bub.get_transaction_count(account.address, 'pending')
+
+    formatted = {}
+    for index, transact_transaction in transactions.items():
+        try:
+            formatted[index] = format_transaction(dict(shared_fields, **transact_transaction))
+        except Exception as exc:
+            results[index] = exc
+
+    # the transactions after one which fails to sign are signed again with the following nonces
+    signed: Dict[int, HexBytes] = {}
+    pending = list(formatted)
+    while pending:
+        unsigned = [
+            dict(formatted[index], nonce=nonce + len(signed) + offset)
+            for offset, index in enumerate(pending)
+        ]
+        raw_transactions = _sign_in_processes(account.key, unsigned, max_workers)
+        first_failure = next(
+            (offset for offset, raw_transaction in enumerate(raw_transactions)
+             if isinstance(raw_transaction, Exception)),
+            len(raw_transactions),
+        )
+        retried = []
+        for offset, (index, raw_transaction) in enumerate(zip(pending, raw_transactions)):
+            if isinstance(raw_transaction, Exception):
+                results[index] = raw_transaction
+            elif offset < first_failure:
+                signed[index] = raw_transaction
+            else:
+                retried.append(index)
+        pending = retried
+
+    with web3.batch_requests(max_batch_size) as batch:
+        for raw_transaction in signed.values():
+            batch.add(web3.bub.send_raw_transaction, raw_transaction)
+        for index, transaction_hash in zip(signed, batch.execute(raise_on_error=False)):
+            results[index] = transaction_hash
+
+    return results
+
 
 class InnerContractEvent:
 
     def __init__(self, fid: FunctionIdentifier = None):
+        self.fid = fid
         self.formatter = INNER_CONTRACT_EVENT_FORMATTERS.get(fid)
 
     def process_receipt(self, receipt: TxReceipt) -> RLPEventData:
@@ -251,6 +574,28 @@ class InnerContractEvent:
         log = receipt['logs'][-1]
         return self._parse_log(log)
 
+    def process_receipts(self,
+                         receipts: Sequence[TxReceipt],
+                         max_workers: Optional[int] = None,
+                         ) -> List[Union[RLPEventData, Exception]]:
+        """
+        Decode the event of many receipts in bulk, in the same order, with the exception of
+        a receipt which fails to decode in its place.
+        With ``max_workers`` above 1, large lists are decoded in that many processes.
+        """
+        results: List[Union[RLPEventData, Exception]] = [None] * len(receipts)
+        payloads = {}
+        for index, receipt in enumerate(receipts):
+            try:
+                payloads[index] = receipt['logs'][-1].get('data')
+            except Exception as exc:
+                results[index] = exc
+
+        decoded = get_event_decoder(self.fid).decode_many(list(payloads.values()), max_workers)
+        for index, event_data in zip(payloads, decoded):
+            results[index] = event_data
+        return results
+
     def _parse_log(self, log: LogReceipt) -> RLPEventData:
         data = log.get('data')
         if type(data) is str:
@@ -259,50 +604,11 @@ class InnerContractEvent:
         return self._format_data(data)
 
     def _format_data(self, data) -> RLPEventData:
-        data = self.decode_data(data)
-        code = data[0]
-        message = ERROR_CODE.get(int(code), 'Unknown error code')
-        # no returns in data
-        if not self.formatter:
-            formatted_data = {'code': code, 'message': message, 'data': data[1:]}
-            return cast(RLPEventData, MutableAttributeDict.recursive(formatted_data))
-
-        args = data[1:]
-        if self.formatter.__name__ == 'apply_formatters_to_dict':
-            # format the returns as a dict
-            raw_formatter = self.formatter.args[0]
-            packaged_args = dict(zip(raw_formatter.keys(), args))
-
-        elif self.formatter.__name__ == 'apply_formatter_to_array':
-            # format the returns as a dict-list
-            actual_args = args[0]
-            if type(actual_args) is not list:
-                raise ValueError('event data is inconsistent with formatter')
-
-            packaged_args = []
-            raw_formatter = self.formatter.args[0].args[0]
-            for _args in actual_args:
-                packaged_args.append(dict(zip(raw_formatter.keys(), _args)))
-
-        else:
-            raise ValueError(f'Unknown formatter: {self.formatter.__name__}')
-
-        formatted_args = apply_result_formatters(self.formatter, packaged_args)
-        formatted_data = {'code': code, 'message': message, 'data': formatted_args}
-        return cast(RLPEventData, MutableAttributeDict.recursive(formatted_data))
+        return get_event_decoder(self.fid).decode(to_bytes(data))
 
     @staticmethod
     def decode_data(data):
-        decoded = []
-        unshaped_data = rlp.decode(to_bytes(data))
-        # 解码事件code
-        code = int(unshaped_data[0])
-        decoded.append(code)
-        # 解码事件参数
-        for arg in unshaped_data[1:]:
-            decoded.append(rlp.decode(arg))
-
-        return decoded
+        return InnerEventDecoder.decode_data(to_bytes(data))
 
 
 def bubble_dict(target: dict, *keys: Any):
@@ -16,6 +16,7 @@ from bubble.types import (
 )
 from bubble.inner_contract import (
     InnerContract,
+    bulk_query,
 )
 
 
@@ -150,6 +151,7 @@ class Proposal(InnerContract):
                              version_sign=version_sign,
                              )
 
+    @bulk_query
     def get_proposal(self, proposal_id: Union[bytes, HexStr]):
         """
         Get details of the proposal
@@ -158,6 +160,7 @@ class Proposal(InnerContract):
         """
         return self.function(InnerFunction.proposal_getProposal, proposal_id=proposal_id)
 
+    @bulk_query
     def get_proposal_votes(self,
                            proposal_id: Union[bytes, HexStr],
                            block_identifier: BlockIdentifier = 'latest',
@@ -168,12 +171,12 @@ class Proposal(InnerContract):
         :param proposal_id: hash id of the proposal
         :param block_identifier: block identifier
         """
-        block = self.web3.bub.get_block(block_identifier)
         return self.function(InnerFunction.proposal_getProposalVotes,
                              proposal_id=proposal_id,
-                             block_hash=block['hash'],
+                             block_hash=self._block_hash(block_identifier),
                              )
 
+    @bulk_query
     def get_proposal_result(self, proposal_id: Union[bytes, HexStr]):
         """
         Get proposal results, you can query only after the proposal is complete.
@@ -195,6 +198,7 @@ class Proposal(InnerContract):
         """
         return self.function(InnerFunction.proposal_getChainVersion)
 
+    @bulk_query
     def get_govern_param(self, module: str, name: str):
         """
         Get the current value of the governable parameter
@@ -205,6 +209,7 @@ class Proposal(InnerContract):
         """
         return self.function(InnerFunction.proposal_getGovernParam, module=module, name=name)
 
+    @bulk_query
     def govern_param_list(self, module: str = ''):
         """
         get all governable parameters.
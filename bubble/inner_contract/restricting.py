@@ -3,6 +3,7 @@ from eth_typing import AnyAddress
 from bubble.types import InnerFunction
 from bubble.inner_contract import (
     InnerContract,
+    bulk_query,
 )
 
 
@@ -31,6 +32,7 @@ class Restricting(InnerContract):
                              plans=[list(plan.values()) for plan in plans],
                              )
 
+    @bulk_query
     def get_restricting_info(self, release_address: AnyAddress):
         """
         Get the restricting information.
@@ -0,0 +1,186 @@
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Type,
+)
+
+from eth_utils.curried import (
+    apply_formatter_if,
+)
+
+from bubble.inner_contract.formatters import (
+    CANDIDATE_INFO_FORMATTER,
+    DELEGATE_INFO_FORMATTER,
+    DELEGATE_REWARD_FORMATTER,
+    GET_BUB_TXHASH_LIST_FAOMATTER,
+    LOCKED_DELEGATE_INFO_FORMATTER,
+    RESTRICTING_PLAN_FORMATTER,
+    VALIDATOR_INFO_FORMATTER,
+    VERIFIER_INFO_FORMATTER,
+)
+from bubble._utils.method_formatters import (
+    is_not_null,
+    to_integer_if_hex,
+)
+from bubble.types import (
+    FunctionIdentifier,
+    InnerFunction,
+)
+
+
+def wrap_result(value: Any) -> Any:
+    """
+    Wrap the dicts of a decoded JSON value as results, without formatting
+    """
+    if isinstance(value, dict):
+        return InnerContractResult(value)
+    elif isinstance(value, list):
+        return [wrap_result(item) for item in value]
+    return value
+
+
+class InnerContractResult(Mapping[str, Any]):
+    """
+    A read-only inner contract query result, backed by the decoded JSON of the node.
+
+    The values are read with attribute or mapping access, like the ``AttributeDict``
+    results. The fields in ``FORMATTERS`` have a slot each, and are only formatted when
+    they are first read.
+    """
+    __slots__ = ('_raw',)
+
+    FORMATTERS: Dict[str, Callable[[Any], Any]] = {}
+
+    def __init__(self, raw: Dict[str, Any]):
+        self._raw = raw
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._raw[key]
+        formatter = self.FORMATTERS.get(key)
+        if formatter is None:
+            return wrap_result(value)
+
+        try:
+            return object.__getattribute__(self, key)
+        except AttributeError:
+            value = formatter(value)
+            object.__setattr__(self, key, value)
+            return value
+
+    def __getattr__(self, name: str) -> Any:
+        # reached for the fields which are not formatted yet, or have no slot
+        if name.startswith('_'):
+            raise AttributeError(name)
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(
+                f"'{self.__class__.__name__}' object has no attribute '{name}'"
+            ) from None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name != '_raw':
+            raise TypeError(f"'{self.__class__.__name__}' object is read-only")
+        object.__setattr__(self, name, value)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._raw)
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({dict(self)!r})'
+
+    def __reduce__(self) -> Any:
+        return self.__class__, (self._raw,)
+
+
+def list_of(result_type: Type[InnerContractResult]) -> Callable[[List[Dict[str, Any]]], List[Any]]:
+    def to_results(items: List[Dict[str, Any]]) -> List[Any]:
+        return [result_type(item) for item in items]
+
+    return to_results
+
+
+class RestrictingPlan(InnerContractResult):
+    __slots__ = tuple(RESTRICTING_PLAN_FORMATTER)
+    FORMATTERS = RESTRICTING_PLAN_FORMATTER
+
+
+class RestrictingInfo(InnerContractResult):
+    __slots__ = ('balance', 'Pledge', 'debt', 'plans')
+    FORMATTERS = {
+        'balance': to_integer_if_hex,
+        'Pledge': to_integer_if_hex,
+        'debt': to_integer_if_hex,
+        'plans': apply_formatter_if(is_not_null, list_of(RestrictingPlan)),
+    }
+
+
+class CandidateInfo(InnerContractResult):
+    __slots__ = tuple(CANDIDATE_INFO_FORMATTER)
+    FORMATTERS = CANDIDATE_INFO_FORMATTER
+
+
+class VerifierInfo(InnerContractResult):
+    __slots__ = tuple(VERIFIER_INFO_FORMATTER)
+    FORMATTERS = VERIFIER_INFO_FORMATTER
+
+
+class ValidatorInfo(InnerContractResult):
+    __slots__ = tuple(VALIDATOR_INFO_FORMATTER)
+    FORMATTERS = VALIDATOR_INFO_FORMATTER
+
+
+class DelegateInfo(InnerContractResult):
+    __slots__ = tuple(DELEGATE_INFO_FORMATTER)
+    FORMATTERS = DELEGATE_INFO_FORMATTER
+
+
+class LockedDelegateInfo(InnerContractResult):
+    __slots__ = tuple(LOCKED_DELEGATE_INFO_FORMATTER)
+    FORMATTERS = LOCKED_DELEGATE_INFO_FORMATTER
+
+
+class DelegateLockInfo(InnerContractResult):
+    __slots__ = ('Locks', 'Released', 'RestrictingPlan')
+    FORMATTERS = {
+        'Locks': list_of(LockedDelegateInfo),
+        'Released': to_integer_if_hex,
+        'RestrictingPlan': to_integer_if_hex,
+    }
+
+
+class DelegateReward(InnerContractResult):
+    __slots__ = tuple(DELEGATE_REWARD_FORMATTER)
+    FORMATTERS = DELEGATE_REWARD_FORMATTER
+
+
+class BubbleInfo(InnerContractResult):
+    __slots__ = ()
+
+
+class BubbleTxHash(InnerContractResult):
+    __slots__ = tuple(GET_BUB_TXHASH_LIST_FAOMATTER)
+    FORMATTERS = GET_BUB_TXHASH_LIST_FAOMATTER
+
+
+INNER_CONTRACT_RESULT_TYPES: Dict[FunctionIdentifier, Callable[[Any], Any]] = {
+    InnerFunction.restricting_getRestrictingInfo: RestrictingInfo,
+    InnerFunction.staking_getCandidateList: list_of(CandidateInfo),
+    InnerFunction.staking_getVerifierList: list_of(VerifierInfo),
+    InnerFunction.staking_getValidatorList: list_of(ValidatorInfo),
+    InnerFunction.staking_getCandidateInfo: CandidateInfo,
+    InnerFunction.staking_getBlockReward: to_integer_if_hex,
+    InnerFunction.staking_getStakingReward: to_integer_if_hex,
+    InnerFunction.delegate_getDelegateInfo: DelegateInfo,
+    InnerFunction.reward_getDelegateReward: list_of(DelegateReward),
+    InnerFunction.delegate_getDelegateLockInfo: DelegateLockInfo,
+    InnerFunction.bubble_getBubbleInfo: BubbleInfo,
+    InnerFunction.bubble_getBubTxHashList: BubbleTxHash,
+}
@@ -4,6 +4,7 @@ from eth_utils import remove_0x_prefix
 from bubble.types import InnerFunction
 from bubble.inner_contract import (
     InnerContract,
+    bulk_query,
 )
 
 
@@ -16,6 +17,7 @@ class Reward(InnerContract):
         """
         return self.function(InnerFunction.reward_withdrawDelegateReward)
 
+    @bulk_query
     def get_delegate_reward(self,
                             address: AnyAddress,
                             node_ids: [HexStr] = None,
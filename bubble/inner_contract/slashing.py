@@ -12,6 +12,7 @@ from bubble.types import (
 )
 from bubble.inner_contract import (
     InnerContract,
+    bulk_query,
 )
 
 
@@ -27,6 +28,7 @@ class Slashing(InnerContract):
         """
         return self.function(InnerFunction.slashing_reportDuplicateSign, report_type=report_type, data=data)
 
+    @bulk_query
     def check_duplicate_sign(self,
                              report_type: int,
                              node_id: Union[NodeID, HexStr],
@@ -39,9 +41,8 @@ class Slashing(InnerContract):
         :param node_id: node id to report
         :param block_identifier: duplicate-signed block identifier
         """
-        block = self.web3.bub.get_block(block_identifier)
         return self.function(InnerFunction.slashing_checkDuplicateSign,
                              report_type=report_type,
                              node_id=node_id,
-                             block_number=block['number'],
+                             block_number=self._block_number(block_identifier),
                              )
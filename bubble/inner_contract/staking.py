@@ -22,6 +22,7 @@ from bubble.types import (
 )
 from bubble.inner_contract import (
     InnerContract,
+    bulk_query,
 )
 
 
@@ -150,6 +151,7 @@ class Staking(InnerContract):
         """
         return self.function(InnerFunction.staking_getValidatorList)
 
+    @bulk_query
     def get_candidate_info(self, node_id: Union[NodeID, HexStr]):
         """
         Get staking node information.
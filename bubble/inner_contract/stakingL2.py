@@ -22,6 +22,7 @@ from bubble.types import (
 )
 from bubble.inner_contract import (
     InnerContract,
+    bulk_query,
 )
 
 
@@ -115,6 +116,7 @@ class StakingL2(InnerContract):
         """
         return self.function(InnerFunction.stakingL2_getCandidateList)
 
+    @bulk_query
     def get_candidate_info(self, node_id: Union[NodeID, HexStr]):
         """
         Get staking node information.
@@ -9,6 +9,7 @@ from bubble.types import (
 
 from bubble.inner_contract import (
     InnerContract,
+    bulk_query,
 )
 
 
@@ -77,6 +78,7 @@ class TempPrivateKey(InnerContract):
                              add_value=add_value,
                              )
 
+    @bulk_query
     def get_line_of_credit(self,
                            game_contract_address: AnyAddress,
                            ):
@@ -1,7 +1,7 @@
 import decimal
 
-from bubble.dpos import DPos
-from bubble.subchain import SubChain
+from bubble.dpos import DPos, AsyncDPos
+from bubble.subchain import SubChain, AsyncSubChain
 from bubble.debug import Debug
 from bubble.inner_contract import Reward
 from bubble.inner_contract import Proposal
@@ -10,6 +10,18 @@ from bubble.inner_contract import Delegate
 from bubble.inner_contract import Restricting
 from bubble.inner_contract import Slashing
 from bubble.inner_contract import Staking, StakingL2, BubbleL2, TempPrivateKey
+from bubble.inner_contract import (
+    AsyncBubble,
+    AsyncBubbleL2,
+    AsyncDelegate,
+    AsyncProposal,
+    AsyncRestricting,
+    AsyncReward,
+    AsyncSlashing,
+    AsyncStaking,
+    AsyncStakingL2,
+    AsyncTempPrivateKey,
+)
 from ens import (
     AsyncENS,
     ENS,
@@ -66,6 +78,13 @@ from bubble._utils.abi import (
     build_strict_registry,
     map_abi_data,
 )
+from bubble._utils.async_batching import (
+    AsyncRequestBatcher,
+)
+from bubble._utils.batching import (
+    DEFAULT_MAX_BATCH_SIZE,
+    RequestBatcher,
+)
 from bubble._utils.empty import (
     empty,
 )
@@ -117,9 +136,15 @@ from bubble.providers.bub_tester import (
 from bubble.providers.ipc import (
     IPCProvider,
 )
+from bubble.providers.async_ipc import (
+    AsyncIPCProvider,
+)
 from bubble.providers.async_rpc import (
     AsyncHTTPProvider,
 )
+from bubble.providers.pool import (
+    PooledProvider,
+)
 from bubble.providers.rpc import (
     HTTPProvider,
 )
@@ -150,6 +175,26 @@ def get_async_default_modules() -> Dict[str, Union[Type[Module], Sequence[Any]]]
                 "txpool": AsyncNodeTxPool,
             },
         ),
+        "restricting": (AsyncRestricting,),
+        "dpos": (
+            AsyncDPos,
+            {
+                "staking": (AsyncStaking,),
+                "delegate": (AsyncDelegate,),
+                "slashing": (AsyncSlashing,),
+                "reward": (AsyncReward,),
+            },
+        ),
+        "subChain": (
+            AsyncSubChain,
+            {
+                "stakingL2": (AsyncStakingL2,),
+                "bubble": (AsyncBubble,),
+                "bubbleL2": (AsyncBubbleL2,),
+                "temp_private_key": (AsyncTempPrivateKey,),
+            },
+        ),
+        "proposal": (AsyncProposal,),
     }
 
 
@@ -199,7 +244,9 @@ class BaseWeb3:
     IPCProvider = IPCProvider
     EthereumTesterProvider = BubbleTesterProvider
     WebsocketProvider = WebsocketProvider
+    PooledProvider = PooledProvider
     AsyncHTTPProvider = AsyncHTTPProvider
+    AsyncIPCProvider = AsyncIPCProvider
 
     # Managers
     RequestManager = DefaultRequestManager
@@ -209,10 +256,10 @@ class BaseWeb3:
     net: Union[Net, AsyncNet]
     node: Union[Bub, AsyncNode]
 
-    dpos: DPos
-    subChain: SubChain
-    restricting: Restricting
-    proposal: Proposal
+    dpos: Union[DPos, AsyncDPos]
+    subChain: Union[SubChain, AsyncSubChain]
+    restricting: Union[Restricting, AsyncRestricting]
+    proposal: Union[Proposal, AsyncProposal]
 
     # Encoding and Decoding
     @staticmethod
@@ -383,6 +430,10 @@ class AsyncWeb3(BaseWeb3):
     bub: AsyncBub
     net: AsyncNet
     node: AsyncNode
+    dpos: AsyncDPos
+    subChain: AsyncSubChain
+    restricting: AsyncRestricting
+    proposal: AsyncProposal
 
     def __init__(
         self,
@@ -426,6 +477,15 @@ class AsyncWeb3(BaseWeb3):
     async def client_version(self) -> str:
         return await self.manager.coro_request(RPC.web3_clientVersion, [])
 
+    def batch_requests(
+        self, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE
+    ) -> AsyncRequestBatcher:
+        """
+        Collect async module method calls and send them as JSON-RPC batches of up
+        to ``max_batch_size`` requests.
+        """
+        return AsyncRequestBatcher(self, max_batch_size)
+
     @property
     def ens(self) -> Union[AsyncENS, "Empty"]:
         if self._ens is empty:
@@ -446,6 +506,10 @@ class Web3(BaseWeb3):
     bub: Bub
     net: Net
     node: Node
+    dpos: DPos
+    subChain: SubChain
+    restricting: Restricting
+    proposal: Proposal
 
     def __init__(
         self,
@@ -495,6 +559,15 @@ class Web3(BaseWeb3):
     def client_version(self) -> str:
         return self.manager.request_blocking(RPC.web3_clientVersion, [])
 
+    def batch_requests(
+        self, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE
+    ) -> RequestBatcher:
+        """
+        Collect module method calls and send them as JSON-RPC batches of up to
+        ``max_batch_size`` requests.
+        """
+        return RequestBatcher(self, max_batch_size)
+
     @property
     def ens(self) -> Union[ENS, "Empty"]:
         if self._ens is empty:
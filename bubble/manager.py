@@ -1,4 +1,10 @@
+from concurrent.futures import (
+    Future,
+    ThreadPoolExecutor,
+)
+import asyncio
 import logging
+import threading
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -18,12 +24,20 @@ from hexbytes import (
     HexBytes,
 )
 
+from bubble._utils.async_batching import (
+    AsyncBatchCollector,
+)
+from bubble._utils.batching import (
+    BatchCollector,
+    BatchRequestInformation,
+)
 from bubble.datastructures import (
     NamedElementOnion,
 )
 from bubble.exceptions import (
     BadResponseFormat,
     MethodUnavailable,
+    Web3ValidationError,
 )
 from bubble.middleware import (
     abi_middleware,
@@ -120,6 +134,7 @@ class RequestManager:
             )
 
         self.middleware_onion = NamedElementOnion(middlewares)
+        self._batching = threading.local()
 
     w3: Union["AsyncWeb3", "Web3"] = None
     _provider = None
@@ -186,6 +201,74 @@ class RequestManager:
 
         return await request_func(method, params)
 
+    def _make_batch_request(
+        self, requests: Sequence[Tuple[RPCEndpoint, Any]]
+    ) -> List["Future[RPCResponse]"]:
+        provider = cast("BaseProvider", self.provider)
+        # the same middlewares as single requests, the provider routes the requests
+        # of the batch to its collector
+        request_func = provider.request_func(
+            cast("Web3", self.w3), cast(MiddlewareOnion, self.middleware_onion)
+        )
+        collector = BatchCollector(provider, len(requests))
+        self.logger.debug(f"Making batch request. Size: {len(requests)}")
+
+        with ThreadPoolExecutor(max_workers=len(requests) or 1) as executor:
+            response_futures = []
+            for method, params in requests:
+                response_futures.append(
+                    executor.submit(collector.run, request_func, method, params)
+                )
+            collector.dispatch()
+
+        return response_futures
+
+    async def _coro_make_batch_request(
+        self, requests: Sequence[Tuple[RPCEndpoint, Any]]
+    ) -> List["asyncio.Task[RPCResponse]"]:
+        provider = cast("AsyncBaseProvider", self.provider)
+        request_func = await provider.request_func(
+            cast("AsyncWeb3", self.w3),
+            cast(AsyncMiddlewareOnion, self.middleware_onion),
+        )
+        collector = AsyncBatchCollector(provider, len(requests))
+        self.logger.debug(f"Making batch request. Size: {len(requests)}")
+
+        response_tasks = []
+        for method, params in requests:
+            response_tasks.append(
+                asyncio.ensure_future(collector.run(request_func, method, params))
+            )
+        await collector.dispatch()
+        if response_tasks:
+            await asyncio.wait(response_tasks)
+
+        return response_tasks
+
+    @property
+    def is_batching(self) -> bool:
+        return getattr(self._batching, "active", False)
+
+    def capture_batch_request(
+        self,
+        method: RPCEndpoint,
+        params: Any,
+        response_formatters: Tuple[Any, Callable[..., Any], Any],
+    ) -> BatchRequestInformation:
+        """
+        Record the request a module method would have sent while a batch is being
+        built, instead of sending it.
+        """
+        if self._batching.captured is not None:
+            raise Web3ValidationError(
+                "A batched call may only issue a single request, "
+                f"{self._batching.captured.method} was already captured."
+            )
+        self._batching.captured = BatchRequestInformation(
+            method, params, response_formatters
+        )
+        return self._batching.captured
+
     @staticmethod
     def formatted_response(
         response: RPCResponse,
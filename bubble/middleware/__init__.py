@@ -4,6 +4,8 @@ from typing import (
     TYPE_CHECKING,
     Any,
     Callable,
+    Dict,
+    Optional,
     Sequence,
 )
 
@@ -18,7 +20,9 @@ from .abi import (  # noqa: F401
     abi_middleware,
 )
 from .async_cache import (  # noqa: F401
+    _async_finalized_cache_middleware as async_finalized_cache_middleware,
     _async_simple_cache_middleware as async_simple_cache_middleware,
+    async_construct_finalized_cache_middleware,
 )
 from .attrdict import (  # noqa: F401
     async_attrdict_middleware,
@@ -28,18 +32,41 @@ from .buffered_gas_estimate import (  # noqa: F401
     async_buffered_gas_estimate_middleware,
     buffered_gas_estimate_middleware,
 )
+from .call_cache import (  # noqa: F401
+    async_call_cache_middleware,
+    async_construct_call_cache_middleware,
+    call_cache_middleware,
+    construct_call_cache_middleware,
+)
 from .cache import (  # noqa: F401
+    _finalized_cache_middleware as finalized_cache_middleware,
     _latest_block_based_cache_middleware as latest_block_based_cache_middleware,
     _simple_cache_middleware as simple_cache_middleware,
     _time_based_cache_middleware as time_based_cache_middleware,
+    construct_finalized_cache_middleware,
     construct_latest_block_based_cache_middleware,
     construct_simple_cache_middleware,
     construct_time_based_cache_middleware,
 )
+from .coalescing import (  # noqa: F401
+    async_construct_request_coalescing_middleware,
+    async_request_coalescing_middleware,
+    construct_request_coalescing_middleware,
+    request_coalescing_middleware,
+)
+from .epoch_cache import (  # noqa: F401
+    EpochSchedule,
+    async_construct_epoch_cache_middleware,
+    async_epoch_cache_middleware,
+    construct_epoch_cache_middleware,
+    epoch_cache_middleware,
+)
 from .exception_handling import (  # noqa: F401
     construct_exception_handler_middleware,
 )
 from .exception_retry_request import (  # noqa: F401
+    RetryBudget,
+    async_http_retry_request_middleware,
     http_retry_request_middleware,
 )
 from .filter import (  # noqa: F401
@@ -73,6 +100,14 @@ from .normalize_request_parameters import (  # noqa: F401
 from .pythonic import (  # noqa: F401
     pythonic_middleware,
 )
+from .rate_limit import (  # noqa: F401
+    AsyncRequestLimiter,
+    RequestLimiter,
+    async_construct_request_limiting_middleware,
+    async_request_limiting_middleware,
+    construct_request_limiting_middleware,
+    request_limiting_middleware,
+)
 from .signing import (  # noqa: F401
     construct_sign_and_send_raw_middleware,
 )
@@ -105,6 +140,69 @@ def combine_middlewares(
     )
 
 
+def _dispatch_by_method(
+    resolve: Callable[[RPCEndpoint], Callable[..., Any]]
+) -> Callable[[RPCEndpoint, Any], Any]:
+    request_fns: Dict[RPCEndpoint, Callable[..., Any]] = {}
+
+    def request_fn(method: RPCEndpoint, params: Any) -> Any:
+        try:
+            method_request_fn = request_fns[method]
+        except KeyError:
+            method_request_fn = request_fns[method] = resolve(method)
+        return method_request_fn(method, params)
+
+    return request_fn
+
+
+def _same_for_every_method(
+    request_fn: Callable[..., Any]
+) -> Callable[[RPCEndpoint], Callable[..., Any]]:
+    return lambda _method: request_fn
+
+
+def _skip_unless_method_in(
+    request_fn: Callable[..., Any],
+    rpc_methods: Any,
+    resolve_inner: Callable[[RPCEndpoint], Callable[..., Any]],
+) -> Callable[[RPCEndpoint], Callable[..., Any]]:
+    def resolve(method: RPCEndpoint) -> Callable[..., Any]:
+        return request_fn if method in rpc_methods else resolve_inner(method)
+
+    return resolve
+
+
+def combine_middlewares_by_method(
+    middlewares: Sequence[Middleware],
+    w3: "Web3",
+    provider_request_fn: Callable[[RPCEndpoint, Any], Any],
+) -> Callable[..., RPCResponse]:
+    """
+    Returns a callable function which will call the provider.provider_request
+    function wrapped with the middlewares, like ``combine_middlewares``.
+
+    A middleware may declare the RPC methods it acts on as an ``rpc_methods``
+    collection. Requests for other methods then skip it, and requests no
+    middleware acts on go straight to the provider. Each middleware is still
+    constructed once.
+    """
+    resolve: Callable[[RPCEndpoint], Callable[..., Any]] = lambda _: provider_request_fn
+    # the request function of the layers built so far, if it is the same for
+    # every method
+    uniform_fn: Optional[Callable[..., Any]] = provider_request_fn
+    for middleware in reversed(middlewares):
+        inner_fn = uniform_fn or _dispatch_by_method(resolve)
+        request_fn = middleware(inner_fn, w3)
+        rpc_methods = getattr(middleware, "rpc_methods", None)
+        if rpc_methods is None:
+            uniform_fn = request_fn
+            resolve = _same_for_every_method(request_fn)
+        else:
+            uniform_fn = None
+            resolve = _skip_unless_method_in(request_fn, rpc_methods, resolve)
+    return uniform_fn or _dispatch_by_method(resolve)
+
+
 async def async_combine_middlewares(
     middlewares: Sequence[AsyncMiddleware],
     async_w3: "AsyncWeb3",
@@ -122,6 +220,47 @@ async def async_combine_middlewares(
     return accumulator_fn
 
 
+def _async_dispatch_by_method(
+    resolve: Callable[[RPCEndpoint], Callable[..., Any]]
+) -> Callable[[RPCEndpoint, Any], Coroutine[Any, Any, Any]]:
+    request_fns: Dict[RPCEndpoint, Callable[..., Any]] = {}
+
+    async def request_fn(method: RPCEndpoint, params: Any) -> Any:
+        try:
+            method_request_fn = request_fns[method]
+        except KeyError:
+            method_request_fn = request_fns[method] = resolve(method)
+        return await method_request_fn(method, params)
+
+    return request_fn
+
+
+async def async_combine_middlewares_by_method(
+    middlewares: Sequence[AsyncMiddleware],
+    async_w3: "AsyncWeb3",
+    provider_request_fn: Callable[[RPCEndpoint, Any], Any],
+) -> Callable[..., Coroutine[Any, Any, RPCResponse]]:
+    """
+    Returns a callable function which will call the provider.provider_request
+    function wrapped with the middlewares, skipping the middlewares whose
+    ``rpc_methods`` do not include the method requested. See
+    ``combine_middlewares_by_method``.
+    """
+    resolve: Callable[[RPCEndpoint], Callable[..., Any]] = lambda _: provider_request_fn
+    uniform_fn: Optional[Callable[..., Any]] = provider_request_fn
+    for middleware in reversed(middlewares):
+        inner_fn = uniform_fn or _async_dispatch_by_method(resolve)
+        request_fn = await construct_middleware(middleware, inner_fn, async_w3)
+        rpc_methods = getattr(middleware, "rpc_methods", None)
+        if rpc_methods is None:
+            uniform_fn = request_fn
+            resolve = _same_for_every_method(request_fn)
+        else:
+            uniform_fn = None
+            resolve = _skip_unless_method_in(request_fn, rpc_methods, resolve)
+    return uniform_fn or _async_dispatch_by_method(resolve)
+
+
 async def construct_middleware(
     async_middleware: AsyncMiddleware,
     fn: Callable[..., RPCResponse],
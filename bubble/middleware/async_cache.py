@@ -1,7 +1,3 @@
-from concurrent.futures import (
-    ThreadPoolExecutor,
-)
-import threading
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -9,15 +5,18 @@ from typing import (
     Collection,
 )
 
-from bubble._utils.async_caching import (
-    async_lock,
+from bubble._utils.batching import (
+    outside_batch,
 )
 from bubble._utils.caching import (
     generate_cache_key,
 )
 from bubble.middleware.cache import (
+    FINALIZED_CACHE_RPC_WHITELIST,
     SIMPLE_CACHE_RPC_WHITELIST,
+    _FinalizedCacheIndex,
     _should_cache_response,
+    logger,
 )
 from bubble.types import (
     AsyncMiddleware,
@@ -27,7 +26,7 @@ from bubble.types import (
     RPCResponse,
 )
 from bubble.utils.caching import (
-    SimpleCache,
+    LRUCache,
 )
 
 if TYPE_CHECKING:
@@ -36,11 +35,8 @@ if TYPE_CHECKING:
         Web3,
     )
 
-_async_request_thread_pool = ThreadPoolExecutor()
-
-
 async def async_construct_simple_cache_middleware(
-    cache: SimpleCache = None,
+    cache: LRUCache = None,
     rpc_whitelist: Collection[RPCEndpoint] = SIMPLE_CACHE_RPC_WHITELIST,
     should_cache_fn: Callable[
         [RPCEndpoint, Any, RPCResponse], bool
@@ -50,39 +46,36 @@ async def async_construct_simple_cache_middleware(
     Constructs a middleware which caches responses based on the request
     ``method`` and ``params``
 
-    :param cache: A ``SimpleCache`` class.
+    :param cache: A ``LRUCache``, or any cache with the same interface such as a
+        ``SimpleCache``. Entries are shared by all threads and tasks.
     :param rpc_whitelist: A set of RPC methods which may have their responses cached.
     :param should_cache_fn: A callable which accepts ``method`` ``params`` and
         ``response`` and returns a boolean as to whether the response should be
         cached.
     """
     if cache is None:
-        cache = SimpleCache(256)
+        cache = LRUCache(256)
 
     async def async_simple_cache_middleware(
         make_request: Callable[[RPCEndpoint, Any], Any], _async_w3: "AsyncWeb3"
     ) -> AsyncMiddlewareCoroutine:
-        lock = threading.Lock()
-
         async def middleware(method: RPCEndpoint, params: Any) -> RPCResponse:
             if method in rpc_whitelist:
-                cache_key = generate_cache_key(
-                    f"{threading.get_ident()}:{(method, params)}"
-                )
+                cache_key = generate_cache_key((method, params))
                 cached_request = cache.get_cache_entry(cache_key)
                 if cached_request is not None:
                     return cached_request
 
                 response = await make_request(method, params)
                 if should_cache_fn(method, params, response):
-                    async with async_lock(_async_request_thread_pool, lock):
-                        cache.cache(cache_key, response)
+                    cache.cache(cache_key, response)
                 return response
             else:
                 return await make_request(method, params)
 
         return middleware
 
+    async_simple_cache_middleware.rpc_methods = rpc_whitelist  # type: ignore
     return async_simple_cache_middleware
 
 
@@ -91,3 +84,89 @@ async def _async_simple_cache_middleware(
 ) -> Middleware:
     middleware = await async_construct_simple_cache_middleware()
     return await middleware(make_request, async_w3)
+
+
+async def async_construct_finalized_cache_middleware(
+    cache: LRUCache = None,
+    finality_depth: int = 20,
+    rpc_whitelist: Collection[RPCEndpoint] = FINALIZED_CACHE_RPC_WHITELIST,
+    head_refresh_interval: float = 2,
+) -> AsyncMiddleware:
+    """
+    Constructs a middleware which caches the responses about blocks at least
+    ``finality_depth`` blocks below the chain head, such as blocks, transactions
+    and receipts, and the logs of block ranges.
+
+    Requests for ``latest`` and the other moving block identifiers are never
+    cached. The middleware compares the hash and parent hash of every block it sees
+    with the ones it saw before for the same numbers, and evicts the responses
+    about the blocks of a reorganized branch. A request during which the head
+    cannot be refreshed bypasses the cache.
+
+    :param cache: A ``LRUCache``, or any cache with the same interface such as a
+        ``SimpleCache``.
+    :param finality_depth: The number of blocks a block has to be below the head
+        before responses about it are cached.
+    :param rpc_whitelist: A set of RPC methods which may have their responses cached.
+    :param head_refresh_interval: The number of seconds between requests for the
+        latest block, which tell the chain head and show reorgs.
+    """
+    if cache is None:
+        cache = LRUCache(256)
+    if finality_depth < 0:
+        raise ValueError("finality_depth must not be negative")
+
+    async def async_finalized_cache_middleware(
+        make_request: Callable[[RPCEndpoint, Any], Any], _async_w3: "AsyncWeb3"
+    ) -> AsyncMiddlewareCoroutine:
+        index = _FinalizedCacheIndex(cache, finality_depth, head_refresh_interval)
+
+        async def _refresh_head() -> bool:
+            if not index.start_head_refresh():
+                return True
+            steps = index.refresh_head()
+            try:
+                block_identifier = next(steps)
+                while True:
+                    # not in the place of the request of a batch being handled
+                    with outside_batch():
+                        response = await make_request(
+                            RPCEndpoint("bub_getBlockByNumber"),
+                            [block_identifier, False],
+                        )
+                    block_identifier = steps.send(response.get("result"))
+            except StopIteration:
+                return True
+            except Exception as exc:
+                logger.warning(f"Refreshing the chain head failed: {exc!r}")
+                return False
+            finally:
+                index.finish_head_refresh()
+
+        async def middleware(method: RPCEndpoint, params: Any) -> RPCResponse:
+            if method not in rpc_whitelist:
+                return await make_request(method, params)
+            if not await _refresh_head():
+                return await make_request(method, params)
+
+            cache_key, block_number, cached_response = index.lookup(method, params)
+            if cached_response is not None:
+                return cached_response
+            reorgs = index.reorgs
+            response = await make_request(method, params)
+            index.record_response(
+                method, params, response, cache_key, block_number, reorgs
+            )
+            return response
+
+        return middleware
+
+    async_finalized_cache_middleware.rpc_methods = rpc_whitelist  # type: ignore
+    return async_finalized_cache_middleware
+
+
+async def _async_finalized_cache_middleware(
+    make_request: Callable[[RPCEndpoint, Any], Any], async_w3: "AsyncWeb3"
+) -> Middleware:
+    middleware = await async_construct_finalized_cache_middleware()
+    return await middleware(make_request, async_w3)
@@ -71,3 +71,9 @@ async def async_node_poa_middleware(
         },
     )
     return await middleware(make_request, w3)
+
+
+async_node_poa_middleware.rpc_methods = {  # type: ignore
+    RPC.bub_getBlockByHash,
+    RPC.bub_getBlockByNumber,
+}
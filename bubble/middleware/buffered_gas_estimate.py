@@ -45,6 +45,9 @@ def buffered_gas_estimate_middleware(
     return middleware
 
 
+buffered_gas_estimate_middleware.rpc_methods = {"bub_sendTransaction"}  # type: ignore
+
+
 async def async_buffered_gas_estimate_middleware(
     make_request: Callable[[RPCEndpoint, Any], Any], w3: "AsyncWeb3"
 ) -> AsyncMiddlewareCoroutine:
@@ -58,3 +61,8 @@ async def async_buffered_gas_estimate_middleware(
         return await make_request(method, params)
 
     return middleware
+
+
+async_buffered_gas_estimate_middleware.rpc_methods = {  # type: ignore
+    "bub_sendTransaction"
+}
@@ -1,4 +1,8 @@
+from collections import (
+    OrderedDict,
+)
 import functools
+import logging
 import threading
 import time
 from typing import (
@@ -7,15 +11,25 @@ from typing import (
     Callable,
     Collection,
     Dict,
+    Generator,
+    Mapping,
+    Optional,
     Set,
+    Tuple,
     cast,
 )
 
 from eth_utils import (
     is_list_like,
 )
+from hexbytes import (
+    HexBytes,
+)
 import lru
 
+from bubble._utils.batching import (
+    outside_batch,
+)
 from bubble._utils.caching import (
     generate_cache_key,
 )
@@ -31,12 +45,14 @@ from bubble.types import (
     RPCResponse,
 )
 from bubble.utils.caching import (
-    SimpleCache,
+    LRUCache,
 )
 
 if TYPE_CHECKING:
     from bubble import Web3  # noqa: F401
 
+logger = logging.getLogger("bubble.middleware.cache")
+
 SIMPLE_CACHE_RPC_WHITELIST = cast(
     Set[RPCEndpoint],
     (
@@ -65,7 +81,7 @@ def _should_cache_response(
 
 
 def construct_simple_cache_middleware(
-    cache: SimpleCache = None,
+    cache: LRUCache = None,
     rpc_whitelist: Collection[RPCEndpoint] = None,
     should_cache_fn: Callable[
         [RPCEndpoint, Any, RPCResponse], bool
@@ -75,14 +91,15 @@ def construct_simple_cache_middleware(
     Constructs a middleware which caches responses based on the request
     ``method`` and ``params``
 
-    :param cache: A ``SimpleCache`` class.
+    :param cache: A ``LRUCache``, or any cache with the same interface such as a
+        ``SimpleCache``. Entries are shared by all threads.
     :param rpc_whitelist: A set of RPC methods which may have their responses cached.
     :param should_cache_fn: A callable which accepts ``method`` ``params`` and
         ``response`` and returns a boolean as to whether the response should be
         cached.
     """
     if cache is None:
-        cache = SimpleCache(256)
+        cache = LRUCache(256)
 
     if rpc_whitelist is None:
         rpc_whitelist = SIMPLE_CACHE_RPC_WHITELIST
@@ -90,30 +107,23 @@ def construct_simple_cache_middleware(
     def simple_cache_middleware(
         make_request: Callable[[RPCEndpoint, Any], RPCResponse], _w3: "Web3"
     ) -> Callable[[RPCEndpoint, Any], RPCResponse]:
-        lock = threading.Lock()
-
         def middleware(method: RPCEndpoint, params: Any) -> RPCResponse:
             if method in rpc_whitelist:
-                cache_key = generate_cache_key(
-                    f"{threading.get_ident()}:{(method, params)}"
-                )
+                cache_key = generate_cache_key((method, params))
                 cached_request = cache.get_cache_entry(cache_key)
                 if cached_request is not None:
                     return cached_request
 
                 response = make_request(method, params)
                 if should_cache_fn(method, params, response):
-                    lock.acquire(blocking=False)
-                    try:
-                        cache.cache(cache_key, response)
-                    finally:
-                        lock.release()
+                    cache.cache(cache_key, response)
                 return response
             else:
                 return make_request(method, params)
 
         return middleware
 
+    simple_cache_middleware.rpc_methods = rpc_whitelist  # type: ignore
     return simple_cache_middleware
 
 
@@ -369,3 +379,409 @@ _latest_block_based_cache_middleware = construct_latest_block_based_cache_middle
     cache_class=functools.partial(lru.LRU, 256),
     rpc_whitelist=BLOCK_NUMBER_RPC_WHITELIST,
 )
+
+
+FINALIZED_CACHE_RPC_WHITELIST = cast(
+    Set[RPCEndpoint],
+    {
+        "bub_getBlockByNumber",
+        "bub_getBlockByHash",
+        "bub_getBlockTransactionCountByNumber",
+        "bub_getTransactionByBlockNumberAndIndex",
+        "bub_getTransactionByBlockHashAndIndex",
+        "bub_getTransactionByHash",
+        "bub_getTransactionReceipt",
+        "bub_getLogs",
+    },
+)
+
+# methods whose first param is the block number the response depends on
+_BLOCK_NUMBER_PARAM_METHODS = {
+    "bub_getBlockByNumber",
+    "bub_getBlockTransactionCountByNumber",
+    "bub_getTransactionByBlockNumberAndIndex",
+    "bub_getUncleCountByBlockNumber",
+    "bub_getUncleByBlockNumberAndIndex",
+}
+
+_NUMBER_KEYED_METHODS = _BLOCK_NUMBER_PARAM_METHODS | {"bub_getLogs"}
+
+_BLOCK_METHODS = {"bub_getBlockByNumber", "bub_getBlockByHash"}
+
+
+def _to_block_number(value: Any) -> Optional[int]:
+    """
+    Return the block number of an integer or hex string, 0 for ``earliest`` and
+    None for the other block identifiers, which move with the chain.
+    """
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    elif isinstance(value, str):
+        if value == "earliest":
+            return 0
+        elif value.startswith("0x"):
+            try:
+                return int(value, 16)
+            except ValueError:
+                return None
+    return None
+
+
+def _requested_block_number(method: RPCEndpoint, params: Any) -> Optional[int]:
+    """
+    The block a number-keyed request depends on, known before it is sent.
+    """
+    if not is_list_like(params) or not params:
+        return None
+    elif method in _BLOCK_NUMBER_PARAM_METHODS:
+        return _to_block_number(params[0])
+    elif method == "bub_getLogs":
+        filter_params = params[0]
+        if not isinstance(filter_params, Mapping) or "blockHash" in filter_params:
+            return None
+        from_block = _to_block_number(filter_params.get("fromBlock", "latest"))
+        to_block = _to_block_number(filter_params.get("toBlock", "latest"))
+        if from_block is None or to_block is None:
+            return None
+        # the logs of a range depend on its last block and, through the parent
+        # hashes, on every block before it
+        return max(from_block, to_block)
+    return None
+
+
+def _response_block_number(method: RPCEndpoint, response: RPCResponse) -> Optional[int]:
+    """
+    The block a hash-keyed response depends on, None while it is still pending.
+    """
+    result = response.get("result")
+    if not isinstance(result, Mapping):
+        return None
+    elif method == "bub_getBlockByHash":
+        return _to_block_number(result.get("number"))
+    return _to_block_number(result.get("blockNumber"))
+
+
+class _FinalizedCacheIndex:
+    """
+    Tracks the chain head and the hashes of the blocks seen by a finalized cache
+    middleware, and the cache keys of the responses depending on each block, so
+    that the responses can be evicted when their block is reorganized.
+
+    It makes no requests itself: the sync and async middlewares drive
+    ``refresh_head`` and send their requests between ``lookup`` and
+    ``record_response``.
+    """
+
+    # the number of block hashes remembered to detect reorgs
+    max_block_hashes = 4096
+
+    def __init__(
+        self, cache: LRUCache, finality_depth: int, head_refresh_interval: float
+    ) -> None:
+        self.cache = cache
+        self.finality_depth = finality_depth
+        self.head_refresh_interval = head_refresh_interval
+        self.head: Optional[int] = None
+        # incremented by every reorg, so that responses to requests sent before
+        # it are not cached
+        self.reorgs = 0
+        self._head_updated_at = float("-inf")
+        self._refreshing = False
+        self._checkpoint: Optional[int] = None
+        self._hashes: "OrderedDict[int, HexBytes]" = OrderedDict()
+        self._keys_by_block: Dict[int, Set[str]] = {}
+        self._block_by_key: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def is_final(self, block_number: Optional[int]) -> bool:
+        head = self.head
+        return (
+            block_number is not None
+            and head is not None
+            and block_number <= head - self.finality_depth
+        )
+
+    def start_head_refresh(self) -> bool:
+        """
+        Return True if the calling request should refresh the chain head. Only one
+        request refreshes it at a time, the others go on with the known head.
+        """
+        with self._lock:
+            if (
+                self._refreshing
+                or time.monotonic() - self._head_updated_at < self.head_refresh_interval
+            ):
+                return False
+            self._refreshing = True
+            return True
+
+    def finish_head_refresh(self) -> None:
+        with self._lock:
+            self._head_updated_at = time.monotonic()
+            self._refreshing = False
+
+    def refresh_head(self) -> Generator[str, Any, None]:
+        """
+        Refresh the chain head, and find where the chain was reorganized if it was.
+        Yields the identifiers of the blocks to request, and is sent each block.
+        """
+        reorged_from = self.observe_block((yield "latest"))
+        checkpoint = self.take_checkpoint()
+        if reorged_from is None and checkpoint is not None:
+            reorged_from = self.observe_block((yield hex(checkpoint)))
+        if reorged_from is None:
+            return
+        # walk back to the highest recorded block still on the chain
+        block_number = self.highest_recorded_below(reorged_from)
+        while block_number is not None:
+            if self.verify_block(block_number, (yield hex(block_number))):
+                break
+            block_number = self.highest_recorded_below(block_number)
+        else:
+            # no common ancestor is known, evict everything
+            self.invalidate_from(0)
+
+    def lookup(
+        self, method: RPCEndpoint, params: Any
+    ) -> Tuple[Optional[str], Optional[int], Optional[RPCResponse]]:
+        """
+        Return the cache key of a request, or None if it must not be cached, the
+        block it depends on if known before it is sent, and its cached response.
+        """
+        if method in _NUMBER_KEYED_METHODS:
+            # moving block identifiers and recent blocks are never cached
+            block_number = _requested_block_number(method, params)
+            if not self.is_final(block_number):
+                return None, block_number, None
+        else:
+            block_number = None
+
+        cache_key = generate_cache_key((method, params))
+        return cache_key, block_number, self.cache.get_cache_entry(cache_key)
+
+    def record_response(
+        self,
+        method: RPCEndpoint,
+        params: Any,
+        response: RPCResponse,
+        cache_key: Optional[str],
+        block_number: Optional[int],
+        reorgs: int,
+    ) -> None:
+        """
+        Cache the response of a request sent when ``reorgs`` reorgs were seen, if
+        its block is final, and observe the block it returns.
+        """
+        if cache_key is not None:
+            if block_number is None:
+                block_number = _response_block_number(method, response)
+            if _should_cache_response(method, params, response) and self.is_final(
+                block_number
+            ):
+                self.store(cache_key, cast(int, block_number), response, reorgs)
+
+        if method in _BLOCK_METHODS and "result" in response:
+            self.observe_block(response["result"])
+
+    def take_checkpoint(self) -> Optional[int]:
+        """
+        Return the head of the previous refresh if it has to be re-validated,
+        because the latest block is not its direct child, and remember the head.
+        """
+        with self._lock:
+            checkpoint, self._checkpoint = self._checkpoint, self.head
+            if (
+                checkpoint is None
+                or self.head is None
+                or checkpoint in (self.head, self.head - 1)
+                or checkpoint not in self._hashes
+            ):
+                return None
+            return checkpoint
+
+    def highest_recorded_below(self, block_number: int) -> Optional[int]:
+        with self._lock:
+            return max((n for n in self._hashes if n < block_number), default=None)
+
+    def observe_block(self, block: Any) -> Optional[int]:
+        """
+        Record the hash and parent hash of a block. If either differs from the hash
+        recorded for its number, the chain was reorganized: the responses cached for
+        that block and the blocks after it are evicted, and the lowest evicted block
+        number is returned.
+        """
+        if not isinstance(block, Mapping):
+            return None
+        number = _to_block_number(block.get("number"))
+        if number is None or block.get("hash") is None:
+            return None
+        block_hash = HexBytes(block["hash"])
+        parent_hash = None
+        if number and block.get("parentHash") is not None:
+            parent_hash = HexBytes(block["parentHash"])
+
+        with self._lock:
+            reorged_from = None
+            if self._hashes.get(number, block_hash) != block_hash:
+                reorged_from = number
+            if parent_hash is not None:
+                recorded_parent_hash = self._hashes.get(number - 1)
+                if (
+                    recorded_parent_hash is None and reorged_from is not None
+                ) or recorded_parent_hash not in (None, parent_hash):
+                    # the parent is replaced as well, or may be
+                    reorged_from = number - 1
+            if reorged_from is not None:
+                self._invalidate_from(reorged_from)
+
+            self._record_hash(number, block_hash)
+            if parent_hash is not None:
+                self._record_hash(number - 1, parent_hash)
+            if self.head is None or number > self.head:
+                self.head = number
+            return reorged_from
+
+    def verify_block(self, block_number: int, block: Any) -> bool:
+        """
+        Return True if ``block`` has the hash recorded for ``block_number``.
+        Otherwise evict the responses cached for it and the blocks after it.
+        """
+        block_hash = None
+        if isinstance(block, Mapping) and block.get("hash") is not None:
+            block_hash = HexBytes(block["hash"])
+        with self._lock:
+            if block_hash is not None and self._hashes.get(block_number) == block_hash:
+                return True
+            self._invalidate_from(block_number)
+            if block_hash is not None:
+                self._record_hash(block_number, block_hash)
+            return False
+
+    def invalidate_from(self, block_number: int) -> None:
+        with self._lock:
+            self._invalidate_from(block_number)
+
+    def _record_hash(self, number: int, block_hash: HexBytes) -> None:
+        self._hashes[number] = block_hash
+        self._hashes.move_to_end(number)
+        while len(self._hashes) > self.max_block_hashes:
+            self._hashes.popitem(last=False)
+
+    def _invalidate_from(self, block_number: int) -> None:
+        self.reorgs += 1
+        for number in [n for n in self._hashes if n >= block_number]:
+            del self._hashes[number]
+        for number in [n for n in self._keys_by_block if n >= block_number]:
+            for key in self._keys_by_block.pop(number):
+                del self._block_by_key[key]
+                self.cache.pop(key)
+
+    def store(
+        self, key: str, block_number: int, response: RPCResponse, reorgs: int
+    ) -> None:
+        """
+        Cache the response of a request sent when ``reorgs`` reorgs were seen.
+        """
+        with self._lock:
+            if reorgs != self.reorgs or not self.is_final(block_number):
+                return
+            _, evicted_items = self.cache.cache(key, response)
+            previous = self._block_by_key.get(key)
+            if previous is not None:
+                self._keys_by_block[previous].discard(key)
+            self._block_by_key[key] = block_number
+            self._keys_by_block.setdefault(block_number, set()).add(key)
+            for evicted_key in evicted_items or ():
+                number = self._block_by_key.pop(evicted_key, None)
+                if number is not None:
+                    keys = self._keys_by_block[number]
+                    keys.discard(evicted_key)
+                    if not keys:
+                        del self._keys_by_block[number]
+
+
+def construct_finalized_cache_middleware(
+    cache: LRUCache = None,
+    finality_depth: int = 20,
+    rpc_whitelist: Collection[RPCEndpoint] = FINALIZED_CACHE_RPC_WHITELIST,
+    head_refresh_interval: float = 2,
+) -> Middleware:
+    """
+    Constructs a middleware which caches the responses about blocks at least
+    ``finality_depth`` blocks below the chain head, such as blocks, transactions
+    and receipts, and the logs of block ranges.
+
+    Requests for ``latest`` and the other moving block identifiers are never
+    cached. The middleware compares the hash and parent hash of every block it sees
+    with the ones it saw before for the same numbers, and evicts the responses
+    about the blocks of a reorganized branch. A request during which the head
+    cannot be refreshed bypasses the cache.
+
+    :param cache: A ``LRUCache``, or any cache with the same interface such as a
+        ``SimpleCache``.
+    :param finality_depth: The number of blocks a block has to be below the head
+        before responses about it are cached.
+    :param rpc_whitelist: A set of RPC methods which may have their responses cached.
+    :param head_refresh_interval: The number of seconds between requests for the
+        latest block, which tell the chain head and show reorgs.
+    """
+    if cache is None:
+        cache = LRUCache(256)
+    if finality_depth < 0:
+        raise ValueError("finality_depth must not be negative")
+
+    def finalized_cache_middleware(
+        make_request: Callable[[RPCEndpoint, Any], RPCResponse], _w3: "Web3"
+    ) -> Callable[[RPCEndpoint, Any], RPCResponse]:
+        index = _FinalizedCacheIndex(cache, finality_depth, head_refresh_interval)
+
+        def _refresh_head() -> bool:
+            """
+            Return False if the chain head could not be refreshed.
+            """
+            if not index.start_head_refresh():
+                return True
+            steps = index.refresh_head()
+            try:
+                block_identifier = next(steps)
+                while True:
+                    # not in the place of the request of a batch being handled
+                    with outside_batch():
+                        response = make_request(
+                            RPCEndpoint("bub_getBlockByNumber"),
+                            [block_identifier, False],
+                        )
+                    block_identifier = steps.send(response.get("result"))
+            except StopIteration:
+                return True
+            except Exception as exc:
+                logger.warning(f"Refreshing the chain head failed: {exc!r}")
+                return False
+            finally:
+                index.finish_head_refresh()
+
+        def middleware(method: RPCEndpoint, params: Any) -> RPCResponse:
+            if method not in rpc_whitelist:
+                return make_request(method, params)
+            if not _refresh_head():
+                # the head, and whether the cached responses are still on the
+                # chain, is unknown
+                return make_request(method, params)
+
+            cache_key, block_number, cached_response = index.lookup(method, params)
+            if cached_response is not None:
+                return cached_response
+            reorgs = index.reorgs
+            response = make_request(method, params)
+            index.record_response(
+                method, params, response, cache_key, block_number, reorgs
+            )
+            return response
+
+        return middleware
+
+    finalized_cache_middleware.rpc_methods = rpc_whitelist  # type: ignore
+    return finalized_cache_middleware
+
+
+_finalized_cache_middleware = construct_finalized_cache_middleware()
@@ -0,0 +1,352 @@
+import threading
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+from hexbytes import (
+    HexBytes,
+)
+
+from bubble._utils.batching import (
+    in_batch_request,
+    outside_batch,
+)
+from bubble._utils.caching import (
+    generate_cache_key,
+)
+from bubble.middleware.cache import (
+    _should_cache_response,
+    _to_block_number,
+)
+from bubble.types import (
+    AsyncMiddleware,
+    AsyncMiddlewareCoroutine,
+    Middleware,
+    RPCEndpoint,
+    RPCResponse,
+)
+from bubble.utils.caching import (
+    LRUCache,
+)
+
+if TYPE_CHECKING:
+    from bubble import (  # noqa: F401
+        AsyncWeb3,
+        Web3,
+    )
+
+# (block hash, block identifier to send the call with)
+ResolvedBlock = Tuple[HexBytes, Any]
+
+
+def _block_hash(block_identifier: Any) -> Optional[HexBytes]:
+    if isinstance(block_identifier, (bytes, bytearray)) and len(block_identifier) == 32:
+        return HexBytes(block_identifier)
+    elif (
+        isinstance(block_identifier, str)
+        and len(block_identifier) == 66
+        and block_identifier.startswith("0x")
+    ):
+        try:
+            return HexBytes(block_identifier)
+        except ValueError:
+            return None
+    return None
+
+
+def _block_request(block_identifier: Any) -> Tuple[RPCEndpoint, Any]:
+    if isinstance(block_identifier, int):
+        block_identifier = hex(block_identifier)
+    return RPCEndpoint("bub_getBlockByNumber"), [block_identifier, False]
+
+
+def _parse_block(response: RPCResponse) -> Optional[Tuple[int, HexBytes]]:
+    block = response.get("result")
+    if not isinstance(block, Mapping) or block.get("hash") is None:
+        return None
+    number = _to_block_number(block.get("number"))
+    if number is None:
+        return None
+    return number, HexBytes(block["hash"])
+
+
+class _CallCacheState:
+    """
+    The latest block known to a call cache middleware, and the hashes of the
+    blocks the calls were made against.
+    """
+
+    def __init__(self, latest_block_interval: float, finality_depth: int) -> None:
+        self.latest_block_interval = latest_block_interval
+        self.finality_depth = finality_depth
+        self.head: Optional[Tuple[int, HexBytes]] = None
+        self._head_checked_at = float("-inf")
+        self._refreshing = False
+        self._hashes = LRUCache(1024)
+        self._lock = threading.Lock()
+
+    def start_head_refresh(self) -> bool:
+        """
+        Return True if the calling request should request the latest block. Only
+        one request asks for it at a time, the others go on with the known head.
+        """
+        with self._lock:
+            if self._refreshing or (
+                self.head is not None
+                and time.monotonic() - self._head_checked_at
+                < self.latest_block_interval
+            ):
+                return False
+            self._refreshing = True
+            return True
+
+    def finish_head_refresh(self, response: Optional[RPCResponse]) -> None:
+        block = None if response is None else _parse_block(response)
+        with self._lock:
+            self._refreshing = False
+            if block is not None:
+                self.head = block
+                self._head_checked_at = time.monotonic()
+                self._hashes.cache(str(block[0]), block[1])
+
+    def known_hash(self, block_number: int) -> Optional[HexBytes]:
+        """
+        The hash of a block deep enough below the head not to be reorganized.
+        """
+        if self.head is None or block_number > self.head[0] - self.finality_depth:
+            return None
+        return self._hashes.get_cache_entry(str(block_number))
+
+    def set_hash(self, response: RPCResponse) -> Optional[Tuple[int, HexBytes]]:
+        block = _parse_block(response)
+        if block is not None:
+            self._hashes.cache(str(block[0]), block[1])
+        return block
+
+
+def _call_params(params: Any) -> Optional[Tuple[Mapping[str, Any], Any]]:
+    """
+    The transaction and block identifier of a ``bub_call`` which may be cached.
+    """
+    if not params or not isinstance(params[0], Mapping):
+        return None
+    if len(params) > 2 and params[2]:
+        # a state override makes the result differ from the chain's
+        return None
+    block_identifier = params[1] if len(params) > 1 else "latest"
+    if block_identifier == "pending":
+        return None
+    return params[0], block_identifier
+
+
+def construct_call_cache_middleware(
+    cache: LRUCache = None,
+    latest_block_interval: float = 1.0,
+    finality_depth: int = 20,
+) -> Middleware:
+    """
+    Constructs a middleware which caches the results of ``bub_call`` by the
+    transaction, including its ``to``, ``data`` and ``from``, and the hash of the
+    block the call is made against.
+
+    Calls against ``latest`` are made against the latest block known to the
+    middleware, which is requested again at most every ``latest_block_interval``
+    seconds. Their results are no longer used once a new block arrives.
+
+    Within a batch, the latest block is requested on its own, and a call against
+    a recent block whose hash is not known bypasses the cache rather than request
+    its block.
+
+    :param cache: A ``LRUCache``, or any cache with the same interface.
+    :param latest_block_interval: The number of seconds a latest block is used
+        before the next one is requested. With ``0`` it is requested for every
+        call against ``latest``.
+    :param finality_depth: The number of blocks a block has to be below the latest
+        block before the hash of its number is remembered. The hashes of more
+        recent blocks are requested for every call.
+    """
+    if cache is None:
+        cache = LRUCache(1024)
+
+    def call_cache_middleware(
+        make_request: Callable[[RPCEndpoint, Any], RPCResponse], _w3: "Web3"
+    ) -> Callable[[RPCEndpoint, Any], RPCResponse]:
+        state = _CallCacheState(latest_block_interval, finality_depth)
+
+        def _refresh_head() -> None:
+            if not state.start_head_refresh():
+                return
+            response = None
+            try:
+                # not in the place of the call of a batch being handled
+                with outside_batch():
+                    response = make_request(*_block_request("latest"))
+            finally:
+                state.finish_head_refresh(response)
+
+        def _resolve(block_identifier: Any) -> Optional[ResolvedBlock]:
+            block_hash = _block_hash(block_identifier)
+            if block_hash is not None:
+                return block_hash, block_identifier
+            elif block_identifier in ("latest", None):
+                _refresh_head()
+                head = state.head
+                if head is None:
+                    return None
+                # the call is made against the block its result is cached for
+                return head[1], hex(head[0])
+
+            block_number = _to_block_number(block_identifier)
+            if block_number is not None:
+                _refresh_head()
+                block_hash = state.known_hash(block_number)
+                if block_hash is not None:
+                    return block_hash, block_identifier
+            if in_batch_request():
+                # a request per call for its block would undo the batching
+                return None
+            block = state.set_hash(make_request(*_block_request(block_identifier)))
+            if block is None:
+                return None
+            return block[1], hex(block[0])
+
+        def middleware(method: RPCEndpoint, params: Any) -> RPCResponse:
+            call_params = _call_params(params) if method == "bub_call" else None
+            if call_params is None:
+                return make_request(method, params)
+            transaction, block_identifier = call_params
+            resolved = _resolve(block_identifier)
+            if resolved is None:
+                return make_request(method, params)
+
+            block_hash, block_identifier = resolved
+            cache_key = generate_cache_key((transaction, block_hash))
+            cached_response = cache.get_cache_entry(cache_key)
+            if cached_response is not None:
+                return cached_response
+
+            response = make_request(method, [transaction, block_identifier])
+            if _should_cache_response(method, params, response):
+                cache.cache(cache_key, response)
+            return response
+
+        return middleware
+
+    call_cache_middleware.rpc_methods = {"bub_call"}  # type: ignore
+    return call_cache_middleware
+
+
+call_cache_middleware = construct_call_cache_middleware()
+
+
+# -- async -- #
+
+
+async def async_construct_call_cache_middleware(
+    cache: LRUCache = None,
+    latest_block_interval: float = 1.0,
+    finality_depth: int = 20,
+) -> AsyncMiddleware:
+    """
+    Constructs a middleware which caches the results of ``bub_call`` by the
+    transaction, including its ``to``, ``data`` and ``from``, and the hash of the
+    block the call is made against.
+
+    Calls against ``latest`` are made against the latest block known to the
+    middleware, which is requested again at most every ``latest_block_interval``
+    seconds. Their results are no longer used once a new block arrives.
+
+    Within a batch, the latest block is requested on its own, and a call against
+    a recent block whose hash is not known bypasses the cache rather than request
+    its block.
+
+    :param cache: A ``LRUCache``, or any cache with the same interface.
+    :param latest_block_interval: The number of seconds a latest block is used
+        before the next one is requested. With ``0`` it is requested for every
+        call against ``latest``.
+    :param finality_depth: The number of blocks a block has to be below the latest
+        block before the hash of its number is remembered. The hashes of more
+        recent blocks are requested for every call.
+    """
+    if cache is None:
+        cache = LRUCache(1024)
+
+    async def async_call_cache_middleware(
+        make_request: Callable[[RPCEndpoint, Any], Any], _async_w3: "AsyncWeb3"
+    ) -> AsyncMiddlewareCoroutine:
+        state = _CallCacheState(latest_block_interval, finality_depth)
+
+        async def _refresh_head() -> None:
+            if not state.start_head_refresh():
+                return
+            response = None
+            try:
+                with outside_batch():
+                    response = await make_request(*_block_request("latest"))
+            finally:
+                state.finish_head_refresh(response)
+
+        async def _resolve(block_identifier: Any) -> Optional[ResolvedBlock]:
+            block_hash = _block_hash(block_identifier)
+            if block_hash is not None:
+                return block_hash, block_identifier
+            elif block_identifier in ("latest", None):
+                await _refresh_head()
+                head = state.head
+                if head is None:
+                    return None
+                # the call is made against the block its result is cached for
+                return head[1], hex(head[0])
+
+            block_number = _to_block_number(block_identifier)
+            if block_number is not None:
+                await _refresh_head()
+                block_hash = state.known_hash(block_number)
+                if block_hash is not None:
+                    return block_hash, block_identifier
+            if in_batch_request():
+                return None
+            block = state.set_hash(
+                await make_request(*_block_request(block_identifier))
+            )
+            if block is None:
+                return None
+            return block[1], hex(block[0])
+
+        async def middleware(method: RPCEndpoint, params: Any) -> RPCResponse:
+            call_params = _call_params(params) if method == "bub_call" else None
+            if call_params is None:
+                return await make_request(method, params)
+            transaction, block_identifier = call_params
+            resolved = await _resolve(block_identifier)
+            if resolved is None:
+                return await make_request(method, params)
+
+            block_hash, block_identifier = resolved
+            cache_key = generate_cache_key((transaction, block_hash))
+            cached_response = cache.get_cache_entry(cache_key)
+            if cached_response is not None:
+                return cached_response
+
+            response = await make_request(method, [transaction, block_identifier])
+            if _should_cache_response(method, params, response):
+                cache.cache(cache_key, response)
+            return response
+
+        return middleware
+
+    async_call_cache_middleware.rpc_methods = {"bub_call"}  # type: ignore
+    return async_call_cache_middleware
+
+
+async def async_call_cache_middleware(
+    make_request: Callable[[RPCEndpoint, Any], Any], async_w3: "AsyncWeb3"
+) -> Middleware:
+    middleware = await async_construct_call_cache_middleware()
+    return await middleware(make_request, async_w3)
@@ -0,0 +1,194 @@
+import asyncio
+from concurrent.futures import (
+    Future,
+)
+import threading
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    Optional,
+    Set,
+    cast,
+)
+
+from bubble._utils.batching import (
+    in_batch_request,
+)
+from bubble._utils.caching import (
+    generate_cache_key,
+)
+from bubble.types import (
+    AsyncMiddleware,
+    AsyncMiddlewareCoroutine,
+    Middleware,
+    RPCEndpoint,
+    RPCResponse,
+)
+
+if TYPE_CHECKING:
+    from bubble import (  # noqa: F401
+        AsyncWeb3,
+        Web3,
+    )
+
+COALESCE_RPC_WHITELIST = cast(
+    Set[RPCEndpoint],
+    {
+        "web3_clientVersion",
+        "net_version",
+        "net_listening",
+        "net_peerCount",
+        "bub_protocolVersion",
+        "bub_syncing",
+        "bub_chainId",
+        "bub_gasPrice",
+        "bub_blockNumber",
+        "bub_getBalance",
+        "bub_getStorageAt",
+        "bub_getProof",
+        "bub_getCode",
+        "bub_getBlockByNumber",
+        "bub_getBlockByHash",
+        "bub_getBlockTransactionCountByNumber",
+        "bub_getBlockTransactionCountByHash",
+        "bub_getTransactionByHash",
+        "bub_getTransactionByBlockHashAndIndex",
+        "bub_getTransactionByBlockNumberAndIndex",
+        "bub_getRawTransactionByHash",
+        "bub_getTransactionReceipt",
+        "bub_getTransactionCount",
+        "bub_call",
+        "bub_estimateGas",
+        "bub_getLogs",
+    },
+)
+
+
+def _request_key(method: RPCEndpoint, params: Any) -> Optional[str]:
+    try:
+        return generate_cache_key((method, params))
+    except TypeError:
+        return None
+
+
+def construct_request_coalescing_middleware(
+    rpc_whitelist: Collection[RPCEndpoint] = COALESCE_RPC_WHITELIST,
+) -> Middleware:
+    """
+    Constructs a middleware which sends identical requests made concurrently only
+    once. A request with the same ``method`` and ``params`` as one still in flight
+    waits for that request and returns its response. Nothing is kept once the
+    response arrives.
+
+    The requests of a batch from ``w3.batch_requests()`` are not coalesced.
+
+    :param rpc_whitelist: A set of RPC methods which may be coalesced. Only methods
+        without side effects belong in it.
+    """
+
+    def request_coalescing_middleware(
+        make_request: Callable[[RPCEndpoint, Any], Any], _w3: "Web3"
+    ) -> Callable[[RPCEndpoint, Any], RPCResponse]:
+        lock = threading.Lock()
+        in_flight: Dict[str, "Future[RPCResponse]"] = {}
+
+        def middleware(method: RPCEndpoint, params: Any) -> RPCResponse:
+            if method not in rpc_whitelist or in_batch_request():
+                # a duplicate in a batch would wait on a request the batch has
+                # not sent yet
+                return make_request(method, params)
+            key = _request_key(method, params)
+            if key is None:
+                return make_request(method, params)
+
+            with lock:
+                future = in_flight.get(key)
+                if future is None:
+                    future = in_flight[key] = Future()
+                    is_leader = True
+                else:
+                    is_leader = False
+
+            if not is_leader:
+                return future.result()
+
+            try:
+                response = make_request(method, params)
+            except BaseException as exc:
+                with lock:
+                    del in_flight[key]
+                future.set_exception(exc)
+                raise
+            with lock:
+                del in_flight[key]
+            future.set_result(response)
+            return response
+
+        return middleware
+
+    return request_coalescing_middleware
+
+
+request_coalescing_middleware = construct_request_coalescing_middleware()
+
+
+# -- async -- #
+
+
+async def async_construct_request_coalescing_middleware(
+    rpc_whitelist: Collection[RPCEndpoint] = COALESCE_RPC_WHITELIST,
+) -> AsyncMiddleware:
+    """
+    Constructs a middleware which sends identical requests made concurrently only
+    once. A request with the same ``method`` and ``params`` as one still in flight
+    awaits that request and returns its response. Nothing is kept once the response
+    arrives.
+
+    The shared request runs in its own task. Cancelling one of the callers does not
+    cancel it for the others.
+
+    The requests of a batch from ``w3.batch_requests()`` are not coalesced.
+
+    :param rpc_whitelist: A set of RPC methods which may be coalesced. Only methods
+        without side effects belong in it.
+    """
+
+    async def request_coalescing_middleware(
+        make_request: Callable[[RPCEndpoint, Any], Any], _async_w3: "AsyncWeb3"
+    ) -> AsyncMiddlewareCoroutine:
+        in_flight: Dict[str, "asyncio.Task[RPCResponse]"] = {}
+
+        def _done(key: str, task: "asyncio.Task[RPCResponse]") -> None:
+            if in_flight.get(key) is task:
+                del in_flight[key]
+            if not task.cancelled():
+                # mark the exception as retrieved when every caller was cancelled
+                task.exception()
+
+        async def middleware(method: RPCEndpoint, params: Any) -> RPCResponse:
+            if method not in rpc_whitelist or in_batch_request():
+                return await make_request(method, params)
+            key = _request_key(method, params)
+            if key is None:
+                return await make_request(method, params)
+
+            task = in_flight.get(key)
+            if task is None or task.get_loop() is not asyncio.get_running_loop():
+                task = asyncio.ensure_future(make_request(method, params))
+                in_flight[key] = task
+                task.add_done_callback(lambda t: _done(key, t))
+            return await asyncio.shield(task)
+
+        return middleware
+
+    return request_coalescing_middleware
+
+
+async def async_request_coalescing_middleware(
+    make_request: Callable[[RPCEndpoint, Any], Any], async_w3: "AsyncWeb3"
+) -> Middleware:
+    middleware = await async_construct_request_coalescing_middleware()
+    return await middleware(make_request, async_w3)
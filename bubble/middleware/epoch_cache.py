@@ -0,0 +1,383 @@
+import json
+import threading
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Mapping,
+    Optional,
+)
+
+from hexbytes import (
+    HexBytes,
+)
+import rlp
+
+from bubble._utils.batching import (
+    in_batch_request,
+)
+from bubble._utils.caching import (
+    generate_cache_key,
+)
+from bubble._utils.compat import (
+    Literal,
+)
+from bubble.inner_contract.proposal import (
+    Proposal,
+)
+from bubble.inner_contract.reward import (
+    Reward,
+)
+from bubble.inner_contract.staking import (
+    Staking,
+)
+from bubble.middleware.cache import (
+    _should_cache_response,
+    _to_block_number,
+)
+from bubble.types import (
+    AsyncMiddleware,
+    AsyncMiddlewareCoroutine,
+    FunctionNumber,
+    InnerFunction,
+    Middleware,
+    RPCEndpoint,
+    RPCResponse,
+)
+from bubble.utils.caching import (
+    LRUCache,
+)
+
+if TYPE_CHECKING:
+    from bubble import (  # noqa: F401
+        AsyncWeb3,
+        Web3,
+    )
+
+Scope = Literal["round", "epoch"]
+
+# The inner contract queries whose results only change when a consensus round or
+# a settlement period (epoch) ends.
+EPOCH_SCOPED_FUNCTIONS: Dict[FunctionNumber, Scope] = {
+    InnerFunction.staking_getValidatorList: "round",
+    InnerFunction.staking_getVerifierList: "epoch",
+    InnerFunction.staking_getCandidateList: "epoch",
+    InnerFunction.staking_getBlockReward: "epoch",
+    InnerFunction.staking_getStakingReward: "epoch",
+    InnerFunction.proposal_governParamList: "epoch",
+    InnerFunction.proposal_getGovernParam: "epoch",
+    InnerFunction.reward_getDelegateReward: "epoch",
+}
+
+_INNER_CONTRACT_ADDRESSES = {
+    HexBytes(contract.ADDRESS) for contract in (Staking, Proposal, Reward)
+}
+
+# seconds to wait before asking again for an economic config the node refused
+_SCHEDULE_RETRY_INTERVAL = 60.0
+
+
+class EpochSchedule:
+    """
+    The lengths of the consensus rounds and of the settlement periods (epochs) of
+    the chain, in blocks, and the time between two blocks in seconds.
+
+    A period ends with the block whose number is a multiple of its length, so the
+    state at block ``n`` belongs to the period ``n // length``.
+    """
+
+    def __init__(self, round_blocks: int, epoch_blocks: int, block_time: float) -> None:
+        if round_blocks <= 0 or epoch_blocks <= 0:
+            raise ValueError("round_blocks and epoch_blocks must be positive")
+        if block_time <= 0:
+            raise ValueError("block_time must be positive")
+        self.round_blocks = round_blocks
+        self.epoch_blocks = epoch_blocks
+        self.block_time = block_time
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(round_blocks={self.round_blocks}, "
+            f"epoch_blocks={self.epoch_blocks}, block_time={self.block_time})"
+        )
+
+    @classmethod
+    def from_economic_config(cls, config: Mapping[str, Any]) -> "EpochSchedule":
+        """
+        Derive the schedule from the ``common`` section of the economic config
+        returned by ``debug_economicConfig``.
+        """
+        common = config["common"]
+        per_round_blocks = int(common["perRoundBlocks"])
+        round_blocks = per_round_blocks * int(common["maxConsensusVals"])
+        block_time = int(common["nodeBlockTimeWindow"]) / per_round_blocks
+        rounds_per_epoch = int(
+            int(common["maxEpochMinutes"]) * 60 // (block_time * round_blocks)
+        )
+        return cls(round_blocks, round_blocks * max(rounds_per_epoch, 1), block_time)
+
+    def length(self, scope: Scope) -> int:
+        return self.round_blocks if scope == "round" else self.epoch_blocks
+
+    def period(self, scope: Scope, block_number: int) -> int:
+        return block_number // self.length(scope)
+
+    def next_boundary(self, scope: Scope, block_number: int) -> int:
+        """
+        The number of the first block of the next period.
+        """
+        return (self.period(scope, block_number) + 1) * self.length(scope)
+
+
+def _epoch_scope(method: RPCEndpoint, params: Any) -> Optional[Scope]:
+    """
+    The scope of a ``bub_call`` of an epoch-scoped inner contract function at the
+    latest block, None for any other request.
+    """
+    if method != "bub_call" or not params:
+        return None
+    transaction = params[0]
+    block_identifier = params[1] if len(params) > 1 else "latest"
+    if len(params) > 2 and params[2]:
+        # a state override makes the result differ from the chain's
+        return None
+    if block_identifier not in ("latest", None) or not isinstance(
+        transaction, Mapping
+    ):
+        return None
+    try:
+        if HexBytes(transaction.get("to") or b"") not in _INNER_CONTRACT_ADDRESSES:
+            return None
+        encoded_fid = rlp.decode(HexBytes(transaction.get("data") or b""))[0]
+        fid = int.from_bytes(rlp.decode(encoded_fid), "big")
+    except (rlp.DecodingError, IndexError, TypeError, ValueError):
+        return None
+    return EPOCH_SCOPED_FUNCTIONS.get(FunctionNumber(fid))
+
+
+class _EpochCacheState:
+    """
+    The chain head known to an epoch cache middleware, and when it may have moved
+    into the next round or epoch.
+    """
+
+    def __init__(self, schedule: Optional[EpochSchedule]) -> None:
+        self.schedule = schedule
+        self.derive_schedule = schedule is None
+        self.head: Optional[int] = None
+        self._head_checked_at = float("-inf")
+        self._schedule_checked_at = float("-inf")
+        self._schedule_epoch: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def needs_schedule(self) -> bool:
+        if not self.derive_schedule:
+            return False
+        if self.schedule is not None:
+            # governance may change the economic config from one epoch to the next
+            return (
+                self.head is not None
+                and self.schedule.period("epoch", self.head) != self._schedule_epoch
+            )
+        return time.monotonic() - self._schedule_checked_at > _SCHEDULE_RETRY_INTERVAL
+
+    def set_schedule(self, response: RPCResponse) -> None:
+        self._schedule_checked_at = time.monotonic()
+        result = response.get("result")
+        try:
+            config = json.loads(result) if isinstance(result, (str, bytes)) else result
+            schedule = EpochSchedule.from_economic_config(config)
+        except (KeyError, TypeError, ValueError, ZeroDivisionError):
+            if self.schedule is None:
+                return
+            # keep the schedule in use, and ask again in the next epoch
+            schedule = self.schedule
+        with self._lock:
+            self.schedule = schedule
+            self._schedule_epoch = (
+                schedule.period("epoch", self.head) if self.head is not None else None
+            )
+
+    def needs_head(self, scope: Scope) -> bool:
+        """
+        Whether the chain may have reached the next ``scope`` boundary since the
+        head was last requested, assuming that blocks come at most twice as fast
+        as the block time.
+        """
+        schedule = self.schedule
+        if self.head is None:
+            return True
+        elif schedule is None:
+            # nothing is cached before the schedule is known
+            return False
+        blocks_to_boundary = schedule.next_boundary(scope, self.head) - self.head
+        elapsed = time.monotonic() - self._head_checked_at
+        return elapsed * 2 >= blocks_to_boundary * schedule.block_time
+
+    def set_head(self, response: RPCResponse) -> None:
+        head = _to_block_number(response.get("result"))
+        if head is None:
+            return
+        with self._lock:
+            if self.head is None or head >= self.head:
+                self.head = head
+                self._head_checked_at = time.monotonic()
+
+    def cache_key(self, scope: Scope, params: Any) -> Optional[str]:
+        schedule, head = self.schedule, self.head
+        if schedule is None or head is None:
+            return None
+        transaction = params[0]
+        return generate_cache_key(
+            (
+                transaction.get("to"),
+                transaction.get("data"),
+                transaction.get("from"),
+                scope,
+                schedule.period(scope, head),
+            )
+        )
+
+
+def construct_epoch_cache_middleware(
+    cache: LRUCache = None,
+    schedule: Optional[EpochSchedule] = None,
+) -> Middleware:
+    """
+    Constructs a middleware which caches the results of the inner contract queries
+    in ``EPOCH_SCOPED_FUNCTIONS``, such as the verifier and validator lists, until
+    the end of the consensus round or settlement period (epoch).
+
+    Only the calls against the latest block are cached. The chain head is only
+    requested when the next boundary may have been reached, as estimated from the
+    block time. Within a batch, the calls bypass the cache when the head or the
+    schedule would have to be requested.
+
+    :param cache: A ``LRUCache``, or any cache with the same interface.
+    :param schedule: An ``EpochSchedule``. By default it is derived from the
+        economic config returned by ``debug_economicConfig``, again in every epoch.
+        Nothing is cached while the node refuses it.
+    """
+    if cache is None:
+        cache = LRUCache(256)
+
+    # kept here rather than in each onion the middleware is built into
+    state = _EpochCacheState(schedule)
+
+    def epoch_cache_middleware(
+        make_request: Callable[[RPCEndpoint, Any], RPCResponse], _w3: "Web3"
+    ) -> Callable[[RPCEndpoint, Any], RPCResponse]:
+        def middleware(method: RPCEndpoint, params: Any) -> RPCResponse:
+            scope = _epoch_scope(method, params)
+            if scope is None:
+                return make_request(method, params)
+
+            if in_batch_request():
+                # a request for the head or the schedule would take the place of
+                # the call in the batch
+                if state.needs_head(scope) or state.needs_schedule():
+                    return make_request(method, params)
+            else:
+                if state.needs_head(scope):
+                    state.set_head(make_request(RPCEndpoint("bub_blockNumber"), []))
+                if state.needs_schedule():
+                    state.set_schedule(
+                        make_request(RPCEndpoint("debug_economicConfig"), [])
+                    )
+
+            cache_key = state.cache_key(scope, params)
+            if cache_key is None:
+                return make_request(method, params)
+            cached_response = cache.get_cache_entry(cache_key)
+            if cached_response is not None:
+                return cached_response
+
+            response = make_request(method, params)
+            if _should_cache_response(method, params, response):
+                cache.cache(cache_key, response)
+            return response
+
+        return middleware
+
+    epoch_cache_middleware.rpc_methods = {"bub_call"}  # type: ignore
+    return epoch_cache_middleware
+
+
+epoch_cache_middleware = construct_epoch_cache_middleware()
+
+
+# -- async -- #
+
+
+async def async_construct_epoch_cache_middleware(
+    cache: LRUCache = None,
+    schedule: Optional[EpochSchedule] = None,
+) -> AsyncMiddleware:
+    """
+    Constructs a middleware which caches the results of the inner contract queries
+    in ``EPOCH_SCOPED_FUNCTIONS``, such as the verifier and validator lists, until
+    the end of the consensus round or settlement period (epoch).
+
+    Only the calls against the latest block are cached. The chain head is only
+    requested when the next boundary may have been reached, as estimated from the
+    block time. Within a batch, the calls bypass the cache when the head or the
+    schedule would have to be requested.
+
+    :param cache: A ``LRUCache``, or any cache with the same interface.
+    :param schedule: An ``EpochSchedule``. By default it is derived from the
+        economic config returned by ``debug_economicConfig``, again in every epoch.
+        Nothing is cached while the node refuses it.
+    """
+    if cache is None:
+        cache = LRUCache(256)
+
+    state = _EpochCacheState(schedule)
+
+    async def async_epoch_cache_middleware(
+        make_request: Callable[[RPCEndpoint, Any], Any], _async_w3: "AsyncWeb3"
+    ) -> AsyncMiddlewareCoroutine:
+        async def middleware(method: RPCEndpoint, params: Any) -> RPCResponse:
+            scope = _epoch_scope(method, params)
+            if scope is None:
+                return await make_request(method, params)
+
+            if in_batch_request():
+                # a request for the head or the schedule would take the place of
+                # the call in the batch
+                if state.needs_head(scope) or state.needs_schedule():
+                    return await make_request(method, params)
+            else:
+                if state.needs_head(scope):
+                    state.set_head(
+                        await make_request(RPCEndpoint("bub_blockNumber"), [])
+                    )
+                if state.needs_schedule():
+                    state.set_schedule(
+                        await make_request(RPCEndpoint("debug_economicConfig"), [])
+                    )
+
+            cache_key = state.cache_key(scope, params)
+            if cache_key is None:
+                return await make_request(method, params)
+            cached_response = cache.get_cache_entry(cache_key)
+            if cached_response is not None:
+                return cached_response
+
+            response = await make_request(method, params)
+            if _should_cache_response(method, params, response):
+                cache.cache(cache_key, response)
+            return response
+
+        return middleware
+
+    async_epoch_cache_middleware.rpc_methods = {"bub_call"}  # type: ignore
+    return async_epoch_cache_middleware
+
+
+async def async_epoch_cache_middleware(
+    make_request: Callable[[RPCEndpoint, Any], Any], async_w3: "AsyncWeb3"
+) -> Middleware:
+    middleware = await async_construct_epoch_cache_middleware()
+    return await middleware(make_request, async_w3)
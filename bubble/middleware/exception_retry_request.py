@@ -1,25 +1,52 @@
+import asyncio
+from collections import (
+    deque,
+)
+import random
+import threading
+import time
 from typing import (
     TYPE_CHECKING,
     Any,
     Callable,
     Collection,
+    Deque,
+    List,
+    Optional,
     Type,
+    Union,
 )
 
+from aiohttp import (
+    ClientConnectorError,
+    ClientError,
+)
 from requests.exceptions import (
     ConnectionError,
+    ConnectTimeout,
     HTTPError,
     Timeout,
     TooManyRedirects,
 )
+from urllib3.exceptions import (
+    NewConnectionError,
+)
 
+from bubble._utils.empty import (
+    Empty,
+    empty,
+)
 from bubble.types import (
+    AsyncMiddlewareCoroutine,
     RPCEndpoint,
     RPCResponse,
 )
 
 if TYPE_CHECKING:
-    from bubble import Web3  # noqa: F401
+    from bubble import (  # noqa: F401
+        AsyncWeb3,
+        Web3,
+    )
 
 whitelist = [
     "admin",
@@ -89,25 +116,163 @@ def check_if_retry_on_failure(method: RPCEndpoint) -> bool:
         return False
 
 
+# Whitelisted methods whose requests are not safe to repeat once they may have
+# reached the node, e.g. a transaction resent after a read timeout is refused as
+# already known. They are only retried when the request was never sent.
+non_idempotent_methods = [
+    "bub_sendRawTransaction",
+    "bub_newFilter",
+    "bub_newBlockFilter",
+    "bub_newPendingTransactionFilter",
+    "personal_importRawKey",
+    "personal_newAccount",
+]
+
+
+def check_if_idempotent(method: RPCEndpoint) -> bool:
+    return method not in non_idempotent_methods
+
+
+def _http_request_not_sent(exc: BaseException) -> bool:
+    if isinstance(exc, ConnectTimeout):
+        return True
+    elif isinstance(exc, ConnectionError) and exc.args:
+        # requests wraps urllib3's MaxRetryError, whose reason tells a refused
+        # connection apart from one dropped after the request was written
+        return isinstance(getattr(exc.args[0], "reason", None), NewConnectionError)
+    else:
+        return False
+
+
+def _async_http_request_not_sent(exc: BaseException) -> bool:
+    return isinstance(exc, ClientConnectorError)
+
+
+class RetryBudget:
+    """
+    Caps the share of requests which may be retries, so that a failing node is not
+    met with a storm of retries from every client.
+
+    Over the last ``ttl`` seconds, retries may amount to ``ratio`` of the requests,
+    plus ``min_retries_per_second`` so that clients sending few requests can still
+    retry. The ``requests``, ``retries`` and ``retries_denied`` counters report how
+    the budget is being spent.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.2,
+        min_retries_per_second: float = 1.0,
+        ttl: int = 10,
+    ) -> None:
+        if ratio < 0 or min_retries_per_second < 0 or ttl < 1:
+            raise ValueError(
+                "ratio and min_retries_per_second must not be negative, and ttl "
+                "must be at least one second"
+            )
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.ttl = ttl
+
+        self.requests = 0
+        self.retries = 0
+        self.retries_denied = 0
+        # [second, requests, retries] for each of the last ``ttl`` seconds
+        self._window: Deque[List[int]] = deque()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} requests={self.requests} "
+            f"retries={self.retries} retries_denied={self.retries_denied}>"
+        )
+
+    def _current_slot(self) -> List[int]:
+        second = int(time.monotonic())
+        while self._window and self._window[0][0] <= second - self.ttl:
+            self._window.popleft()
+        if not self._window or self._window[-1][0] != second:
+            self._window.append([second, 0, 0])
+        return self._window[-1]
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+            self._current_slot()[1] += 1
+
+    def try_retry(self) -> bool:
+        """
+        Withdraw a retry from the budget, returning False if it is spent.
+        """
+        with self._lock:
+            slot = self._current_slot()
+            requests = sum(entry[1] for entry in self._window)
+            retries = sum(entry[2] for entry in self._window)
+            allowed = self.ratio * requests + self.min_retries_per_second * self.ttl
+            if retries + 1 > allowed:
+                self.retries_denied += 1
+                return False
+            slot[2] += 1
+            self.retries += 1
+            return True
+
+
+def _backoff(attempt: int, backoff_factor: float, max_backoff: float) -> float:
+    # "full jitter": a uniform delay up to the exponentially growing cap
+    return random.uniform(0, min(max_backoff, backoff_factor * 2**attempt))
+
+
+def _should_retry(
+    method: RPCEndpoint,
+    exc: BaseException,
+    attempt: int,
+    retries: int,
+    request_not_sent: Callable[[BaseException], bool],
+    retry_budget: Optional[RetryBudget],
+) -> bool:
+    if attempt >= retries - 1:
+        return False
+    if not check_if_idempotent(method) and not request_not_sent(exc):
+        return False
+    return retry_budget is None or retry_budget.try_retry()
+
+
 def exception_retry_middleware(
     make_request: Callable[[RPCEndpoint, Any], RPCResponse],
     w3: "Web3",
     errors: Collection[Type[BaseException]],
     retries: int = 5,
+    backoff_factor: float = 0.1,
+    max_backoff: float = 5.0,
+    retry_budget: Union[RetryBudget, None, Empty] = empty,
+    request_not_sent: Callable[[BaseException], bool] = _http_request_not_sent,
 ) -> Callable[[RPCEndpoint, Any], RPCResponse]:
     """
     Creates middleware that retries failed HTTP requests. Is a default
     middleware for HTTPProvider.
+
+    Retries wait for a random delay of up to ``backoff_factor * 2 ** attempt``
+    seconds, capped at ``max_backoff``, and are withdrawn from ``retry_budget``,
+    by default a budget of the middleware's own. Methods in
+    ``non_idempotent_methods`` are only retried if ``request_not_sent`` shows the
+    failed request never reached the node.
     """
+    if retry_budget is empty:
+        retry_budget = RetryBudget()
 
     def middleware(method: RPCEndpoint, params: Any) -> RPCResponse:
+        if retry_budget is not None:
+            retry_budget.record_request()
         if check_if_retry_on_failure(method):
             for i in range(retries):
                 try:
                     return make_request(method, params)
                 # https://github.com/python/mypy/issues/5349
-                except errors:  # type: ignore
-                    if i < retries - 1:
+                except errors as exc:  # type: ignore
+                    if _should_retry(
+                        method, exc, i, retries, request_not_sent, retry_budget
+                    ):
+                        time.sleep(_backoff(i, backoff_factor, max_backoff))
                         continue
                     else:
                         raise
@@ -124,3 +289,54 @@ def http_retry_request_middleware(
     return exception_retry_middleware(
         make_request, w3, (ConnectionError, HTTPError, Timeout, TooManyRedirects)
     )
+
+
+# -- async -- #
+
+
+async def async_exception_retry_middleware(
+    make_request: Callable[[RPCEndpoint, Any], Any],
+    async_w3: "AsyncWeb3",
+    errors: Collection[Type[BaseException]],
+    retries: int = 5,
+    backoff_factor: float = 0.1,
+    max_backoff: float = 5.0,
+    retry_budget: Union[RetryBudget, None, Empty] = empty,
+    request_not_sent: Callable[[BaseException], bool] = _async_http_request_not_sent,
+) -> AsyncMiddlewareCoroutine:
+    """
+    Creates middleware that retries failed HTTP requests, waiting between attempts
+    like ``exception_retry_middleware``.
+    """
+    if retry_budget is empty:
+        retry_budget = RetryBudget()
+
+    async def middleware(method: RPCEndpoint, params: Any) -> RPCResponse:
+        if retry_budget is not None:
+            retry_budget.record_request()
+        if check_if_retry_on_failure(method):
+            for i in range(retries):
+                try:
+                    return await make_request(method, params)
+                # https://github.com/python/mypy/issues/5349
+                except errors as exc:  # type: ignore
+                    if _should_retry(
+                        method, exc, i, retries, request_not_sent, retry_budget
+                    ):
+                        await asyncio.sleep(_backoff(i, backoff_factor, max_backoff))
+                        continue
+                    else:
+                        raise
+            return None
+        else:
+            return await make_request(method, params)
+
+    return middleware
+
+
+async def async_http_retry_request_middleware(
+    make_request: Callable[[RPCEndpoint, Any], Any], async_w3: "AsyncWeb3"
+) -> AsyncMiddlewareCoroutine:
+    return await async_exception_retry_middleware(
+        make_request, async_w3, (ClientError, asyncio.TimeoutError)
+    )
@@ -1,7 +1,11 @@
+from collections import (
+    ChainMap,
+)
 from typing import (
     TYPE_CHECKING,
     Any,
     Callable,
+    Collection,
     Coroutine,
     Optional,
 )
@@ -76,12 +80,32 @@ def construct_formatting_middleware(
             error_formatters=error_formatters or {},
         )
 
-    return construct_web3_formatting_middleware(ignore_web3_in_standard_formatters)
+    return construct_web3_formatting_middleware(
+        ignore_web3_in_standard_formatters,
+        _formatted_methods(request_formatters, result_formatters, error_formatters),
+    )
+
+
+def _formatted_methods(
+    request_formatters: Optional[Formatters],
+    result_formatters: Optional[Formatters],
+    error_formatters: Optional[Formatters],
+) -> Collection[RPCEndpoint]:
+    # a live view, so that formatters added to the dicts later still apply
+    return ChainMap(
+        request_formatters or {}, result_formatters or {}, error_formatters or {}
+    )
 
 
 def construct_web3_formatting_middleware(
     web3_formatters_builder: Callable[["Web3", RPCEndpoint], FormattersDict],
+    rpc_methods: Optional[Collection[RPCEndpoint]] = None,
 ) -> Middleware:
+    """
+    :param rpc_methods: The methods the formatters built may apply to. Requests
+        for other methods skip the middleware. Defaults to every method.
+    """
+
     def formatter_middleware(
         make_request: Callable[[RPCEndpoint, Any], Any],
         w3: "Web3",
@@ -104,6 +128,8 @@ def construct_web3_formatting_middleware(
 
         return middleware
 
+    if rpc_methods is not None:
+        formatter_middleware.rpc_methods = rpc_methods  # type: ignore
     return formatter_middleware
 
 
@@ -126,14 +152,16 @@ async def async_construct_formatting_middleware(
         )
 
     return await async_construct_web3_formatting_middleware(
-        ignore_web3_in_standard_formatters
+        ignore_web3_in_standard_formatters,
+        _formatted_methods(request_formatters, result_formatters, error_formatters),
     )
 
 
 async def async_construct_web3_formatting_middleware(
     async_web3_formatters_builder: Callable[
         ["AsyncWeb3", RPCEndpoint], Coroutine[Any, Any, FormattersDict]
-    ]
+    ],
+    rpc_methods: Optional[Collection[RPCEndpoint]] = None,
 ) -> Callable[
     [Callable[[RPCEndpoint, Any], Any], "AsyncWeb3"],
     Coroutine[Any, Any, AsyncMiddlewareCoroutine],
@@ -160,4 +188,6 @@ async def async_construct_web3_formatting_middleware(
 
         return middleware
 
+    if rpc_methods is not None:
+        formatter_middleware.rpc_methods = rpc_methods  # type: ignore
     return formatter_middleware
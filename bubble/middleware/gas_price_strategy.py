@@ -98,6 +98,9 @@ def gas_price_strategy_middleware(
     return middleware
 
 
+gas_price_strategy_middleware.rpc_methods = {"bub_sendTransaction"}  # type: ignore
+
+
 async def async_gas_price_strategy_middleware(
     make_request: Callable[[RPCEndpoint, Any], Any], async_w3: "AsyncWeb3"
 ) -> AsyncMiddlewareCoroutine:
@@ -121,3 +124,8 @@ async def async_gas_price_strategy_middleware(
         return await make_request(method, params)
 
     return middleware
+
+
+async_gas_price_strategy_middleware.rpc_methods = {  # type: ignore
+    "bub_sendTransaction"
+}
@@ -0,0 +1,391 @@
+import asyncio
+from collections import (
+    OrderedDict,
+)
+import threading
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Optional,
+)
+
+from bubble._utils.batching import (
+    in_batch_request,
+)
+from bubble.types import (
+    AsyncMiddleware,
+    AsyncMiddlewareCoroutine,
+    Middleware,
+    RPCEndpoint,
+    RPCResponse,
+)
+
+if TYPE_CHECKING:
+    from bubble import (  # noqa: F401
+        AsyncWeb3,
+        Web3,
+    )
+
+DEFAULT_METHOD_WEIGHTS: Dict[str, float] = {
+    "bub_getLogs": 5,
+    "bub_getFilterLogs": 5,
+}
+
+# JSON-RPC error codes used by nodes and gateways to refuse a request for load
+OVERLOAD_ERROR_CODES = (-32005,)
+
+
+def _is_overload_response(response: RPCResponse) -> bool:
+    error = response.get("error") if isinstance(response, dict) else None
+    if not isinstance(error, dict):
+        return False
+    if error.get("code") in OVERLOAD_ERROR_CODES:
+        return True
+    message = str(error.get("message", "")).lower()
+    return "rate limit" in message or "too many requests" in message
+
+
+class BaseRequestLimiter:
+    """
+    Bounds the load put on a node with a token bucket and an adaptive concurrency
+    limit.
+
+    The token bucket admits ``requests_per_second`` on average, with bursts of up
+    to ``burst``. The concurrency limit bounds the requests in flight. It grows by
+    about one for each ``limit`` requests answered promptly, and is multiplied by
+    ``backoff_ratio`` when a request fails, is refused for load, or takes longer
+    than ``latency_tolerance`` times the usual latency (AIMD).
+
+    Requests count as their method's weight, both in tokens and in concurrency.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: Optional[float] = None,
+        burst: Optional[float] = None,
+        initial_limit: int = 16,
+        min_limit: int = 1,
+        max_limit: int = 256,
+        backoff_ratio: float = 0.5,
+        latency_tolerance: float = 2.0,
+        method_weights: Optional[Dict[str, float]] = None,
+        default_weight: float = 1,
+    ) -> None:
+        if requests_per_second is not None and requests_per_second <= 0:
+            raise ValueError("requests_per_second must be positive")
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError(
+                "The limits must satisfy 1 <= min_limit <= initial_limit <= max_limit"
+            )
+        if not 0 < backoff_ratio < 1:
+            raise ValueError("backoff_ratio must be between 0 and 1")
+        if latency_tolerance <= 1:
+            raise ValueError("latency_tolerance must be greater than 1")
+
+        self.requests_per_second = requests_per_second
+        self.burst = burst or max(requests_per_second or 1, 1)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.method_weights = (
+            DEFAULT_METHOD_WEIGHTS if method_weights is None else method_weights
+        )
+        self.default_weight = default_weight
+
+        self.limit = float(initial_limit)
+        self.in_flight = 0.0
+        self.queue_depth = 0
+        self.tokens = float(self.burst)
+        self.baseline_latency: Optional[float] = None
+        self._last_refill = time.monotonic()
+        self._last_decrease = float("-inf")
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} limit={self.limit:.1f} "
+            f"in_flight={self.in_flight:g} queue_depth={self.queue_depth}>"
+        )
+
+    def weight(self, method: RPCEndpoint) -> float:
+        return self.method_weights.get(method, self.default_weight)
+
+    def _delay(self, weight: float) -> Optional[float]:
+        """
+        Return 0 if a request of ``weight`` may start now, the seconds until enough
+        tokens are available, or None if it has to wait for a request to finish.
+        """
+        # a request heavier than the whole limit may still run alone
+        if self.in_flight and self.in_flight + weight > self.limit:
+            return None
+        if self.requests_per_second is None:
+            return 0
+        now = time.monotonic()
+        self.tokens = min(
+            self.burst,
+            self.tokens + (now - self._last_refill) * self.requests_per_second,
+        )
+        self._last_refill = now
+        needed = min(weight, self.burst)
+        if self.tokens >= needed:
+            return 0
+        return (needed - self.tokens) / self.requests_per_second
+
+    def _start(self, weight: float) -> None:
+        self.in_flight += weight
+        if self.requests_per_second is not None:
+            self.tokens -= min(weight, self.burst)
+
+    def _finish(
+        self, weight: float, started: Optional[float], overloaded: bool
+    ) -> None:
+        if started is None:
+            # the request was abandoned, e.g. cancelled, and says nothing of the node
+            self.in_flight -= weight
+            return
+        now = time.monotonic()
+        latency = now - started
+        congested = (
+            self.baseline_latency is not None
+            and latency > self.latency_tolerance * self.baseline_latency
+        )
+        if overloaded or congested:
+            # back off once per round trip, not once per failed request
+            if started > self._last_decrease:
+                self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+                self._last_decrease = now
+        elif self.in_flight >= self.limit / 2:
+            # only grow a limit that is actually being used
+            self.limit = min(self.max_limit, self.limit + weight / self.limit)
+        if not overloaded:
+            if self.baseline_latency is None:
+                self.baseline_latency = latency
+            else:
+                self.baseline_latency += 0.05 * (latency - self.baseline_latency)
+        self.in_flight -= weight
+
+
+class RequestLimiter(BaseRequestLimiter):
+    """
+    Thread-safe limiter for the ``request_limiting_middleware``.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._condition = threading.Condition()
+
+    def acquire(self, method: RPCEndpoint) -> float:
+        """
+        Block until a request to ``method`` may be sent and return its weight.
+        """
+        weight = self.weight(method)
+        with self._condition:
+            self.queue_depth += 1
+            try:
+                while True:
+                    delay = self._delay(weight)
+                    if delay == 0:
+                        break
+                    self._condition.wait(delay)
+            finally:
+                self.queue_depth -= 1
+            self._start(weight)
+        return weight
+
+    def admit(self, method: RPCEndpoint) -> float:
+        """
+        Count a request to ``method`` against the limits without waiting, and return
+        its weight. The requests which follow wait for it instead.
+        """
+        weight = self.weight(method)
+        with self._condition:
+            # refills the tokens, which may then go negative
+            self._delay(weight)
+            self._start(weight)
+        return weight
+
+    def release(
+        self, weight: float, started: Optional[float], overloaded: bool = False
+    ) -> None:
+        with self._condition:
+            self._finish(weight, started, overloaded)
+            self._condition.notify_all()
+
+
+class AsyncRequestLimiter(BaseRequestLimiter):
+    """
+    Limiter for the ``async_request_limiting_middleware``, shared by the tasks
+    of one event loop.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._waiters: "OrderedDict[asyncio.Future[None], float]" = OrderedDict()
+
+    async def acquire(self, method: RPCEndpoint) -> float:
+        """
+        Wait until a request to ``method`` may be sent and return its weight.
+        """
+        weight = self.weight(method)
+        self.queue_depth += 1
+        try:
+            while True:
+                delay = self._delay(weight)
+                if delay == 0:
+                    break
+                elif delay is not None:
+                    await asyncio.sleep(delay)
+                    continue
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiters[waiter] = weight
+                try:
+                    await waiter
+                except BaseException:
+                    self._waiters.pop(waiter, None)
+                    if waiter.done() and not waiter.cancelled():
+                        # woken up but cancelled before running, pass it on
+                        self._wake_waiters()
+                    raise
+        finally:
+            self.queue_depth -= 1
+        self._start(weight)
+        return weight
+
+    def admit(self, method: RPCEndpoint) -> float:
+        """
+        Count a request to ``method`` against the limits without waiting, and return
+        its weight. The requests which follow wait for it instead.
+        """
+        weight = self.weight(method)
+        # refills the tokens, which may then go negative
+        self._delay(weight)
+        self._start(weight)
+        return weight
+
+    def _wake_waiters(self) -> None:
+        # wake only as many waiters, in order, as the free capacity admits
+        capacity = self.limit - self.in_flight
+        while self._waiters and (capacity > 0 or not self.in_flight):
+            waiter, weight = self._waiters.popitem(last=False)
+            if not waiter.done():
+                waiter.set_result(None)
+                capacity -= weight
+
+    def release(
+        self, weight: float, started: Optional[float], overloaded: bool = False
+    ) -> None:
+        self._finish(weight, started, overloaded)
+        self._wake_waiters()
+
+
+def construct_request_limiting_middleware(
+    limiter: Optional[RequestLimiter] = None,
+) -> Middleware:
+    """
+    Constructs a middleware which holds requests back while the node is loaded,
+    according to a ``RequestLimiter``. Exceptions and responses refusing the
+    request for load, such as HTTP 429 errors, tighten the concurrency limit.
+
+    The requests of a batch from ``w3.batch_requests()`` are not held back. They are
+    counted against the limits, so the requests which follow the batch wait for it.
+
+    :param limiter: A ``RequestLimiter``. Its ``limit`` and ``queue_depth``
+        attributes report the current state. A limiter with the default settings
+        is created here if none is given, shared by every ``Web3`` instance the
+        middleware is added to.
+    """
+    request_limiter = RequestLimiter() if limiter is None else limiter
+
+    def request_limiting_middleware(
+        make_request: Callable[[RPCEndpoint, Any], Any], _w3: "Web3"
+    ) -> Callable[[RPCEndpoint, Any], RPCResponse]:
+        def middleware(method: RPCEndpoint, params: Any) -> RPCResponse:
+            if in_batch_request():
+                # held back, the rest of the batch would wait for it
+                weight = request_limiter.admit(method)
+            else:
+                weight = request_limiter.acquire(method)
+            started = time.monotonic()
+            try:
+                response = make_request(method, params)
+            except Exception:
+                request_limiter.release(weight, started, overloaded=True)
+                raise
+            except BaseException:
+                request_limiter.release(weight, None)
+                raise
+            request_limiter.release(
+                weight, started, overloaded=_is_overload_response(response)
+            )
+            return response
+
+        return middleware
+
+    return request_limiting_middleware
+
+
+def request_limiting_middleware(
+    make_request: Callable[[RPCEndpoint, Any], Any], w3: "Web3"
+) -> Callable[[RPCEndpoint, Any], RPCResponse]:
+    # a limiter of its own for each node, unlike a constructed middleware
+    middleware = construct_request_limiting_middleware()
+    return middleware(make_request, w3)
+
+
+# -- async -- #
+
+
+async def async_construct_request_limiting_middleware(
+    limiter: Optional[AsyncRequestLimiter] = None,
+) -> AsyncMiddleware:
+    """
+    Constructs a middleware which holds requests back while the node is loaded,
+    according to an ``AsyncRequestLimiter``. Exceptions and responses refusing the
+    request for load, such as HTTP 429 errors, tighten the concurrency limit.
+
+    The requests of a batch from ``async_w3.batch_requests()`` are not held back.
+    They are counted against the limits, so the requests which follow the batch
+    wait for it.
+
+    :param limiter: An ``AsyncRequestLimiter``. Its ``limit`` and ``queue_depth``
+        attributes report the current state. A limiter with the default settings
+        is created here if none is given, shared by every ``AsyncWeb3`` instance
+        the middleware is added to.
+    """
+    request_limiter = AsyncRequestLimiter() if limiter is None else limiter
+
+    async def request_limiting_middleware(
+        make_request: Callable[[RPCEndpoint, Any], Any], _async_w3: "AsyncWeb3"
+    ) -> AsyncMiddlewareCoroutine:
+        async def middleware(method: RPCEndpoint, params: Any) -> RPCResponse:
+            if in_batch_request():
+                weight = request_limiter.admit(method)
+            else:
+                weight = await request_limiter.acquire(method)
+            started = time.monotonic()
+            try:
+                response = await make_request(method, params)
+            except Exception:
+                request_limiter.release(weight, started, overloaded=True)
+                raise
+            except BaseException:
+                request_limiter.release(weight, None)
+                raise
+            request_limiter.release(
+                weight, started, overloaded=_is_overload_response(response)
+            )
+            return response
+
+        return middleware
+
+    return request_limiting_middleware
+
+
+async def async_request_limiting_middleware(
+    make_request: Callable[[RPCEndpoint, Any], Any], async_w3: "AsyncWeb3"
+) -> Middleware:
+    middleware = await async_construct_request_limiting_middleware()
+    return await middleware(make_request, async_w3)
@@ -35,6 +35,9 @@ from eth_utils.curried import (
 from eth_utils.toolz import (
     compose,
 )
+from hexbytes import (
+    HexBytes,
+)
 
 from bubble._utils.method_formatters import (
     STANDARD_NORMALIZERS,
@@ -131,6 +134,17 @@ def format_transaction(transaction: TxParams) -> TxParams:
     )
 
 
+def get_raw_transaction(signed_transaction: Any) -> HexBytes:
+    """
+    The raw bytes of a signed transaction, named ``rawTransaction`` before
+    eth-account 0.13 and ``raw_transaction`` since
+    """
+    raw_transaction = getattr(signed_transaction, "raw_transaction", None)
+    if raw_transaction is None:
+        raw_transaction = signed_transaction.rawTransaction
+    return raw_transaction
+
+
 def construct_sign_and_send_raw_middleware(
     private_key_or_account: Union[_PrivateKey, Collection[_PrivateKey]]
 ) -> Middleware:
@@ -166,10 +180,11 @@ def construct_sign_and_send_raw_middleware(
                 return make_request(method, params)
 
             account = accounts[transaction["from"]]
-            raw_tx = account.sign_transaction(transaction).rawTransaction
+            raw_tx = get_raw_transaction(account.sign_transaction(transaction))
 
             return make_request(RPCEndpoint("bub_sendRawTransaction"), [raw_tx])
 
         return middleware
 
+    sign_and_send_raw_middleware.rpc_methods = {"bub_sendTransaction"}  # type: ignore
     return sign_and_send_raw_middleware
@@ -113,6 +113,12 @@ METHODS_TO_VALIDATE = [
     RPC.bub_call,
 ]
 
+VALIDATED_METHODS = {
+    *METHODS_TO_VALIDATE,
+    RPC.bub_getBlockByHash,
+    RPC.bub_getBlockByNumber,
+}
+
 
 def _chain_id_validator(web3_chain_id: int) -> Callable[..., Any]:
     return compose(
@@ -146,7 +152,9 @@ def build_method_validators(w3: "Web3", method: RPCEndpoint) -> FormattersDict:
     return _build_formatters_dict(request_formatters)
 
 
-validation_middleware = construct_web3_formatting_middleware(build_method_validators)
+validation_middleware = construct_web3_formatting_middleware(
+    build_method_validators, VALIDATED_METHODS
+)
 
 
 # -- async --- #
@@ -171,3 +179,6 @@ async def async_validation_middleware(
         async_build_method_validators
     )
     return await middleware(make_request, w3)
+
+
+async_validation_middleware.rpc_methods = VALIDATED_METHODS  # type: ignore
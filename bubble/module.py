@@ -60,6 +60,10 @@ def retrieve_blocking_method_call_fn(
             )
         except _UseExistingFilter as err:
             return LogFilter(bub_module=module, filter_id=err.filter_id)
+        if w3.manager.is_batching:
+            return w3.manager.capture_batch_request(
+                method_str, params, response_formatters
+            )
         (
             result_formatters,
             error_formatters,
@@ -85,6 +89,10 @@ def retrieve_async_method_call_fn(
 
         except _UseExistingFilter as err:
             return AsyncLogFilter(bub_module=module, filter_id=err.filter_id)
+        if async_w3.manager.is_batching:
+            return async_w3.manager.capture_batch_request(
+                method_str, params, response_formatters
+            )
         (
             result_formatters,
             error_formatters,
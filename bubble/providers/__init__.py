@@ -8,6 +8,9 @@ from .base import (  # noqa: F401
 from .ipc import (  # noqa: F401,
     IPCProvider,
 )
+from .async_ipc import (  # noqa: F401,
+    AsyncIPCProvider,
+)
 from .rpc import (  # noqa: F401,
     HTTPProvider,
 )
@@ -17,3 +20,6 @@ from .websocket import (  # noqa: F401,
 from .auto import (  # noqa: F401,
     AutoProvider,
 )
+from .pool import (  # noqa: F401,
+    PooledProvider,
+)
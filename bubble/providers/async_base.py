@@ -1,27 +1,28 @@
+import asyncio
 import itertools
 from typing import (
     TYPE_CHECKING,
     Any,
     Callable,
     Coroutine,
+    List,
+    Optional,
     Sequence,
     Tuple,
     cast,
 )
 
-from eth_utils import (
-    to_bytes,
-    to_text,
-)
-
-from bubble._utils.encoding import (
-    FriendlyJsonSerde,
+from bubble._utils.async_batching import (
+    async_route_to_batch,
 )
 from bubble.exceptions import (
     ProviderConnectionError,
 )
 from bubble.middleware import (
-    async_combine_middlewares,
+    async_combine_middlewares_by_method,
+)
+from bubble.providers.base import (
+    sort_batch_responses,
 )
 from bubble.types import (
     AsyncMiddleware,
@@ -30,6 +31,9 @@ from bubble.types import (
     RPCEndpoint,
     RPCResponse,
 )
+from bubble.utils.json_codecs import (
+    JsonCodec,
+)
 
 if TYPE_CHECKING:
     from bubble import AsyncWeb3  # noqa: F401
@@ -75,37 +79,75 @@ class AsyncBaseProvider:
     async def _generate_request_func(
         self, async_w3: "AsyncWeb3", middlewares: Sequence[AsyncMiddleware]
     ) -> Callable[..., Coroutine[Any, Any, RPCResponse]]:
-        return await async_combine_middlewares(
+        return await async_combine_middlewares_by_method(
             middlewares=middlewares,
             async_w3=async_w3,
-            provider_request_fn=self.make_request,
+            provider_request_fn=async_route_to_batch(self, self.make_request),
         )
 
     async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
         raise NotImplementedError("Providers must implement this method")
 
+    async def make_batch_request(
+        self, requests: Sequence[Tuple[RPCEndpoint, Any]]
+    ) -> List[RPCResponse]:
+        """
+        Send several requests at once and return their responses in request order.
+
+        Providers which cannot send a JSON-RPC batch array fall back to making the
+        requests concurrently.
+        """
+        return list(
+            await asyncio.gather(
+                *(self.make_request(method, params) for method, params in requests)
+            )
+        )
+
     async def is_connected(self, show_traceback: bool = False) -> bool:
         raise NotImplementedError("Providers must implement this method")
 
 
 class AsyncJSONBaseProvider(AsyncBaseProvider):
+    json_codec: JsonCodec = JsonCodec()
+
     def __init__(self) -> None:
         super().__init__()
         self.request_counter = itertools.count()
 
-    def encode_rpc_request(self, method: RPCEndpoint, params: Any) -> bytes:
+    def encode_rpc_request(
+        self, method: RPCEndpoint, params: Any, request_id: Optional[int] = None
+    ) -> bytes:
         rpc_dict = {
             "jsonrpc": "2.0",
             "method": method,
             "params": params or [],
-            "id": next(self.request_counter),
+            "id": next(self.request_counter) if request_id is None else request_id,
         }
-        encoded = FriendlyJsonSerde().json_encode(rpc_dict)
-        return to_bytes(text=encoded)
+        return self.json_codec.encode(rpc_dict)
 
     def decode_rpc_response(self, raw_response: bytes) -> RPCResponse:
-        text_response = to_text(raw_response)
-        return cast(RPCResponse, FriendlyJsonSerde().json_decode(text_response))
+        return cast(RPCResponse, self.json_codec.decode(raw_response))
+
+    def encode_batch_rpc_request(
+        self, requests: Sequence[Tuple[RPCEndpoint, Any]]
+    ) -> Tuple[bytes, List[int]]:
+        rpc_dicts = [
+            {
+                "jsonrpc": "2.0",
+                "method": method,
+                "params": params or [],
+                "id": next(self.request_counter),
+            }
+            for method, params in requests
+        ]
+        encoded = self.json_codec.encode(rpc_dicts)
+        return encoded, [rpc_dict["id"] for rpc_dict in rpc_dicts]
+
+    def decode_batch_rpc_response(
+        self, raw_response: bytes, request_ids: Sequence[int]
+    ) -> List[RPCResponse]:
+        response = cast(Any, self.decode_rpc_response(raw_response))
+        return sort_batch_responses(response, request_ids)
 
     async def is_connected(self, show_traceback: bool = False) -> bool:
         try:
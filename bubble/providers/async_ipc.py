@@ -0,0 +1,205 @@
+import asyncio
+import logging
+from pathlib import (
+    Path,
+)
+import sys
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from bubble._utils.encoding import (
+    JSONStreamSplitter,
+)
+from bubble.exceptions import (
+    ProviderConnectionError,
+)
+from bubble.types import (
+    RPCEndpoint,
+    RPCResponse,
+)
+
+from .async_base import (
+    AsyncJSONBaseProvider,
+)
+from .base import (
+    sort_batch_responses,
+)
+from .ipc import (
+    DEFAULT_IPC_READ_SIZE,
+    get_default_ipc_path,
+)
+
+
+class AsyncIPCProvider(AsyncJSONBaseProvider):
+    """
+    Talks to a node over its IPC socket with asyncio streams.
+
+    One connection is kept open per event loop. Requests are written as soon as
+    they are made, and a reader task matches each response to the waiting request
+    by JSON-RPC ``id``, so any number of requests may be in flight at once.
+    """
+
+    logger = logging.getLogger("bubble.providers.AsyncIPCProvider")
+
+    def __init__(
+        self,
+        ipc_path: Union[str, Path] = None,
+        timeout: int = 10,
+        read_size: int = DEFAULT_IPC_READ_SIZE,
+    ) -> None:
+        if sys.platform == "win32":
+            raise ProviderConnectionError(
+                "AsyncIPCProvider needs unix domain sockets, which asyncio does not "
+                "provide on Windows; use IPCProvider for named pipes"
+            )
+
+        if ipc_path is None:
+            self.ipc_path = get_default_ipc_path()
+        elif isinstance(ipc_path, str) or isinstance(ipc_path, Path):
+            self.ipc_path = str(Path(ipc_path).expanduser().resolve())
+        else:
+            raise TypeError("ipc_path must be of type string or pathlib.Path")
+
+        self.timeout = timeout
+        self.read_size = read_size
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional["asyncio.Task[None]"] = None
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._pending: Dict[Any, "asyncio.Future[Any]"] = {}
+        super().__init__()
+
+    def __str__(self) -> str:
+        return f"<{self.__class__.__name__} {self.ipc_path}>"
+
+    async def _connect(self) -> asyncio.StreamWriter:
+        if not self.ipc_path:
+            raise FileNotFoundError(
+                f"cannot connect to IPC socket at path: {self.ipc_path!r}"
+            )
+        reader, writer = await asyncio.open_unix_connection(
+            self.ipc_path, limit=self.read_size
+        )
+        self._reader_task = asyncio.ensure_future(
+            self._read_responses(reader, writer)
+        )
+        return writer
+
+    def _reset_for_running_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # asyncio streams and locks belong to the loop that created them
+            self._loop = loop
+            self._writer = None
+            self._reader_task = None
+            self._write_lock = asyncio.Lock()
+            self._pending = {}
+
+    async def _read_responses(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        splitter = JSONStreamSplitter()
+        try:
+            while True:
+                chunk = await reader.read(self.read_size)
+                if not chunk:
+                    raise ConnectionResetError(
+                        f"IPC socket at {self.ipc_path!r} was closed by the node"
+                    )
+                for raw_response in splitter.feed(chunk):
+                    self._dispatch(self.decode_rpc_response(raw_response))
+        except asyncio.CancelledError:
+            self._close(writer, ConnectionAbortedError("IPC connection was closed"))
+            raise
+        except Exception as exc:
+            self._close(writer, exc)
+
+    def _dispatch(self, response: Any) -> None:
+        if isinstance(response, list):
+            response_ids = [item.get("id") for item in response]
+        else:
+            response_ids = [response.get("id")]
+
+        future = next(
+            (
+                self._pending[response_id]
+                for response_id in response_ids
+                if response_id in self._pending
+            ),
+            None,
+        )
+        if future is None:
+            self.logger.debug(
+                f"Dropping IPC message with no waiting request: {response}"
+            )
+        elif not future.done():
+            future.set_result(response)
+
+    def _close(self, writer: asyncio.StreamWriter, exc: BaseException) -> None:
+        if self._writer is writer:
+            self._writer = None
+            pending, self._pending = self._pending, {}
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(exc)
+        writer.close()
+
+    async def _send(self, request_ids: Sequence[int], request_data: bytes) -> Any:
+        self._reset_for_running_loop()
+        future: "asyncio.Future[Any]" = asyncio.get_running_loop().create_future()
+        for request_id in request_ids:
+            self._pending[request_id] = future
+
+        try:
+            async with self._write_lock:
+                if self._writer is None:
+                    self._writer = await self._connect()
+                self._writer.write(request_data)
+                await self._writer.drain()
+
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            for request_id in request_ids:
+                if self._pending.get(request_id) is future:
+                    del self._pending[request_id]
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        self.logger.debug(
+            f"Making request IPC. Path: {self.ipc_path}, Method: {method}"
+        )
+        request_id = next(self.request_counter)
+        request_data = self.encode_rpc_request(method, params, request_id)
+        return await self._send([request_id], request_data)
+
+    async def make_batch_request(
+        self, requests: Sequence[Tuple[RPCEndpoint, Any]]
+    ) -> List[RPCResponse]:
+        self.logger.debug(
+            f"Making batch request IPC. Path: {self.ipc_path}, "
+            f"Methods: {[method for method, _params in requests]}"
+        )
+        request_data, request_ids = self.encode_batch_rpc_request(requests)
+        response = await self._send(request_ids, request_data)
+        return sort_batch_responses(response, request_ids)
+
+    async def disconnect(self) -> None:
+        """
+        Close the connection of the running event loop, failing any request that
+        is still waiting for its response.
+        """
+        if self._loop is not asyncio.get_running_loop() or self._writer is None:
+            return
+
+        self._reader_task.cancel()
+        try:
+            await self._reader_task
+        except asyncio.CancelledError:
+            pass
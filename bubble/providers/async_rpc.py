@@ -3,7 +3,9 @@ from typing import (
     Any,
     Dict,
     Iterable,
+    List,
     Optional,
+    Sequence,
     Tuple,
     Union,
 )
@@ -18,6 +20,12 @@ from eth_utils import (
     to_dict,
 )
 
+from bubble._utils.async_batching import (
+    AsyncRequestCoalescer,
+)
+from bubble._utils.batching import (
+    DEFAULT_MAX_BATCH_SIZE,
+)
 from bubble._utils.http import (
     construct_user_agent,
 )
@@ -40,12 +48,20 @@ class AsyncHTTPProvider(AsyncJSONBaseProvider):
     logger = logging.getLogger("bubble.providers.HTTPProvider")
     endpoint_uri = None
     _request_kwargs = None
+    _request_coalescer = None
 
     def __init__(
         self,
         endpoint_uri: Optional[Union[URI, str]] = None,
         request_kwargs: Optional[Any] = None,
+        batch_window: Optional[float] = None,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
     ) -> None:
+        """
+        :param batch_window: when set, requests made concurrently within this many
+            seconds of each other are coalesced into JSON-RPC batch arrays of up to
+            ``max_batch_size`` requests.
+        """
         if endpoint_uri is None:
             self.endpoint_uri = get_default_http_endpoint()
         else:
@@ -53,6 +69,14 @@ class AsyncHTTPProvider(AsyncJSONBaseProvider):
 
         self._request_kwargs = request_kwargs or {}
 
+        if batch_window is not None:
+            self._request_coalescer = AsyncRequestCoalescer(
+                self._make_single_request,
+                self.make_batch_request,
+                batch_window=batch_window,
+                max_batch_size=max_batch_size,
+            )
+
         super().__init__()
 
     async def cache_async_session(self, session: ClientSession) -> ClientSession:
@@ -75,6 +99,13 @@ class AsyncHTTPProvider(AsyncJSONBaseProvider):
         }
 
     async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        if self._request_coalescer is not None:
+            return await self._request_coalescer.make_request(method, params)
+        return await self._make_single_request(method, params)
+
+    async def _make_single_request(
+        self, method: RPCEndpoint, params: Any
+    ) -> RPCResponse:
         self.logger.debug(
             f"Making request HTTP. URI: {self.endpoint_uri}, Method: {method}"
         )
@@ -88,3 +119,21 @@ class AsyncHTTPProvider(AsyncJSONBaseProvider):
             f"Method: {method}, Response: {response}"
         )
         return response
+
+    async def make_batch_request(
+        self, requests: Sequence[Tuple[RPCEndpoint, Any]]
+    ) -> List[RPCResponse]:
+        self.logger.debug(
+            f"Making batch request HTTP. URI: {self.endpoint_uri}, "
+            f"Methods: {[method for method, _params in requests]}"
+        )
+        request_data, request_ids = self.encode_batch_rpc_request(requests)
+        raw_response = await async_make_post_request(
+            self.endpoint_uri, request_data, **self.get_request_kwargs()
+        )
+        responses = self.decode_batch_rpc_response(raw_response, request_ids)
+        self.logger.debug(
+            f"Getting batch response HTTP. URI: {self.endpoint_uri}, "
+            f"Responses: {responses}"
+        )
+        return responses
@@ -3,6 +3,7 @@ from typing import (
     Any,
     Callable,
     Dict,
+    List,
     Optional,
     Sequence,
     Tuple,
@@ -94,6 +95,18 @@ class AutoProvider(BaseProvider):
         except OSError:
             return self._proxy_request(method, params, use_cache=False)
 
+    def make_batch_request(
+        self, requests: Sequence[Tuple[RPCEndpoint, Any]]
+    ) -> List[RPCResponse]:
+        provider = self._get_active_provider(use_cache=True)
+        if provider is None:
+            raise CannotHandleRequest(
+                "Could not discover provider while making batch request: "
+                f"methods:{[method for method, _params in requests]}\n"
+            )
+
+        return provider.make_batch_request(requests)
+
     def is_connected(self, show_traceback: bool = False) -> bool:
         provider = self._get_active_provider(use_cache=True)
         return provider is not None and provider.is_connected(show_traceback)
@@ -3,24 +3,23 @@ from typing import (
     TYPE_CHECKING,
     Any,
     Callable,
+    Dict,
+    List,
+    Optional,
     Sequence,
     Tuple,
     cast,
 )
 
-from eth_utils import (
-    to_bytes,
-    to_text,
-)
-
-from bubble._utils.encoding import (
-    FriendlyJsonSerde,
+from bubble._utils.batching import (
+    route_to_batch,
 )
 from bubble.exceptions import (
+    BadResponseFormat,
     ProviderConnectionError,
 )
 from bubble.middleware import (
-    combine_middlewares,
+    combine_middlewares_by_method,
 )
 from bubble.types import (
     Middleware,
@@ -28,6 +27,9 @@ from bubble.types import (
     RPCEndpoint,
     RPCResponse,
 )
+from bubble.utils.json_codecs import (
+    JsonCodec,
+)
 
 if TYPE_CHECKING:
     from bubble import Web3  # noqa: F401
@@ -77,36 +79,70 @@ class BaseProvider:
     def _generate_request_func(
         self, w3: "Web3", middlewares: Sequence[Middleware]
     ) -> Callable[..., RPCResponse]:
-        return combine_middlewares(
+        return combine_middlewares_by_method(
             middlewares=middlewares,
             w3=w3,
-            provider_request_fn=self.make_request,
+            provider_request_fn=route_to_batch(self, self.make_request),
         )
 
     def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
         raise NotImplementedError("Providers must implement this method")
 
+    def make_batch_request(
+        self, requests: Sequence[Tuple[RPCEndpoint, Any]]
+    ) -> List[RPCResponse]:
+        """
+        Send several requests at once and return their responses in request order.
+
+        Providers which cannot send a JSON-RPC batch array fall back to making one
+        request per item.
+        """
+        return [self.make_request(method, params) for method, params in requests]
+
     def is_connected(self, show_traceback: bool = False) -> bool:
         raise NotImplementedError("Providers must implement this method")
 
 
 class JSONBaseProvider(BaseProvider):
+    json_codec: JsonCodec = JsonCodec()
+
     def __init__(self) -> None:
         self.request_counter = itertools.count()
 
+    def encode_batch_rpc_request(
+        self, requests: Sequence[Tuple[RPCEndpoint, Any]]
+    ) -> Tuple[bytes, List[int]]:
+        rpc_dicts = [
+            {
+                "jsonrpc": "2.0",
+                "method": method,
+                "params": params or [],
+                "id": next(self.request_counter),
+            }
+            for method, params in requests
+        ]
+        encoded = self.json_codec.encode(rpc_dicts)
+        return encoded, [rpc_dict["id"] for rpc_dict in rpc_dicts]
+
+    def decode_batch_rpc_response(
+        self, raw_response: bytes, request_ids: Sequence[int]
+    ) -> List[RPCResponse]:
+        response = cast(Any, self.decode_rpc_response(raw_response))
+        return sort_batch_responses(response, request_ids)
+
     def decode_rpc_response(self, raw_response: bytes) -> RPCResponse:
-        text_response = to_text(raw_response)
-        return cast(RPCResponse, FriendlyJsonSerde().json_decode(text_response))
+        return cast(RPCResponse, self.json_codec.decode(raw_response))
 
-    def encode_rpc_request(self, method: RPCEndpoint, params: Any) -> bytes:
+    def encode_rpc_request(
+        self, method: RPCEndpoint, params: Any, request_id: Optional[int] = None
+    ) -> bytes:
         rpc_dict = {
             "jsonrpc": "2.0",
             "method": method,
             "params": params or [],
-            "id": next(self.request_counter),
+            "id": next(self.request_counter) if request_id is None else request_id,
         }
-        encoded = FriendlyJsonSerde().json_encode(rpc_dict)
-        return to_bytes(text=encoded)
+        return self.json_codec.encode(rpc_dict)
 
     def is_connected(self, show_traceback: bool = False) -> bool:
         try:
@@ -131,3 +167,30 @@ class JSONBaseProvider(BaseProvider):
             if show_traceback:
                 raise ProviderConnectionError(f"Bad jsonrpc version: {response}")
             return False
+
+
+def sort_batch_responses(
+    response: Any, request_ids: Sequence[int]
+) -> List[RPCResponse]:
+    """
+    Match the members of a JSON-RPC batch response with the request ids they
+    answer. Nodes may answer a batch in any order, and answer a batch they refuse
+    as a whole with a single error object.
+    """
+    if isinstance(response, dict):
+        if "error" in response:
+            return [cast(RPCResponse, response)] * len(request_ids)
+        raise BadResponseFormat(
+            f"Expected a list of responses to a batch request, got: {response}"
+        )
+
+    responses_by_id: Dict[Any, RPCResponse] = {
+        item.get("id"): item for item in response
+    }
+    try:
+        return [responses_by_id[request_id] for request_id in request_ids]
+    except KeyError as err:
+        raise BadResponseFormat(
+            f"Batch response is missing the response to request id {err}. "
+            f"The raw response is: {response}"
+        )
@@ -1,5 +1,6 @@
-from json import (
-    JSONDecodeError,
+from concurrent.futures import (
+    Future,
+    TimeoutError as FutureTimeoutError,
 )
 import logging
 import os
@@ -9,16 +10,20 @@ from pathlib import (
 import socket
 import sys
 import threading
-from types import (
-    TracebackType,
-)
 from typing import (
     Any,
+    Callable,
+    Dict,
+    List,
     Optional,
-    Type,
+    Sequence,
+    Tuple,
     Union,
 )
 
+from bubble._utils.encoding import (
+    JSONStreamSplitter,
+)
 from bubble._utils.threads import (
     Timeout,
 )
@@ -29,8 +34,11 @@ from bubble.types import (
 
 from .base import (
     JSONBaseProvider,
+    sort_batch_responses,
 )
 
+DEFAULT_IPC_READ_SIZE = 65536
+
 
 def get_ipc_socket(ipc_path: str, timeout: float = 2.0) -> socket.socket:
     if sys.platform == "win32":
@@ -47,43 +55,236 @@ def get_ipc_socket(ipc_path: str, timeout: float = 2.0) -> socket.socket:
         return sock
 
 
-class PersistantSocket:
-    sock = None
+class MultiplexedIPCConnection:
+    """
+    A persistent IPC socket shared by every thread using the provider.
+
+    Requests are written under a short send lock and are not serialized against
+    each other's responses. A reader thread frames the incoming stream with a
+    ``JSONStreamSplitter`` and resolves the future registered for each response's
+    JSON-RPC ``id``, so any number of requests may be in flight at once.
+    """
+
+    logger = logging.getLogger("bubble.providers.IPCProvider")
 
-    def __init__(self, ipc_path: str) -> None:
+    def __init__(
+        self,
+        ipc_path: str,
+        decode_response: Callable[[bytes], Any],
+        read_size: int = DEFAULT_IPC_READ_SIZE,
+    ) -> None:
         self.ipc_path = ipc_path
+        self.decode_response = decode_response
+        self.read_size = read_size
+        self.sock: Optional[socket.socket] = None
+        self._send_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        # request id -> (socket the request was sent on, response future)
+        self._pending: Dict[Any, Tuple[socket.socket, "Future[Any]"]] = {}
 
-    def __enter__(self) -> socket.socket:
+    def _open(self) -> socket.socket:
         if not self.ipc_path:
             raise FileNotFoundError(
                 f"cannot connect to IPC socket at path: {self.ipc_path!r}"
             )
 
-        if not self.sock:
-            self.sock = self._open()
-        return self.sock
+        sock = get_ipc_socket(self.ipc_path)
+        if hasattr(sock, "settimeout"):
+            # the reader thread blocks until data arrives, request timeouts are
+            # enforced while waiting on the response future instead
+            sock.settimeout(None)
+        reader = threading.Thread(
+            target=self._read_responses,
+            args=(sock,),
+            name=f"ipc-reader-{self.ipc_path}",
+            daemon=True,
+        )
+        reader.start()
+        return sock
+
+    def _get_socket(self) -> socket.socket:
+        with self._state_lock:
+            if self.sock is None:
+                self.sock = self._open()
+            return self.sock
+
+    def _close(self, sock: socket.socket, exc: BaseException) -> None:
+        with self._state_lock:
+            if self.sock is sock:
+                self.sock = None
+            # only fail the requests that were sent on the broken socket
+            pending = [
+                (request_id, future)
+                for request_id, (request_sock, future) in self._pending.items()
+                if request_sock is sock
+            ]
+            for request_id, _future in pending:
+                del self._pending[request_id]
+        try:
+            sock.close()
+        except Exception:
+            pass
+
+        for _request_id, future in pending:
+            if not future.done():
+                future.set_exception(exc)
+
+    def _read_responses(self, sock: socket.socket) -> None:
+        splitter = JSONStreamSplitter()
+        try:
+            while True:
+                try:
+                    chunk = sock.recv(self.read_size)
+                except socket.timeout:
+                    continue
+                if not chunk:
+                    raise ConnectionResetError(
+                        f"IPC socket at {self.ipc_path!r} was closed by the node"
+                    )
+                for raw_response in splitter.feed(chunk):
+                    self._dispatch(self.decode_response(raw_response))
+        except Exception as exc:
+            self._close(sock, exc)
+
+    def _dispatch(self, response: Any) -> None:
+        if isinstance(response, list):
+            # a batch response resolves the future shared by all of its requests
+            response_ids = [item.get("id") for item in response]
+        else:
+            response_ids = [response.get("id")]
+
+        with self._state_lock:
+            future = next(
+                (
+                    self._pending[response_id][1]
+                    for response_id in response_ids
+                    if response_id in self._pending
+                ),
+                None,
+            )
+
+        if future is None:
+            self.logger.debug(
+                f"Dropping IPC message with no waiting request: {response}"
+            )
+        elif not future.done():
+            future.set_result(response)
+
+    def request(
+        self, request_ids: Sequence[int], request_data: bytes, timeout: float
+    ) -> Any:
+        future: "Future[Any]" = Future()
+        try:
+            for attempt in range(2):
+                sock = self._get_socket()
+                with self._state_lock:
+                    for request_id in request_ids:
+                        self._pending[request_id] = (sock, future)
+                try:
+                    with self._send_lock:
+                        sock.sendall(request_data)
+                    break
+                except OSError as exc:
+                    # one extra attempt on a fresh socket, then give up
+                    self._close(sock, exc)
+                    if attempt:
+                        raise
+                    future = Future()
+
+            try:
+                return future.result(timeout)
+            except FutureTimeoutError:
+                raise Timeout(timeout)
+        finally:
+            with self._state_lock:
+                for request_id in request_ids:
+                    if self._pending.get(request_id, (None, None))[1] is future:
+                        del self._pending[request_id]
+
+
+class SerialIPCConnection:
+    """
+    A persistent IPC connection which serves one request at a time, holding a lock
+    for the whole round trip.
 
-    def __exit__(
+    Used on Windows, where the named pipe is a synchronous handle: a read blocked
+    in a reader thread would also block the writes of the ``MultiplexedIPCConnection``.
+    """
+
+    logger = logging.getLogger("bubble.providers.IPCProvider")
+
+    def __init__(
         self,
-        exc_type: Type[BaseException],
-        exc_value: BaseException,
-        traceback: TracebackType,
+        ipc_path: str,
+        decode_response: Callable[[bytes], Any],
+        read_size: int = DEFAULT_IPC_READ_SIZE,
     ) -> None:
-        # only close the socket if there was an error
-        if exc_value is not None:
-            try:
-                self.sock.close()
-            except Exception:
-                pass
-            self.sock = None
+        self.ipc_path = ipc_path
+        self.decode_response = decode_response
+        self.read_size = read_size
+        self.sock: Optional[socket.socket] = None
+        self._splitter = JSONStreamSplitter()
+        self._lock = threading.Lock()
 
     def _open(self) -> socket.socket:
+        if not self.ipc_path:
+            raise FileNotFoundError(
+                f"cannot connect to IPC socket at path: {self.ipc_path!r}"
+            )
+        self._splitter = JSONStreamSplitter()
         return get_ipc_socket(self.ipc_path)
 
-    def reset(self) -> socket.socket:
-        self.sock.close()
-        self.sock = self._open()
-        return self.sock
+    def _close(self) -> None:
+        try:
+            self.sock.close()
+        except Exception:
+            pass
+        self.sock = None
+
+    def _receive(self, request_ids: Sequence[int], timeout: float) -> Any:
+        with Timeout(timeout) as timeout_:
+            while True:
+                try:
+                    chunk = self.sock.recv(self.read_size)
+                except socket.timeout:
+                    timeout_.sleep(0)
+                    continue
+                if not chunk:
+                    raise ConnectionResetError(
+                        f"IPC socket at {self.ipc_path!r} was closed by the node"
+                    )
+                for raw_response in self._splitter.feed(chunk):
+                    response = self.decode_response(raw_response)
+                    # a batch response carries the ids of all of its requests
+                    first = response
+                    if isinstance(response, list) and response:
+                        first = response[0]
+                    if isinstance(first, dict) and first.get("id") in request_ids:
+                        return response
+                    # e.g. the late response of a request which timed out
+                    self.logger.debug(
+                        f"Dropping IPC message with no waiting request: {response}"
+                    )
+                timeout_.sleep(0)
+
+    def request(
+        self, request_ids: Sequence[int], request_data: bytes, timeout: float
+    ) -> Any:
+        with self._lock:
+            if self.sock is None:
+                self.sock = self._open()
+            try:
+                try:
+                    self.sock.sendall(request_data)
+                except OSError:
+                    # one extra attempt on a fresh connection, then give up
+                    self._close()
+                    self.sock = self._open()
+                    self.sock.sendall(request_data)
+                return self._receive(request_ids, timeout)
+            except Exception:
+                self._close()
+                raise
 
 
 def get_default_ipc_path() -> Optional[str]:
@@ -169,8 +370,10 @@ class IPCProvider(JSONBaseProvider):
             raise TypeError("ipc_path must be of type string or pathlib.Path")
 
         self.timeout = timeout
-        self._lock = threading.Lock()
-        self._socket = PersistantSocket(self.ipc_path)
+        connection_class = (
+            SerialIPCConnection if sys.platform == "win32" else MultiplexedIPCConnection
+        )
+        self._socket = connection_class(self.ipc_path, self.decode_rpc_response)
         super().__init__()
 
     def __str__(self) -> str:
@@ -180,44 +383,17 @@ class IPCProvider(JSONBaseProvider):
         self.logger.debug(
             f"Making request IPC. Path: {self.ipc_path}, Method: {method}"
         )
-        request = self.encode_rpc_request(method, params)
+        request_id = next(self.request_counter)
+        request = self.encode_rpc_request(method, params, request_id)
+        return self._socket.request([request_id], request, self.timeout)
 
-        with self._lock, self._socket as sock:
-            try:
-                sock.sendall(request)
-            except BrokenPipeError:
-                # one extra attempt, then give up
-                sock = self._socket.reset()
-                sock.sendall(request)
-
-            raw_response = b""
-            with Timeout(self.timeout) as timeout:
-                while True:
-                    try:
-                        raw_response += sock.recv(4096)
-                    except socket.timeout:
-                        timeout.sleep(0)
-                        continue
-                    if raw_response == b"":
-                        timeout.sleep(0)
-                    elif has_valid_json_rpc_ending(raw_response):
-                        try:
-                            response = self.decode_rpc_response(raw_response)
-                        except JSONDecodeError:
-                            timeout.sleep(0)
-                            continue
-                        else:
-                            return response
-                    else:
-                        timeout.sleep(0)
-                        continue
-
-
-# A valid JSON RPC response can only end in } or ] http://www.jsonrpc.org/specification
-def has_valid_json_rpc_ending(raw_response: bytes) -> bool:
-    stripped_raw_response = raw_response.rstrip()
-    for valid_ending in [b"}", b"]"]:
-        if stripped_raw_response.endswith(valid_ending):
-            return True
-    else:
-        return False
+    def make_batch_request(
+        self, requests: Sequence[Tuple[RPCEndpoint, Any]]
+    ) -> List[RPCResponse]:
+        self.logger.debug(
+            f"Making batch request IPC. Path: {self.ipc_path}, "
+            f"Methods: {[method for method, _params in requests]}"
+        )
+        request_data, request_ids = self.encode_batch_rpc_request(requests)
+        response = self._socket.request(request_ids, request_data, self.timeout)
+        return sort_batch_responses(response, request_ids)
@@ -0,0 +1,577 @@
+from collections import (
+    deque,
+)
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+import itertools
+import logging
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from eth_typing import (
+    URI,
+    HexStr,
+)
+from eth_utils import (
+    to_int,
+)
+
+from bubble._utils.rpc_abi import (
+    RPC,
+)
+from bubble._utils.threads import (
+    Timeout,
+)
+from bubble.exceptions import (
+    CannotHandleRequest,
+    ProviderConnectionError,
+    Web3ValidationError,
+)
+from bubble.middleware.exception_retry_request import (
+    check_if_idempotent,
+    check_if_retry_on_failure,
+)
+from bubble.providers.auto import (
+    load_provider_from_uri,
+)
+from bubble.providers.base import (
+    BaseProvider,
+)
+from bubble.types import (
+    RPCEndpoint,
+    RPCResponse,
+)
+
+TReturn = TypeVar("TReturn")
+
+LEAST_OUTSTANDING = "least_outstanding"
+LATENCY_EWMA = "latency_ewma"
+ROUTING_STRATEGIES = (LEAST_OUTSTANDING, LATENCY_EWMA)
+
+DEFAULT_MAX_BLOCK_LAG = 5
+DEFAULT_MAX_FAILURES = 3
+DEFAULT_PROBE_INTERVAL = 5.0
+DEFAULT_LATENCY_DECAY = 0.3
+DEFAULT_HEDGE_WINDOW = 512
+DEFAULT_HEDGE_MIN_SAMPLES = 20
+DEFAULT_HEDGE_MAX_WORKERS = 32
+DEFAULT_HEDGE_MAX_IN_FLIGHT = 8
+
+# errors raised by a provider when its endpoint could not answer at all, as opposed
+# to a JSON-RPC error response
+ENDPOINT_ERRORS: Tuple[Type[BaseException], ...] = (
+    OSError,
+    ProviderConnectionError,
+    Timeout,
+)
+
+NEW_FILTER_METHODS = {
+    RPC.bub_newFilter,
+    RPC.bub_newBlockFilter,
+    RPC.bub_newPendingTransactionFilter,
+}
+FILTER_METHODS = {
+    RPC.bub_getFilterChanges,
+    RPC.bub_getFilterLogs,
+    RPC.bub_uninstallFilter,
+}
+
+# read-only methods, which may be answered by whichever node responds first
+hedge_whitelist = [
+    "web3_clientVersion",
+    "net_version",
+    "net_listening",
+    "net_peerCount",
+    "bub_protocolVersion",
+    "bub_syncing",
+    "bub_chainId",
+    "bub_gasPrice",
+    "bub_maxPriorityFeePerGas",
+    "bub_feeHistory",
+    "bub_blockNumber",
+    "bub_getBalance",
+    "bub_getStorageAt",
+    "bub_getProof",
+    "bub_getCode",
+    "bub_getBlockByNumber",
+    "bub_getBlockByHash",
+    "bub_getBlockTransactionCountByNumber",
+    "bub_getBlockTransactionCountByHash",
+    "bub_getTransactionByHash",
+    "bub_getTransactionByBlockHashAndIndex",
+    "bub_getTransactionByBlockNumberAndIndex",
+    "bub_getRawTransactionByHash",
+    "bub_getRawTransactionByBlockHashAndIndex",
+    "bub_getRawTransactionByBlockNumberAndIndex",
+    "bub_getTransactionReceipt",
+    "bub_getTransactionCount",
+    "bub_call",
+    "bub_estimateGas",
+    "bub_getLogs",
+]
+
+
+def check_if_hedge_on_delay(method: RPCEndpoint) -> bool:
+    return method in hedge_whitelist
+
+
+def check_if_failover(method: RPCEndpoint) -> bool:
+    # a request which timed out may still have reached the node, e.g. a transaction
+    # resent to another node after a timeout would be sent twice
+    return check_if_retry_on_failure(method) and check_if_idempotent(method)
+
+
+class PoolEndpoint:
+    """
+    Routing and health state of one provider of a ``PooledProvider``.
+    """
+
+    def __init__(self, provider: BaseProvider) -> None:
+        self.provider = provider
+        self.outstanding = 0
+        self.latency: Optional[float] = None
+        self.block_number: Optional[int] = None
+        self.healthy = True
+        # consecutive failures to answer
+        self.failures = 0
+        self.last_error: Optional[BaseException] = None
+
+    def __repr__(self) -> str:
+        state = "healthy" if self.healthy else "ejected"
+        return f"<{self.__class__.__name__} {self.provider} {state}>"
+
+
+class PooledProvider(BaseProvider):
+    """
+    Spreads requests over several providers connected to different nodes.
+
+    Every request goes to the healthy endpoint with the fewest requests in flight,
+    or with the lowest latency EWMA weighted by its requests in flight. An endpoint
+    is ejected when it fails to answer ``max_failures`` requests in a row or falls
+    more than ``max_block_lag`` blocks behind the highest block seen in the pool. A
+    background thread probes every ``probe_interval`` seconds and brings ejected
+    endpoints back once they answer and have caught up.
+
+    Requests for the methods whitelisted by ``exception_retry_middleware`` fail
+    over to the next endpoint when an endpoint cannot be reached, except for those
+    in its ``non_idempotent_methods``. Filter requests always go to the node that
+    created the filter.
+
+    Hedging is enabled by ``hedge_percentile``: a read-only request that has been
+    outstanding for longer than that percentile of the recent latencies of its
+    method is duplicated to a second endpoint, and whichever answer arrives first is
+    used. At most ``hedge_max_in_flight`` duplicates are in flight, and requests are
+    not hedged while every hedging thread is busy.
+    """
+
+    logger = logging.getLogger("bubble.providers.PooledProvider")
+
+    def __init__(
+        self,
+        providers: Sequence[Union[BaseProvider, URI, str]],
+        strategy: str = LEAST_OUTSTANDING,
+        max_block_lag: int = DEFAULT_MAX_BLOCK_LAG,
+        max_failures: int = DEFAULT_MAX_FAILURES,
+        probe_interval: Optional[float] = DEFAULT_PROBE_INTERVAL,
+        latency_decay: float = DEFAULT_LATENCY_DECAY,
+        hedge_percentile: Optional[float] = None,
+        hedge_max_workers: int = DEFAULT_HEDGE_MAX_WORKERS,
+        hedge_max_in_flight: int = DEFAULT_HEDGE_MAX_IN_FLIGHT,
+    ) -> None:
+        if not providers:
+            raise Web3ValidationError("PooledProvider needs at least one provider")
+        if strategy not in ROUTING_STRATEGIES:
+            raise Web3ValidationError(
+                f"Unknown routing strategy {strategy!r}, "
+                f"expected one of {ROUTING_STRATEGIES}"
+            )
+        if max_failures < 1:
+            raise Web3ValidationError("max_failures must be at least 1")
+        if not 0 < latency_decay <= 1:
+            raise Web3ValidationError("latency_decay must be in the range (0, 1]")
+        if hedge_percentile is not None and not 0 < hedge_percentile < 1:
+            raise Web3ValidationError("hedge_percentile must be in the range (0, 1)")
+
+        self.endpoints = tuple(
+            PoolEndpoint(
+                provider
+                if isinstance(provider, BaseProvider)
+                else load_provider_from_uri(URI(provider))
+            )
+            for provider in providers
+        )
+        self.strategy = strategy
+        self.max_block_lag = max_block_lag
+        self.max_failures = max_failures
+        self.probe_interval = probe_interval
+        self.latency_decay = latency_decay
+        self.hedge_percentile = hedge_percentile
+        self.hedge_max_workers = hedge_max_workers
+        self.hedge_max_in_flight = hedge_max_in_flight
+        self.hedges_sent = 0
+        self.hedges_won = 0
+
+        self._lock = threading.Lock()
+        self._rotation = itertools.count()
+        self._filter_endpoints: Dict[HexStr, PoolEndpoint] = {}
+        self._prober: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+        # the recent latencies of each method, or set of methods of a batch
+        self._recent_latencies: Dict[Any, Deque[float]] = {}
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        self._hedge_tasks = 0
+        self._hedges_in_flight = 0
+
+    def __str__(self) -> str:
+        return f"Pool of {[str(endpoint.provider) for endpoint in self.endpoints]}"
+
+    #
+    # Routing
+    #
+    def _routing_cost(self, endpoint: PoolEndpoint) -> Tuple[float, float]:
+        latency = endpoint.latency or 0.0
+        if self.strategy == LATENCY_EWMA:
+            return (latency * (endpoint.outstanding + 1), endpoint.outstanding)
+        return (endpoint.outstanding, latency)
+
+    def _pick(
+        self, tried: Sequence[PoolEndpoint], healthy_only: bool = False
+    ) -> Optional[PoolEndpoint]:
+        untried = [endpoint for endpoint in self.endpoints if endpoint not in tried]
+        # ejected endpoints are only used once every healthy one has failed
+        candidates = [endpoint for endpoint in untried if endpoint.healthy]
+        if not candidates and not healthy_only:
+            candidates = untried
+        if not candidates:
+            return None
+
+        # rotate the candidates so that ties are spread over the pool
+        offset = next(self._rotation) % len(candidates)
+        candidates = candidates[offset:] + candidates[:offset]
+        return min(candidates, key=self._routing_cost)
+
+    def _acquire(self, tried: Sequence[PoolEndpoint]) -> Optional[PoolEndpoint]:
+        with self._lock:
+            endpoint = self._pick(tried)
+            if endpoint is not None:
+                endpoint.outstanding += 1
+            return endpoint
+
+    def _release(
+        self,
+        endpoint: PoolEndpoint,
+        latency: Optional[float] = None,
+        error: Optional[BaseException] = None,
+        latency_key: Any = None,
+    ) -> None:
+        with self._lock:
+            endpoint.outstanding -= 1
+            if error is not None:
+                endpoint.failures += 1
+                endpoint.last_error = error
+                if endpoint.healthy and endpoint.failures >= self.max_failures:
+                    self.logger.warning(f"Ejecting {endpoint.provider}: {error!r}")
+                    endpoint.healthy = False
+                return
+
+            endpoint.failures = 0
+            if latency_key is not None:
+                if latency_key not in self._recent_latencies:
+                    self._recent_latencies[latency_key] = deque(
+                        maxlen=DEFAULT_HEDGE_WINDOW
+                    )
+                self._recent_latencies[latency_key].append(latency)
+            if endpoint.latency is None:
+                endpoint.latency = latency
+            else:
+                endpoint.latency += self.latency_decay * (latency - endpoint.latency)
+
+    def _route(
+        self,
+        send: Callable[[BaseProvider], TReturn],
+        description: str,
+        failover: bool,
+        endpoint: Optional[PoolEndpoint] = None,
+        latency_key: Any = None,
+    ) -> Tuple[PoolEndpoint, TReturn]:
+        self._ensure_prober()
+
+        tried: List[PoolEndpoint] = []
+        while True:
+            if endpoint is None:
+                endpoint = self._acquire(tried)
+                if endpoint is None:
+                    raise CannotHandleRequest(
+                        f"No endpoint of the pool could handle {description}"
+                    )
+            else:
+                with self._lock:
+                    endpoint.outstanding += 1
+
+            start = time.monotonic()
+            try:
+                result = send(endpoint.provider)
+            except ENDPOINT_ERRORS as exc:
+                self._release(endpoint, error=exc)
+                if not failover or len(tried) + 1 >= len(self.endpoints):
+                    raise
+                tried.append(endpoint)
+                endpoint = None
+            else:
+                self._release(
+                    endpoint,
+                    latency=time.monotonic() - start,
+                    latency_key=latency_key,
+                )
+                return endpoint, result
+
+    #
+    # Hedging
+    #
+    def _hedge_delay(self, latency_key: Any) -> Optional[float]:
+        with self._lock:
+            recent_latencies = self._recent_latencies.get(latency_key, ())
+            if len(recent_latencies) < DEFAULT_HEDGE_MIN_SAMPLES:
+                return None
+            latencies = sorted(recent_latencies)
+        return latencies[int(len(latencies) * self.hedge_percentile)]
+
+    def _get_hedge_executor(self) -> ThreadPoolExecutor:
+        if self._hedge_executor is None:
+            with self._lock:
+                if self._hedge_executor is None:
+                    self._hedge_executor = ThreadPoolExecutor(
+                        max_workers=self.hedge_max_workers,
+                        thread_name_prefix="PooledProvider-hedge",
+                    )
+        return self._hedge_executor
+
+    def _submit_hedge_task(
+        self, hedge: bool, *args: Any
+    ) -> "Optional[Future[Tuple[PoolEndpoint, TReturn]]]":
+        """
+        Run ``_route(*args)`` on the hedging threads, or return None if they are all
+        busy, or if ``hedge`` and the duplicates in flight are at their limit.
+        """
+        with self._lock:
+            if self._hedge_tasks >= self.hedge_max_workers or (
+                hedge and self._hedges_in_flight >= self.hedge_max_in_flight
+            ):
+                return None
+            self._hedge_tasks += 1
+            if hedge:
+                self._hedges_in_flight += 1
+                self.hedges_sent += 1
+
+        def done(_future: "Future[Tuple[PoolEndpoint, TReturn]]") -> None:
+            with self._lock:
+                self._hedge_tasks -= 1
+                if hedge:
+                    self._hedges_in_flight -= 1
+
+        future = self._get_hedge_executor().submit(self._route, *args)
+        future.add_done_callback(done)
+        return future
+
+    def _hedged_route(
+        self,
+        send: Callable[[BaseProvider], TReturn],
+        description: str,
+        failover: bool,
+        latency_key: Any,
+    ) -> Tuple[PoolEndpoint, TReturn]:
+        delay = self._hedge_delay(latency_key)
+        if delay is None or len(self.endpoints) < 2:
+            return self._route(send, description, failover, latency_key=latency_key)
+
+        with self._lock:
+            primary_endpoint = self._pick([])
+        primary = self._submit_hedge_task(
+            False, send, description, failover, primary_endpoint, latency_key
+        )
+        if primary is None:
+            # every hedging thread is busy, e.g. with the losers of earlier hedges
+            return self._route(
+                send, description, failover, primary_endpoint, latency_key
+            )
+        done, _not_done = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        with self._lock:
+            hedge_endpoint = self._pick([primary_endpoint], healthy_only=True)
+        if hedge_endpoint is None:
+            return primary.result()
+        hedge = self._submit_hedge_task(
+            True, send, description, False, hedge_endpoint, latency_key
+        )
+        if hedge is None:
+            return primary.result()
+        self.logger.debug(
+            f"Hedging {description} to {hedge_endpoint.provider} after {delay:.3f}s"
+        )
+
+        # the slower request is left to finish in the background
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        with self._lock:
+                            self.hedges_won += 1
+                    return future.result()
+        return primary.result()
+
+    def _send(
+        self,
+        send: Callable[[BaseProvider], TReturn],
+        description: str,
+        failover: bool,
+        hedge: bool,
+        latency_key: Any,
+    ) -> Tuple[PoolEndpoint, TReturn]:
+        if hedge and self.hedge_percentile is not None:
+            return self._hedged_route(send, description, failover, latency_key)
+        return self._route(send, description, failover, latency_key=latency_key)
+
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        if method in FILTER_METHODS and params:
+            # a filter only exists on the node it was installed on
+            with self._lock:
+                filter_endpoint = self._filter_endpoints.get(params[0])
+            if filter_endpoint is not None:
+                _endpoint, response = self._route(
+                    lambda provider: provider.make_request(method, params),
+                    method,
+                    failover=False,
+                    endpoint=filter_endpoint,
+                )
+                if method == RPC.bub_uninstallFilter:
+                    with self._lock:
+                        self._filter_endpoints.pop(params[0], None)
+                return response
+
+        endpoint, response = self._send(
+            lambda provider: provider.make_request(method, params),
+            method,
+            failover=check_if_failover(method),
+            hedge=check_if_hedge_on_delay(method),
+            latency_key=method,
+        )
+        if method in NEW_FILTER_METHODS and "result" in response:
+            with self._lock:
+                self._filter_endpoints[response["result"]] = endpoint
+        return response
+
+    def make_batch_request(
+        self, requests: Sequence[Tuple[RPCEndpoint, Any]]
+    ) -> List[RPCResponse]:
+        methods = [method for method, _params in requests]
+        _endpoint, responses = self._send(
+            lambda provider: provider.make_batch_request(requests),
+            f"batch {methods}",
+            failover=all(check_if_failover(method) for method in methods),
+            hedge=all(check_if_hedge_on_delay(method) for method in methods),
+            latency_key=tuple(sorted(set(methods))),
+        )
+        return responses
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        return any(
+            endpoint.provider.is_connected(show_traceback)
+            for endpoint in self.endpoints
+        )
+
+    #
+    # Health checks
+    #
+    def _probe_endpoint(self, endpoint: PoolEndpoint) -> None:
+        start = time.monotonic()
+        try:
+            response = endpoint.provider.make_request(RPC.bub_blockNumber, [])
+            block_number = to_int(hexstr=response["result"])
+        except Exception as exc:
+            with self._lock:
+                endpoint.block_number = None
+                endpoint.last_error = exc
+            return
+
+        with self._lock:
+            endpoint.block_number = block_number
+            if endpoint.latency is None:
+                endpoint.latency = time.monotonic() - start
+
+    def probe(self) -> None:
+        """
+        Check the block height of every endpoint and eject or readmit endpoints
+        accordingly. Called periodically by the background prober.
+        """
+        for endpoint in self.endpoints:
+            self._probe_endpoint(endpoint)
+
+        with self._lock:
+            heights = [
+                endpoint.block_number
+                for endpoint in self.endpoints
+                if endpoint.block_number is not None
+            ]
+            head = max(heights, default=None)
+            for endpoint in self.endpoints:
+                healthy = (
+                    endpoint.block_number is not None
+                    and head - endpoint.block_number <= self.max_block_lag
+                )
+                if healthy != endpoint.healthy:
+                    self.logger.warning(
+                        f"{'Readmitting' if healthy else 'Ejecting'} "
+                        f"{endpoint.provider} at block {endpoint.block_number}, "
+                        f"pool head is {head}"
+                    )
+                    endpoint.healthy = healthy
+                    if healthy:
+                        endpoint.failures = 0
+
+    def _ensure_prober(self) -> None:
+        if self._prober is not None or self.probe_interval is None:
+            return
+        with self._lock:
+            if self._prober is None and not self._closed.is_set():
+                self._prober = threading.Thread(
+                    target=self._probe_forever,
+                    name="PooledProvider-probe",
+                    daemon=True,
+                )
+                self._prober.start()
+
+    def _probe_forever(self) -> None:
+        while not self._closed.wait(self.probe_interval):
+            try:
+                self.probe()
+            except Exception:
+                self.logger.exception("Probing the pool endpoints failed")
+
+    def close(self) -> None:
+        """
+        Stop the background prober and the hedging workers.
+        """
+        self._closed.set()
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
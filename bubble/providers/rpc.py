@@ -3,7 +3,9 @@ from typing import (
     Any,
     Dict,
     Iterable,
+    List,
     Optional,
+    Sequence,
     Tuple,
     Union,
 )
@@ -96,3 +98,21 @@ class HTTPProvider(JSONBaseProvider):
             f"Method: {method}, Response: {response}"
         )
         return response
+
+    def make_batch_request(
+        self, requests: Sequence[Tuple[RPCEndpoint, Any]]
+    ) -> List[RPCResponse]:
+        self.logger.debug(
+            f"Making batch request HTTP. URI: {self.endpoint_uri}, "
+            f"Methods: {[method for method, _params in requests]}"
+        )
+        request_data, request_ids = self.encode_batch_rpc_request(requests)
+        raw_response = make_post_request(
+            self.endpoint_uri, request_data, **self.get_request_kwargs()
+        )
+        responses = self.decode_batch_rpc_response(raw_response, request_ids)
+        self.logger.debug(
+            f"Getting batch response HTTP. URI: {self.endpoint_uri}, "
+            f"Responses: {responses}"
+        )
+        return responses
@@ -1,4 +1,8 @@
 import asyncio
+from concurrent.futures import (
+    Future,
+    TimeoutError,
+)
 import json
 import logging
 import os
@@ -10,13 +14,23 @@ from types import (
 )
 from typing import (
     Any,
+    Callable,
+    Collection,
+    Coroutine,
+    Dict,
+    List,
     Optional,
+    Sequence,
+    Set,
+    Tuple,
     Type,
+    TypeVar,
     Union,
 )
 
 from eth_typing import (
     URI,
+    HexStr,
 )
 from websockets.client import (
     connect,
@@ -25,11 +39,17 @@ from websockets.legacy.client import (
     WebSocketClientProtocol,
 )
 
+from bubble._utils.rpc_abi import (
+    RPC,
+)
 from bubble.exceptions import (
+    ProviderConnectionError,
+    SubscriptionClosed,
     Web3ValidationError,
 )
 from bubble.providers.base import (
     JSONBaseProvider,
+    sort_batch_responses,
 )
 from bubble.types import (
     RPCEndpoint,
@@ -38,6 +58,11 @@ from bubble.types import (
 
 RESTRICTED_WEBSOCKET_KWARGS = {"uri", "loop"}
 DEFAULT_WEBSOCKET_TIMEOUT = 10
+DEFAULT_SUBSCRIPTION_QUEUE_SIZE = 1000
+
+logger = logging.getLogger("bubble.providers.WebsocketProvider")
+
+TReturn = TypeVar("TReturn")
 
 
 def _start_event_loop(loop: asyncio.AbstractEventLoop) -> None:
@@ -53,20 +78,58 @@ def _get_threaded_loop() -> asyncio.AbstractEventLoop:
     return new_loop
 
 
+def _put_dropping_oldest(queue: "asyncio.Queue[Any]", item: Any) -> bool:
+    """
+    Put ``item`` on ``queue``, dropping the oldest item if it is full. Return whether
+    an item was dropped.
+    """
+    dropped = False
+    if queue.full():
+        queue.get_nowait()
+        dropped = True
+    queue.put_nowait(item)
+    return dropped
+
+
 def get_default_endpoint() -> URI:
     return URI(os.environ.get("WEB3_WS_PROVIDER_URI", "ws://127.0.0.1:8546"))
 
 
 class PersistentWebSocket:
-    def __init__(self, endpoint_uri: URI, websocket_kwargs: Any) -> None:
+    """
+    A websocket connection shared by every request made through a provider.
+
+    Requests are sent as soon as they are made and a reader task matches each
+    response to its request by JSON-RPC ``id``, so any number of requests can be in
+    flight at once. ``bub_subscription`` notifications are queued per subscription
+    id, from the response to its ``bub_subscribe`` until it is removed; the
+    notifications of any other id are dropped. A queue holds the latest
+    ``subscription_queue_size`` notifications, the oldest are dropped once it is
+    full. All methods run on the provider's event loop.
+    """
+
+    def __init__(
+        self,
+        endpoint_uri: URI,
+        websocket_kwargs: Any,
+        decode_message: Callable[[Union[bytes, str]], Any] = json.loads,
+        subscription_queue_size: int = DEFAULT_SUBSCRIPTION_QUEUE_SIZE,
+    ) -> None:
         self.ws: WebSocketClientProtocol = None
         self.endpoint_uri = endpoint_uri
         self.websocket_kwargs = websocket_kwargs
+        self.decode_message = decode_message
+        self.subscription_queue_size = subscription_queue_size
+        self.dropped_notifications = 0
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._reader_task: Optional["asyncio.Task[None]"] = None
+        self._pending: Dict[Any, "asyncio.Future[Any]"] = {}
+        # ids of the bub_subscribe requests waiting for their response
+        self._subscribe_requests: Set[Any] = set()
+        self._subscriptions: Dict[HexStr, "asyncio.Queue[Any]"] = {}
 
     async def __aenter__(self) -> WebSocketClientProtocol:
-        if self.ws is None:
-            self.ws = await connect(uri=self.endpoint_uri, **self.websocket_kwargs)
-        return self.ws
+        return await self.connect()
 
     async def __aexit__(
         self,
@@ -74,23 +137,148 @@ class PersistentWebSocket:
         exc_val: BaseException,
         exc_tb: TracebackType,
     ) -> None:
-        if exc_val is not None:
-            try:
-                await self.ws.close()
-            except Exception:
-                pass
-            self.ws = None
+        if exc_val is not None and self.ws is not None:
+            await self.ws.close()
+
+    async def connect(self) -> WebSocketClientProtocol:
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+
+        async with self._connect_lock:
+            if self.ws is None:
+                ws = await connect(uri=self.endpoint_uri, **self.websocket_kwargs)
+                self._reader_task = asyncio.ensure_future(self._read_messages(ws))
+                self.ws = ws
+        return self.ws
+
+    async def _read_messages(self, ws: WebSocketClientProtocol) -> None:
+        exc: BaseException = ProviderConnectionError(
+            f"Websocket connection to {self.endpoint_uri} was closed"
+        )
+        try:
+            async for message in ws:
+                self._dispatch(self.decode_message(message))
+        except Exception as read_exc:
+            exc = read_exc
+        finally:
+            self._close(ws, exc)
+
+    def _dispatch(self, message: Any) -> None:
+        if isinstance(message, dict) and "id" not in message:
+            if str(message.get("method", "")).endswith("_subscription"):
+                params = message["params"]
+                queue = self._subscriptions.get(params["subscription"])
+                if queue is None:
+                    logger.debug(
+                        f"Dropping notification of unknown subscription: {message}"
+                    )
+                elif _put_dropping_oldest(queue, params["result"]):
+                    self.dropped_notifications += 1
+                    logger.debug(
+                        "Dropped the oldest notification of subscription "
+                        f"{params['subscription']}, its queue is full"
+                    )
+            else:
+                logger.debug(f"Dropping websocket message without an id: {message}")
+            return
+
+        items = message if isinstance(message, list) else [message]
+        message_ids = [item.get("id") for item in items]
+        if self._subscribe_requests:
+            for item in items:
+                if item.get("id") in self._subscribe_requests and "result" in item:
+                    # registered before the reader gets to its first notification
+                    self._subscriptions[item["result"]] = asyncio.Queue(
+                        self.subscription_queue_size
+                    )
+
+        future = next(
+            (
+                self._pending[message_id]
+                for message_id in message_ids
+                if message_id in self._pending
+            ),
+            None,
+        )
+        if future is None:
+            logger.debug(
+                f"Dropping websocket message with no waiting request: {message}"
+            )
+        elif not future.done():
+            future.set_result(message)
+
+    def _close(self, ws: WebSocketClientProtocol, exc: BaseException) -> None:
+        if self.ws is not ws:
+            return
+
+        self.ws = None
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(exc)
+        # the node forgets subscriptions along with the connection
+        for queue in self._subscriptions.values():
+            _put_dropping_oldest(queue, exc)
+
+    async def request(
+        self,
+        request_ids: Sequence[int],
+        request_data: bytes,
+        timeout: float,
+        subscribe_ids: Collection[int] = (),
+    ) -> Any:
+        """
+        Send ``request_data`` and return its response. ``subscribe_ids`` are the ids
+        of its ``bub_subscribe`` requests.
+        """
+        future: "asyncio.Future[Any]" = asyncio.get_running_loop().create_future()
+        for request_id in request_ids:
+            self._pending[request_id] = future
+        self._subscribe_requests.update(subscribe_ids)
+
+        try:
+            ws = await self.connect()
+            await asyncio.wait_for(ws.send(request_data), timeout=timeout)
+            return await asyncio.wait_for(future, timeout=timeout)
+        finally:
+            self._subscribe_requests.difference_update(subscribe_ids)
+            for request_id in request_ids:
+                if self._pending.get(request_id) is future:
+                    del self._pending[request_id]
+
+    async def get_subscription_message(self, subscription_id: HexStr) -> Any:
+        queue = self._subscriptions.get(subscription_id)
+        if queue is None:
+            raise SubscriptionClosed(f"No subscription {subscription_id}")
+        message = await queue.get()
+        if isinstance(message, BaseException):
+            if self._subscriptions.get(subscription_id) is queue:
+                del self._subscriptions[subscription_id]
+            # left for the next consumer waiting on the queue
+            queue.put_nowait(message)
+            raise message
+        return message
+
+    def remove_subscription(self, subscription_id: HexStr) -> None:
+        queue = self._subscriptions.pop(subscription_id, None)
+        if queue is not None:
+            # wakes up the consumers waiting for a notification
+            _put_dropping_oldest(
+                queue, SubscriptionClosed(f"Unsubscribed from {subscription_id}")
+            )
 
 
 class WebsocketProvider(JSONBaseProvider):
     logger = logging.getLogger("bubble.providers.WebsocketProvider")
     _loop = None
+    supports_subscriptions = True
 
     def __init__(
         self,
         endpoint_uri: Optional[Union[URI, str]] = None,
         websocket_kwargs: Optional[Any] = None,
         websocket_timeout: int = DEFAULT_WEBSOCKET_TIMEOUT,
+        subscription_queue_size: int = DEFAULT_SUBSCRIPTION_QUEUE_SIZE,
     ) -> None:
         self.endpoint_uri = URI(endpoint_uri)
         self.websocket_timeout = websocket_timeout
@@ -109,27 +297,86 @@ class WebsocketProvider(JSONBaseProvider):
                     f"{RESTRICTED_WEBSOCKET_KWARGS} are not allowed "
                     f"in websocket_kwargs, found: {found_restricted_keys}"
                 )
-        self.conn = PersistentWebSocket(self.endpoint_uri, websocket_kwargs)
+        self.conn = PersistentWebSocket(
+            self.endpoint_uri,
+            websocket_kwargs,
+            self.decode_rpc_response,
+            subscription_queue_size,
+        )
         super().__init__()
 
     def __str__(self) -> str:
         return f"WS connection {self.endpoint_uri}"
 
-    async def coro_make_request(self, request_data: bytes) -> RPCResponse:
-        async with self.conn as conn:
-            await asyncio.wait_for(
-                conn.send(request_data), timeout=self.websocket_timeout
-            )
-            return json.loads(
-                await asyncio.wait_for(conn.recv(), timeout=self.websocket_timeout)
-            )
+    async def coro_make_request(
+        self,
+        request_data: bytes,
+        request_ids: Sequence[int],
+        subscribe_ids: Collection[int] = (),
+    ) -> Any:
+        return await self.conn.request(
+            request_ids, request_data, self.websocket_timeout, subscribe_ids
+        )
+
+    def _run_on_loop(self, coro: Coroutine[Any, Any, TReturn]) -> "Future[TReturn]":
+        return asyncio.run_coroutine_threadsafe(coro, WebsocketProvider._loop)
 
     def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
         self.logger.debug(
             f"Making request WebSocket. URI: {self.endpoint_uri}, " f"Method: {method}"
         )
-        request_data = self.encode_rpc_request(method, params)
-        future = asyncio.run_coroutine_threadsafe(
-            self.coro_make_request(request_data), WebsocketProvider._loop
+        request_id = next(self.request_counter)
+        request_data = self.encode_rpc_request(method, params, request_id)
+        subscribe_ids = [request_id] if method == RPC.bub_subscribe else []
+        future = self._run_on_loop(
+            self.coro_make_request(request_data, [request_id], subscribe_ids)
         )
         return future.result()
+
+    def make_batch_request(
+        self, requests: Sequence[Tuple[RPCEndpoint, Any]]
+    ) -> List[RPCResponse]:
+        self.logger.debug(
+            f"Making batch request WebSocket. URI: {self.endpoint_uri}, "
+            f"Methods: {[method for method, _params in requests]}"
+        )
+        request_data, request_ids = self.encode_batch_rpc_request(requests)
+        subscribe_ids = [
+            request_id
+            for (method, _params), request_id in zip(requests, request_ids)
+            if method == RPC.bub_subscribe
+        ]
+        future = self._run_on_loop(
+            self.coro_make_request(request_data, request_ids, subscribe_ids)
+        )
+        return sort_batch_responses(future.result(), request_ids)
+
+    def get_subscription_message(
+        self, subscription_id: HexStr, timeout: Optional[float] = None
+    ) -> Any:
+        """
+        Block until the next notification of a ``bub_subscribe`` subscription
+        arrives and return its result.
+        """
+        future = self._run_on_loop(
+            self.conn.get_subscription_message(subscription_id)
+        )
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    async def coro_get_subscription_message(self, subscription_id: HexStr) -> Any:
+        """
+        Await the next notification of a ``bub_subscribe`` subscription from any
+        event loop.
+        """
+        return await asyncio.wrap_future(
+            self._run_on_loop(self.conn.get_subscription_message(subscription_id))
+        )
+
+    def remove_subscription(self, subscription_id: HexStr) -> None:
+        WebsocketProvider._loop.call_soon_threadsafe(
+            self.conn.remove_subscription, subscription_id
+        )
@@ -6,6 +6,10 @@ from bubble.inner_contract import (
     Bubble,
     BubbleL2,
     TempPrivateKey,
+    AsyncStakingL2,
+    AsyncBubble,
+    AsyncBubbleL2,
+    AsyncTempPrivateKey,
 )
 
 
@@ -15,4 +19,11 @@ class SubChain(Module):
     bubbleL2: BubbleL2
     temp_private_key: TempPrivateKey
 
-    
+
+class AsyncSubChain(Module):
+    is_async = True
+
+    stakingL2: AsyncStakingL2
+    bubble: AsyncBubble
+    bubbleL2: AsyncBubbleL2
+    temp_private_key: AsyncTempPrivateKey
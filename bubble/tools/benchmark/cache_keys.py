@@ -0,0 +1,118 @@
+"""
+Compare ``generate_cache_key`` with the recursive md5 key function it replaced,
+on the requests the cache middlewares see.
+
+    python -m bubble.tools.benchmark.cache_keys --num-calls 10000
+"""
+import argparse
+import collections
+import hashlib
+import logging
+import sys
+import timeit
+from typing import (
+    Any,
+    List,
+    Tuple,
+)
+
+from eth_utils import (
+    is_boolean,
+    is_bytes,
+    is_dict,
+    is_list_like,
+    is_null,
+    is_number,
+    is_text,
+    to_bytes,
+)
+
+from bubble._utils.caching import (
+    generate_cache_key,
+)
+
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    "--num-calls",
+    type=int,
+    default=10000,
+    help="The number of keys generated for each request",
+)
+
+
+def recursive_md5_cache_key(value: Any) -> str:
+    # the key function used by the cache middlewares before
+    if is_bytes(value):
+        return hashlib.md5(value).hexdigest()
+    elif is_text(value):
+        return recursive_md5_cache_key(to_bytes(text=value))
+    elif is_boolean(value) or is_null(value) or is_number(value):
+        return recursive_md5_cache_key(repr(value))
+    elif is_dict(value):
+        return recursive_md5_cache_key(
+            ((key, value[key]) for key in sorted(value.keys()))
+        )
+    elif is_list_like(value) or isinstance(value, collections.abc.Generator):
+        return recursive_md5_cache_key(
+            "".join((recursive_md5_cache_key(item) for item in value))
+        )
+    raise TypeError(f"Cannot generate cache key for value {value}")
+
+
+ADDRESS = "0x" + "66" * 20
+TOPIC = "0x" + "22" * 32
+
+REQUESTS: List[Tuple[str, Any]] = [
+    ("bub_getBlockByNumber", ("0x1b4", False)),
+    ("bub_getBalance", (ADDRESS, "latest")),
+    (
+        "bub_call",
+        ({"from": ADDRESS, "to": ADDRESS, "data": "0xa9059cbb" + "00" * 64}, "latest"),
+    ),
+    ("bub_call, 4 KiB data", ({"to": ADDRESS, "data": "0x" + "ab" * 4096}, "latest")),
+    (
+        "bub_getLogs",
+        (
+            {
+                "fromBlock": "0x10",
+                "toBlock": "0x2000",
+                "address": [ADDRESS] * 20,
+                "topics": [[TOPIC] * 10, None, TOPIC],
+            },
+        ),
+    ),
+]
+
+
+def sync_benchmark(func: Any, n: int) -> float:
+    return timeit.timeit(func, number=n) / n
+
+
+def format_time(seconds: float) -> str:
+    return f"{seconds * 1000000:.2f} us"
+
+
+def main(logger: logging.Logger, num_calls: int) -> None:
+    row = "|{:^24}|{:^16}|{:^16}|{:^10}|"
+    logger.info(f"Mean time per key over {num_calls} calls")
+    logger.info(row.format("Request", "recursive md5", "canonical", "speedup"))
+    logger.info("-" * 71)
+    for name, params in REQUESTS:
+        method = name.split(",")[0]
+        value = (method, params)
+        old = sync_benchmark(lambda: recursive_md5_cache_key(value), num_calls)
+        new = sync_benchmark(lambda: generate_cache_key(value), num_calls)
+        logger.info(
+            row.format(name, format_time(old), format_time(new), f"{old / new:.1f}x")
+        )
+    logger.info("-" * 71)
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    logger = logging.getLogger()
+    logger.setLevel(logging.INFO)
+    logger.addHandler(logging.StreamHandler(sys.stdout))
+
+    main(logger, args.num_calls)
@@ -0,0 +1,167 @@
+"""
+Compare the compiled inner contract event decoder with the decoding path it replaced, on
+the event data of delegation, reward and bubble transactions.
+
+    python -m bubble.tools.benchmark.inner_contract_decoding --num-payloads 10000
+"""
+import argparse
+import logging
+import sys
+import timeit
+from typing import (
+    Any,
+    List,
+    Optional,
+    Tuple,
+)
+
+from eth_utils import (
+    to_bytes,
+)
+from hexbytes import (
+    HexBytes,
+)
+import rlp
+
+from bubble.datastructures import (
+    MutableAttributeDict,
+)
+from bubble.inner_contract.decoding import (
+    get_event_decoder,
+)
+from bubble.inner_contract.error_code import (
+    ERROR_CODE,
+)
+from bubble.inner_contract.formatters import (
+    INNER_CONTRACT_EVENT_FORMATTERS,
+)
+from bubble.module import (
+    apply_result_formatters,
+)
+from bubble.types import (
+    FunctionIdentifier,
+    InnerFunction,
+)
+
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    "--num-payloads",
+    type=int,
+    default=10000,
+    help="The number of payloads decoded for each event",
+)
+parser.add_argument(
+    "--max-workers",
+    type=int,
+    default=None,
+    help="Also decode the payloads in this many processes",
+)
+
+
+def legacy_decode_event_data(fid: Optional[FunctionIdentifier], data: bytes) -> Any:
+    # the decoding path used by InnerContractEvent before
+    formatter = INNER_CONTRACT_EVENT_FORMATTERS.get(fid)
+    unshaped_data = rlp.decode(to_bytes(data))
+    decoded = [int(unshaped_data[0])]
+    for arg in unshaped_data[1:]:
+        decoded.append(rlp.decode(arg))
+
+    code = decoded[0]
+    message = ERROR_CODE.get(int(code), "Unknown error code")
+    if not formatter:
+        formatted_data = {"code": code, "message": message, "data": decoded[1:]}
+        return MutableAttributeDict.recursive(formatted_data)
+
+    args = decoded[1:]
+    if formatter.__name__ == "apply_formatters_to_dict":
+        packaged_args: Any = dict(zip(formatter.args[0].keys(), args))
+    else:
+        raw_formatter = formatter.args[0].args[0]
+        packaged_args = [dict(zip(raw_formatter.keys(), _args)) for _args in args[0]]
+
+    formatted_args = apply_result_formatters(formatter, packaged_args)
+    formatted_data = {"code": code, "message": message, "data": formatted_args}
+    return MutableAttributeDict.recursive(formatted_data)
+
+
+def encode_event_data(code: bytes, *args: Any) -> HexBytes:
+    return HexBytes(rlp.encode([code] + [rlp.encode(arg) for arg in args]))
+
+
+NODE_ID = b"\xab" * 64
+
+EVENTS: List[Tuple[str, Optional[FunctionIdentifier], HexBytes]] = [
+    (
+        "withdrewDelegate",
+        InnerFunction.delegate_withdrewDelegate,
+        encode_event_data(b"0", 10**18, 2 * 10**18, 3 * 10**18, 0, 0),
+    ),
+    (
+        "withdrawReward x20",
+        InnerFunction.reward_withdrawDelegateReward,
+        encode_event_data(b"0", [[NODE_ID, 7, 10**18]] * 20),
+    ),
+    (
+        "delegate",
+        InnerFunction.delegate_delegate,
+        encode_event_data(b"0"),
+    ),
+    (
+        "failed",
+        InnerFunction.delegate_delegate,
+        encode_event_data(b"301111"),
+    ),
+]
+
+
+def sync_benchmark(func: Any, n: int) -> float:
+    return timeit.timeit(func, number=1) / n
+
+
+def format_time(seconds: float) -> str:
+    return f"{seconds * 1000000:.2f} us"
+
+
+def main(logger: logging.Logger, num_payloads: int, max_workers: Optional[int]) -> None:
+    row = "|{:^20}|{:^14}|{:^14}|{:^14}|{:^10}|"
+    logger.info(f"Mean time per payload over {num_payloads} payloads")
+    logger.info(row.format("Event", "previous", "compiled", "columns", "speedup"))
+    logger.info("-" * 78)
+    for name, fid, data in EVENTS:
+        decoder = get_event_decoder(fid)
+        if decoder.decode(data) != legacy_decode_event_data(fid, data):
+            raise AssertionError(f"The decoders disagree on {name}")
+
+        payloads = [data] * num_payloads
+        old = sync_benchmark(
+            lambda: [legacy_decode_event_data(fid, payload) for payload in payloads],
+            num_payloads,
+        )
+        new = sync_benchmark(lambda: decoder.decode_many(payloads), num_payloads)
+        columns = sync_benchmark(lambda: decoder.decode_columns(payloads), num_payloads)
+        logger.info(
+            row.format(
+                name,
+                format_time(old),
+                format_time(new),
+                format_time(columns),
+                f"{old / new:.1f}x",
+            )
+        )
+
+        if max_workers:
+            pool = sync_benchmark(
+                lambda: decoder.decode_many(payloads, max_workers), num_payloads
+            )
+            logger.info(f"  in {max_workers} processes: {format_time(pool)}")
+    logger.info("-" * 78)
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    logger = logging.getLogger()
+    logger.setLevel(logging.INFO)
+    logger.addHandler(logging.StreamHandler(sys.stdout))
+
+    main(logger, args.num_payloads, args.max_workers)
@@ -0,0 +1,146 @@
+"""
+Compare the compiled inner contract encoder with the encoding path it replaced, on
+the payloads of staking and delegation transactions and queries.
+
+    python -m bubble.tools.benchmark.inner_contract_encoding --num-calls 10000
+"""
+import argparse
+import copy
+import logging
+import sys
+import timeit
+from typing import (
+    Any,
+    Dict,
+    List,
+    Tuple,
+)
+
+import rlp
+
+from bubble import (
+    Web3,
+)
+from bubble._utils.rpc_abi import (
+    apply_abi_formatters_to_dict,
+)
+from bubble.inner_contract.formatters import (
+    DEFAULT_PARAM_ABIS,
+    DEFAULT_PARAM_NORMALIZERS,
+    INNER_CONTRACT_PARAM_ABIS,
+)
+from bubble.types import (
+    FunctionIdentifier,
+    InnerFunction,
+)
+
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    "--num-calls",
+    type=int,
+    default=10000,
+    help="The number of payloads encoded for each function",
+)
+
+
+def legacy_encode_transaction_data(
+    fid: FunctionIdentifier, kwargs: Dict[str, Any]
+) -> bytes:
+    # the encoding path used by InnerContractFunction before, including its clone
+    kwargs = copy.copy(kwargs)
+    params = apply_abi_formatters_to_dict(
+        DEFAULT_PARAM_NORMALIZERS, DEFAULT_PARAM_ABIS, kwargs
+    )
+    function_abis = INNER_CONTRACT_PARAM_ABIS.get(fid)
+    if function_abis:
+        params = apply_abi_formatters_to_dict(
+            DEFAULT_PARAM_NORMALIZERS, function_abis, params
+        )
+    encoded_args = [rlp.encode(fid)]
+    for value in params.values():
+        encoded_args.append(b"" if value is None else rlp.encode(value))
+    return rlp.encode(encoded_args)
+
+
+ADDRESS = "0x" + "66" * 20
+NODE_ID = "0x" + "ab" * 64
+
+FUNCTIONS: List[Tuple[str, FunctionIdentifier, Dict[str, Any]]] = [
+    (
+        "delegate",
+        InnerFunction.delegate_delegate,
+        {"balance_type": 0, "node_id": NODE_ID, "amount": 10**18},
+    ),
+    (
+        "getDelegateInfo",
+        InnerFunction.delegate_getDelegateInfo,
+        {"block_number": 123456, "address": ADDRESS, "node_id": NODE_ID},
+    ),
+    (
+        "getCandidateInfo",
+        InnerFunction.staking_getCandidateInfo,
+        {"node_id": NODE_ID},
+    ),
+    (
+        "createStaking",
+        InnerFunction.staking_createStaking,
+        {
+            "balance_type": 0,
+            "benefit_address": ADDRESS,
+            "node_id": NODE_ID,
+            "external_id": "",
+            "node_name": "node",
+            "website": "https://example.com",
+            "details": "",
+            "amount": 10**24,
+            "reward_per": 1000,
+            "version": 4352,
+            "version_sign": "0x" + "cd" * 65,
+            "bls_pubkey": "0x" + "ef" * 96,
+            "bls_proof": "0x" + "12" * 64,
+        },
+    ),
+]
+
+
+def sync_benchmark(func: Any, n: int) -> float:
+    return timeit.timeit(func, number=n) / n
+
+
+def format_time(seconds: float) -> str:
+    return f"{seconds * 1000000:.2f} us"
+
+
+def main(logger: logging.Logger, num_calls: int) -> None:
+    w3 = Web3()
+    function = w3.dpos.staking.function
+
+    row = "|{:^20}|{:^14}|{:^14}|{:^10}|"
+    logger.info(f"Mean time per payload over {num_calls} calls")
+    logger.info(row.format("Function", "previous", "compiled", "speedup"))
+    logger.info("-" * 63)
+    for name, fid, kwargs in FUNCTIONS:
+        legacy_data = legacy_encode_transaction_data(fid, kwargs)
+        if function(fid, **kwargs)._encode_transaction_data() != legacy_data:
+            raise AssertionError(f"The encoders disagree on {name}")
+
+        old = sync_benchmark(
+            lambda: legacy_encode_transaction_data(fid, kwargs), num_calls
+        )
+        new = sync_benchmark(
+            lambda: function(fid, **kwargs)._encode_transaction_data(), num_calls
+        )
+        logger.info(
+            row.format(name, format_time(old), format_time(new), f"{old / new:.1f}x")
+        )
+    logger.info("-" * 63)
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    logger = logging.getLogger()
+    logger.setLevel(logging.INFO)
+    logger.addHandler(logging.StreamHandler(sys.stdout))
+
+    main(logger, args.num_calls)
@@ -0,0 +1,192 @@
+"""
+Compare the JSON codecs available to ``JSONBaseProvider`` on block payloads.
+
+Recorded JSON-RPC responses, e.g. saved ``bub_getBlockByNumber`` responses with
+full transactions, can be passed with ``--payload``. Without them, synthetic blocks
+of a few sizes are generated.
+
+    python -m bubble.tools.benchmark.json_codecs --payload block.json
+"""
+import argparse
+import json
+import logging
+from pathlib import (
+    Path,
+)
+import random
+import sys
+import timeit
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Tuple,
+    Union,
+)
+
+from eth_utils import (
+    to_bytes,
+    to_text,
+)
+
+from bubble._utils.encoding import (
+    FriendlyJsonSerde,
+)
+from bubble.utils.json_codecs import (
+    JsonCodec,
+    MsgspecCodec,
+    OrjsonCodec,
+)
+
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    "--num-calls",
+    type=int,
+    default=20,
+    help="The number of times each payload is encoded and decoded",
+)
+parser.add_argument(
+    "--payload",
+    action="append",
+    default=[],
+    help="A file holding a recorded JSON-RPC response, may be repeated",
+)
+
+
+def _hex(rng: random.Random, num_bytes: int) -> str:
+    return "0x" + rng.getrandbits(num_bytes * 8).to_bytes(num_bytes, "big").hex()
+
+
+def build_block_payload(num_transactions: int, seed: int = 0) -> bytes:
+    """
+    Build a ``bub_getBlockByNumber`` response with full transaction objects, shaped
+    like the ones returned by a node.
+    """
+    rng = random.Random(seed)
+    block_hash = _hex(rng, 32)
+    transactions = [
+        {
+            "blockHash": block_hash,
+            "blockNumber": "0x1b4",
+            "from": _hex(rng, 20),
+            "gas": hex(rng.randrange(21000, 8000000)),
+            "gasPrice": hex(rng.randrange(10**9, 10**11)),
+            "hash": _hex(rng, 32),
+            "input": _hex(rng, rng.choice((0, 68, 68, 356, 1380))),
+            "nonce": hex(rng.randrange(10**5)),
+            "to": _hex(rng, 20),
+            "transactionIndex": hex(index),
+            "value": hex(rng.randrange(10**20)),
+            "type": "0x0",
+            "chainId": "0x2710",
+            "v": "0x4e43",
+            "r": _hex(rng, 32),
+            "s": _hex(rng, 32),
+        }
+        for index in range(num_transactions)
+    ]
+    block = {
+        "number": "0x1b4",
+        "hash": block_hash,
+        "parentHash": _hex(rng, 32),
+        "nonce": _hex(rng, 65),
+        "logsBloom": _hex(rng, 256),
+        "transactionsRoot": _hex(rng, 32),
+        "stateRoot": _hex(rng, 32),
+        "receiptsRoot": _hex(rng, 32),
+        "miner": _hex(rng, 20),
+        "extraData": _hex(rng, 97),
+        "size": hex(1000 + 200 * num_transactions),
+        "gasLimit": "0x47b7600",
+        "gasUsed": hex(21000 * num_transactions),
+        "timestamp": "0x18a7b6c3f10",
+        "transactions": transactions,
+    }
+    return to_bytes(
+        text=json.dumps({"jsonrpc": "2.0", "id": 1, "result": block})
+    )
+
+
+def load_payloads(paths: List[str]) -> List[Tuple[str, bytes]]:
+    if paths:
+        return [(Path(path).name, Path(path).read_bytes()) for path in paths]
+    return [
+        (f"block, {num_transactions} txs", build_block_payload(num_transactions))
+        for num_transactions in (10, 200, 5000)
+    ]
+
+
+def available_codecs() -> Dict[str, Union[JsonCodec, None]]:
+    codecs: Dict[str, Union[JsonCodec, None]] = {"json": JsonCodec()}
+    for codec_class in (OrjsonCodec, MsgspecCodec):
+        try:
+            codecs[codec_class.name] = codec_class()
+        except ImportError:
+            codecs[codec_class.name] = None
+    return codecs
+
+
+def sync_benchmark(func: Callable[..., Any], n: int) -> Union[float, str]:
+    try:
+        starttime = timeit.default_timer()
+        for _ in range(n):
+            func()
+        return (timeit.default_timer() - starttime) / n
+    except Exception:
+        return "N/A"
+
+
+def friendly_decode(raw: bytes) -> Any:
+    # the decoding path used by JSONBaseProvider before codecs were pluggable
+    return FriendlyJsonSerde().json_decode(to_text(raw))
+
+
+def friendly_encode(obj: Any) -> bytes:
+    return to_bytes(text=FriendlyJsonSerde().json_encode(obj))
+
+
+def format_time(seconds: Union[float, str]) -> str:
+    if isinstance(seconds, str):
+        return seconds
+    return f"{seconds * 1000:.3f} ms"
+
+
+def main(logger: logging.Logger, num_calls: int, payload_paths: List[str]) -> None:
+    codecs = available_codecs()
+    columns = ["FriendlyJsonSerde"] + list(codecs)
+    row = "|{:^34}|" + "{:^20}|" * len(columns)
+
+    logger.info(f"Mean time per call over {num_calls} calls")
+    logger.info(row.format("Payload", *columns))
+    logger.info("-" * (36 + 21 * len(columns)))
+
+    for name, raw in load_payloads(payload_paths):
+        obj = json.loads(raw)
+        size = f"{name} ({len(raw) // 1024} KiB)"
+
+        decode_times = [sync_benchmark(lambda: friendly_decode(raw), num_calls)]
+        encode_times = [sync_benchmark(lambda: friendly_encode(obj), num_calls)]
+        for codec in codecs.values():
+            if codec is None:
+                decode_times.append("not installed")
+                encode_times.append("not installed")
+                continue
+            assert codec.decode(raw) == obj
+            decode_times.append(sync_benchmark(lambda: codec.decode(raw), num_calls))
+            encode_times.append(sync_benchmark(lambda: codec.encode(obj), num_calls))
+
+        logger.info(row.format(f"decode {size}", *map(format_time, decode_times)))
+        logger.info(row.format(f"encode {size}", *map(format_time, encode_times)))
+
+    logger.info("-" * (36 + 21 * len(columns)))
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    logger = logging.getLogger()
+    logger.setLevel(logging.INFO)
+    logger.addHandler(logging.StreamHandler(sys.stdout))
+
+    main(logger, args.num_calls, args.payload)
@@ -0,0 +1,165 @@
+"""
+Measure the per-call overhead of the default middleware stack, combining the
+middlewares into one onion for every method (``combine_middlewares``) or for each
+method (``combine_middlewares_by_method``).
+
+The provider answers from memory, so that only the time spent in the middlewares
+is measured.
+
+    python -m bubble.tools.benchmark.middleware --num-calls 20000
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import timeit
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Dict,
+    List,
+    Tuple,
+)
+
+from bubble import (
+    AsyncWeb3,
+    Web3,
+)
+from bubble.middleware import (
+    async_combine_middlewares,
+    async_combine_middlewares_by_method,
+    combine_middlewares,
+    combine_middlewares_by_method,
+)
+from bubble.providers.async_base import (
+    AsyncBaseProvider,
+)
+from bubble.providers.base import (
+    BaseProvider,
+)
+from bubble.types import (
+    RPCEndpoint,
+    RPCResponse,
+)
+
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    "--num-calls",
+    type=int,
+    default=20000,
+    help="The number of requests made through each middleware stack",
+)
+
+ADDRESS = "0x" + "66" * 20
+BLOCK = {
+    "number": "0x1b4",
+    "hash": "0x" + "11" * 32,
+    "parentHash": "0x" + "22" * 32,
+    "nonce": "0x" + "00" * 8,
+    "logsBloom": "0x" + "00" * 256,
+    "transactionsRoot": "0x" + "33" * 32,
+    "stateRoot": "0x" + "44" * 32,
+    "receiptsRoot": "0x" + "55" * 32,
+    "miner": ADDRESS,
+    "extraData": "0x",
+    "size": "0x220",
+    "gasLimit": "0x47b7600",
+    "gasUsed": "0x0",
+    "timestamp": "0x18a7b6c3f10",
+    "transactions": [],
+}
+
+REQUESTS: List[Tuple[RPCEndpoint, Any, Any]] = [
+    (RPCEndpoint("bub_blockNumber"), [], "0x1b4"),
+    (RPCEndpoint("bub_chainId"), [], "0x64"),
+    (RPCEndpoint("bub_getBlockByNumber"), ["0x1b4", False], BLOCK),
+    (RPCEndpoint("bub_getBalance"), [ADDRESS, "latest"], "0xde0b6b3a7640000"),
+    (RPCEndpoint("bub_call"), [{"to": ADDRESS, "data": "0x"}, "latest"], "0x"),
+]
+RESULTS: Dict[str, Any] = {method: result for method, _, result in REQUESTS}
+
+
+class MemoryProvider(BaseProvider):
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        return {"jsonrpc": "2.0", "id": 1, "result": RESULTS[method]}
+
+
+class AsyncMemoryProvider(AsyncBaseProvider):
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        return {"jsonrpc": "2.0", "id": 1, "result": RESULTS[method]}
+
+
+def sync_benchmark(func: Callable[..., Any], n: int) -> float:
+    return timeit.timeit(func, number=n) / n
+
+
+async def async_benchmark(
+    func: Callable[[], Coroutine[Any, Any, Any]], n: int
+) -> float:
+    starttime = timeit.default_timer()
+    for _ in range(n):
+        await func()
+    return (timeit.default_timer() - starttime) / n
+
+
+def format_time(seconds: float) -> str:
+    return f"{seconds * 1000000:.2f} us"
+
+
+def main(logger: logging.Logger, num_calls: int) -> None:
+    w3 = Web3(MemoryProvider())
+    middlewares = tuple(w3.middleware_onion)
+    onion = combine_middlewares(middlewares, w3, w3.provider.make_request)
+    by_method = combine_middlewares_by_method(
+        middlewares, w3, w3.provider.make_request
+    )
+
+    async_w3 = AsyncWeb3(AsyncMemoryProvider())
+    async_middlewares = tuple(async_w3.middleware_onion)
+    loop = asyncio.new_event_loop()
+    async_onion = loop.run_until_complete(
+        async_combine_middlewares(
+            async_middlewares, async_w3, async_w3.provider.make_request
+        )
+    )
+    async_by_method = loop.run_until_complete(
+        async_combine_middlewares_by_method(
+            async_middlewares, async_w3, async_w3.provider.make_request
+        )
+    )
+
+    row = "|{:^24}|{:^16}|{:^16}|{:^16}|{:^16}|"
+    logger.info(f"Mean middleware overhead per call over {num_calls} calls")
+    logger.info(
+        row.format(
+            "Method", "sync onion", "sync by method", "async onion", "async by method"
+        )
+    )
+    logger.info("-" * 94)
+    for method, params, _ in REQUESTS:
+        # the responses differ in identity only, check that the stacks agree
+        assert onion(method, params) == by_method(method, params)
+        times = [
+            sync_benchmark(lambda: onion(method, params), num_calls),
+            sync_benchmark(lambda: by_method(method, params), num_calls),
+            loop.run_until_complete(
+                async_benchmark(lambda: async_onion(method, params), num_calls)
+            ),
+            loop.run_until_complete(
+                async_benchmark(lambda: async_by_method(method, params), num_calls)
+            ),
+        ]
+        logger.info(row.format(method, *map(format_time, times)))
+    logger.info("-" * 94)
+    loop.close()
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    logger = logging.getLogger()
+    logger.setLevel(logging.INFO)
+    logger.addHandler(logging.StreamHandler(sys.stdout))
+
+    main(logger, args.num_calls)
@@ -52,6 +52,7 @@ TValue = TypeVar("TValue")
 BlockParams = Literal["latest", "earliest", "pending", "safe", "finalized"]
 BlockIdentifier = Union[BlockParams, BlockNumber, Hash32, HexStr, HexBytes, int]
 LatestBlockParam = Literal["latest"]
+SubscriptionType = Literal["newHeads", "logs", "pendingTransactions"]
 
 FunctionIdentifier = Union[str, Type[FallbackFn], Type[ReceiveFn]]
 
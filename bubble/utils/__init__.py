@@ -11,7 +11,9 @@ from .async_exception_handling import (  # NOQA
     async_handle_offchain_lookup,
 )
 from .caching import (  # NOQA
+    LRUCache,
     SimpleCache,
+    SQLiteCache,
 )
 from .exception_handling import (  # NOQA
     handle_offchain_lookup,
@@ -1,13 +1,24 @@
 from collections import (
     OrderedDict,
 )
+import logging
+import sqlite3
+import sys
+import threading
+import time
 from typing import (
     Any,
+    Callable,
     Dict,
     Optional,
     Tuple,
 )
 
+from bubble._utils.caching import (
+    decode_cache_value,
+    encode_cache_value,
+)
+
 
 class SimpleCache:
     def __init__(self, size: int = 100):
@@ -35,6 +46,9 @@ class SimpleCache:
     def get_cache_entry(self, key: str) -> Optional[Any]:
         return self._data[key] if key in self._data else None
 
+    def pop(self, key: str) -> Optional[Any]:
+        return self._data.pop(key, None)
+
     def clear(self) -> None:
         self._data.clear()
 
@@ -46,3 +60,369 @@ class SimpleCache:
 
     def __len__(self) -> int:
         return len(self._data)
+
+
+def approximate_size(value: Any) -> int:
+    """
+    Approximate the memory held by ``value`` in bytes, following the containers of
+    a decoded JSON-RPC response.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(
+            approximate_size(key) + approximate_size(item)
+            for key, item in value.items()
+        )
+    elif isinstance(value, (list, tuple)):
+        size += sum(approximate_size(item) for item in value)
+    return size
+
+
+class LRUCache:
+    """
+    A thread-safe cache which evicts the least recently used entries once it holds
+    more than ``size`` entries, or entries of more than ``max_bytes`` bytes as
+    measured by ``sizeof``. Entries expire ``ttl`` seconds after being cached, and
+    expired entries are dropped from the least recently used end on every ``cache``.
+
+    It keeps the interface of ``SimpleCache``. The ``hits``, ``misses`` and
+    ``evictions`` counters are updated by ``get_cache_entry`` and ``cache``.
+    """
+
+    def __init__(
+        self,
+        size: Optional[int] = 256,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[Any], int] = approximate_size,
+    ) -> None:
+        if size is None and max_bytes is None and ttl is None:
+            raise ValueError("At least one of size, max_bytes or ttl is required")
+        self._size = size
+        self._ttl = ttl
+        self._max_bytes = max_bytes
+        self._sizeof = sizeof
+        # key -> (value, expires_at, size in bytes)
+        self._data: OrderedDict[str, Tuple[Any, float, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} entries={len(self._data)} "
+            f"hits={self.hits} misses={self.misses} evictions={self.evictions}>"
+        )
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _pop(self, key: str) -> Any:
+        value, _, num_bytes = self._data.pop(key)
+        self.total_bytes -= num_bytes
+        return value
+
+    def _drop_expired(self, now: float) -> None:
+        # the entries are in order of use rather than of expiry, but one which is
+        # expired waits at most ``ttl`` behind a live one, so a cache bounded only
+        # by ``ttl`` stays bounded
+        while self._data:
+            key = next(iter(self._data))
+            if self._data[key][1] > now:
+                break
+            self._pop(key)
+
+    def _is_full(self) -> bool:
+        return (self._size is not None and len(self._data) > self._size) or (
+            self._max_bytes is not None and self.total_bytes > self._max_bytes
+        )
+
+    def cache(self, key: str, value: Any) -> Tuple[Any, Optional[Dict[str, Any]]]:
+        num_bytes = self._sizeof(value) if self._max_bytes is not None else 0
+        if self._max_bytes is not None and num_bytes > self._max_bytes:
+            # never evict everything for the sake of one oversized entry
+            return value, None
+        now = time.monotonic()
+        expires_at = now + self._ttl if self._ttl is not None else float("inf")
+
+        evicted_items = None
+        with self._lock:
+            if self._ttl is not None:
+                self._drop_expired(now)
+            if key in self._data:
+                self._pop(key)
+            self._data[key] = (value, expires_at, num_bytes)
+            self.total_bytes += num_bytes
+            while self._is_full():
+                if evicted_items is None:
+                    evicted_items = {}
+                evicted_key = next(iter(self._data))
+                evicted_items[evicted_key] = self._pop(evicted_key)
+                self.evictions += 1
+        return value, evicted_items
+
+    def get_cache_entry(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            elif entry[1] <= time.monotonic():
+                self._pop(key)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def pop(self, key: str) -> Optional[Any]:
+        with self._lock:
+            return self._pop(key) if key in self._data else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.total_bytes = 0
+
+    def items(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                key: value
+                for key, (value, expires_at, _) in self._data.items()
+                if expires_at > now
+            }
+
+    def __contains__(self, key: str) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry[1] > time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache:
+    """
+    A cache kept in an sqlite3 database file, so that it survives restarts and is
+    shared by the processes which open the same file. It keeps the interface of
+    ``SimpleCache`` and is meant for responses which never change, such as the
+    ones cached by the ``finalized_cache_middleware``.
+
+    Values are stored in a compact binary encoding. Once the values take more than
+    ``max_bytes`` bytes, the least recently used ones are evicted until they take
+    ``compact_ratio`` of it. ``namespace`` separates the entries of, for example,
+    different chains in one file. Values which cannot be encoded are not cached.
+    """
+
+    logger = logging.getLogger("bubble.utils.caching.SQLiteCache")
+
+    # seconds between updates of the last use time of an entry
+    touch_interval = 60.0
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: Optional[int] = 1024 * 1024 * 1024,
+        namespace: str = "",
+        compact_ratio: float = 0.9,
+        timeout: float = 30.0,
+    ) -> None:
+        if not 0 < compact_ratio <= 1:
+            raise ValueError("compact_ratio must be between 0 and 1")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.namespace = namespace
+        self.compact_ratio = compact_ratio
+        self.timeout = timeout
+        self._local = threading.local()
+        # bytes written since the size was last checked against max_bytes
+        self._written = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " used_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS cache_used_at ON cache (used_at)"
+            )
+
+    def __repr__(self) -> str:
+        return (
+            f"<{self.__class__.__name__} path={self.path!r} "
+            f"hits={self.hits} misses={self.misses} evictions={self.evictions}>"
+        )
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections may not be shared by threads, each gets its own
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout)
+            # incremental vacuuming only takes effect on a new database
+            connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            # write-ahead logging lets readers run while another process writes
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def cache(self, key: str, value: Any) -> Tuple[Any, Optional[Dict[str, Any]]]:
+        """
+        Store ``value`` under ``key``. The evicted items are returned with their
+        keys only, mapped to ``None``.
+        """
+        try:
+            data = encode_cache_value(value)
+        except (TypeError, ValueError) as exc:
+            self.logger.debug(f"Not caching the value of {key}: {exc}")
+            return value, None
+        if self.max_bytes is not None and len(data) > self.max_bytes:
+            return value, None
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, data, len(data), time.time()),
+            )
+
+        evicted_items = None
+        if self.max_bytes is not None:
+            # add the stored sizes up after every hundredth of max_bytes written
+            with self._lock:
+                self._written += len(data)
+                should_evict = self._written >= self.max_bytes // 100
+                if should_evict:
+                    self._written = 0
+            if should_evict:
+                evicted_items = self._evict(self.max_bytes)
+        return value, evicted_items
+
+    def get_cache_entry(self, key: str) -> Optional[Any]:
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT value, used_at FROM cache WHERE namespace = ? AND key = ?",
+            (self.namespace, key),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        now = time.time()
+        if now - row[1] > self.touch_interval:
+            # reads stay reads, the last use time is updated once in a while only
+            with connection:
+                connection.execute(
+                    "UPDATE cache SET used_at = ? WHERE namespace = ? AND key = ?",
+                    (now, self.namespace, key),
+                )
+        return decode_cache_value(row[0])
+
+    def pop(self, key: str) -> Optional[Any]:
+        connection = self._connection()
+        with connection:
+            row = connection.execute(
+                "SELECT value FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            )
+        return decode_cache_value(row[0])
+
+    def _evict(self, max_bytes: int) -> Optional[Dict[str, Any]]:
+        connection = self._connection()
+        (total_bytes,) = connection.execute("SELECT SUM(size) FROM cache").fetchone()
+        if not total_bytes or total_bytes <= max_bytes:
+            return None
+        # evict from every namespace, since they share the room of the file
+        excess = total_bytes - int(max_bytes * self.compact_ratio)
+        evicted_items: Dict[str, Any] = {}
+        with connection:
+            rows = connection.execute(
+                "SELECT namespace, key, size FROM cache ORDER BY used_at"
+            )
+            evicted = []
+            for namespace, key, size in rows:
+                if excess <= 0:
+                    break
+                evicted.append((namespace, key))
+                if namespace == self.namespace:
+                    evicted_items[key] = None
+                excess -= size
+            rows.close()
+            connection.executemany(
+                "DELETE FROM cache WHERE namespace = ? AND key = ?", evicted
+            )
+        self.evictions += len(evicted)
+        connection.execute("PRAGMA incremental_vacuum")
+        return evicted_items or None
+
+    def compact(self) -> None:
+        """
+        Evict the least recently used entries beyond ``max_bytes``, and give the
+        space they took back to the file system.
+        """
+        if self.max_bytes is not None:
+            self._evict(self.max_bytes)
+        connection = self._connection()
+        connection.execute("PRAGMA incremental_vacuum")
+        connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def clear(self) -> None:
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "DELETE FROM cache WHERE namespace = ?", (self.namespace,)
+            )
+
+    def items(self) -> Dict[str, Any]:
+        rows = self._connection().execute(
+            "SELECT key, value FROM cache WHERE namespace = ?", (self.namespace,)
+        )
+        return {key: decode_cache_value(value) for key, value in rows}
+
+    def close(self) -> None:
+        """
+        Close the connection of the calling thread.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def __contains__(self, key: str) -> bool:
+        cursor = self._connection().execute(
+            "SELECT 1 FROM cache WHERE namespace = ? AND key = ?",
+            (self.namespace, key),
+        )
+        return cursor.fetchone() is not None
+
+    def __len__(self) -> int:
+        cursor = self._connection().execute(
+            "SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)
+        )
+        return cursor.fetchone()[0]
@@ -0,0 +1,122 @@
+import json
+from typing import (
+    Any,
+    Union,
+)
+
+from eth_utils import (
+    to_text,
+)
+
+from bubble._utils.encoding import (
+    FriendlyJsonSerde,
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+def _friendly_decode(raw: Union[bytes, str]) -> Any:
+    return FriendlyJsonSerde().json_decode(
+        raw if isinstance(raw, str) else to_text(raw)
+    )
+
+
+class JsonCodec:
+    """
+    Encodes JSON-RPC requests to bytes and decodes responses from bytes with the
+    standard library ``json`` module.
+
+    Subclasses plug in faster libraries. Only when the fast path fails is the
+    payload handed to ``FriendlyJsonSerde``, which then either manages or raises a
+    descriptive error.
+    """
+
+    name = "json"
+
+    def encode(self, obj: Any) -> bytes:
+        try:
+            return json.dumps(obj).encode("utf-8")
+        except TypeError:
+            return FriendlyJsonSerde().json_encode(obj).encode("utf-8")
+
+    def decode(self, raw: Union[bytes, str]) -> Any:
+        try:
+            return json.loads(raw)
+        except (ValueError, UnicodeDecodeError):
+            return _friendly_decode(raw)
+
+
+class OrjsonCodec(JsonCodec):
+    """
+    JSON codec backed by `orjson <https://github.com/ijl/orjson>`_.
+
+    Integer literals outside the 64 bit range are decoded as floats. The standard
+    ``bub_`` methods encode quantities as hex strings and are not affected, but APIs
+    returning big integers as bare JSON numbers are.
+    """
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        if orjson is None:
+            raise ImportError("OrjsonCodec requires the orjson package")
+
+    def encode(self, obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            # e.g. integers wider than 64 bits or non-string keys
+            return super().encode(obj)
+
+    def decode(self, raw: Union[bytes, str]) -> Any:
+        try:
+            return orjson.loads(raw)
+        except ValueError:
+            return _friendly_decode(raw)
+
+
+class MsgspecCodec(JsonCodec):
+    """
+    JSON codec backed by `msgspec <https://jcristharif.com/msgspec/>`_.
+    """
+
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        if msgspec is None:
+            raise ImportError("MsgspecCodec requires the msgspec package")
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def encode(self, obj: Any) -> bytes:
+        try:
+            return self._encoder.encode(obj)
+        except (TypeError, msgspec.EncodeError):
+            return super().encode(obj)
+
+    def decode(self, raw: Union[bytes, str]) -> Any:
+        try:
+            return self._decoder.decode(raw)
+        except msgspec.DecodeError:
+            return _friendly_decode(raw)
+
+
+def get_fast_json_codec() -> JsonCodec:
+    """
+    Return the fastest codec installed: orjson, then msgspec, falling back to the
+    standard library.
+    """
+    if orjson is not None:
+        return OrjsonCodec()
+    elif msgspec is not None:
+        return MsgspecCodec()
+    else:
+        return JsonCodec()
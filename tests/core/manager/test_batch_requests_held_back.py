@@ -0,0 +1,337 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from bubble import (
+    AsyncWeb3,
+    Web3,
+)
+from bubble.middleware import (
+    EpochSchedule,
+    async_construct_request_coalescing_middleware,
+    async_construct_request_limiting_middleware,
+    construct_call_cache_middleware,
+    construct_epoch_cache_middleware,
+    construct_finalized_cache_middleware,
+    construct_request_coalescing_middleware,
+    construct_request_limiting_middleware,
+)
+from bubble.middleware.rate_limit import (
+    AsyncRequestLimiter,
+    RequestLimiter,
+)
+from bubble.providers.async_base import (
+    AsyncBaseProvider,
+)
+from bubble.providers.base import (
+    BaseProvider,
+)
+
+
+def _response(method, params):
+    if method == "bub_getBlockByNumber":
+        return {"jsonrpc": "2.0", "id": 0, "result": {"number": "0x1"}}
+    return {"jsonrpc": "2.0", "id": 0, "result": "0x1"}
+
+
+def _block(number):
+    return {
+        "number": hex(number),
+        "hash": f"0x{number:064x}",
+        "parentHash": f"0x{max(number - 1, 0):064x}",
+    }
+
+
+class ChainProvider(BaseProvider):
+    # a chain of 100 blocks
+    def __init__(self):
+        self.batches = []
+        self.requests = []
+
+    def _response(self, method, params):
+        if method == "bub_blockNumber":
+            return {"jsonrpc": "2.0", "id": 0, "result": hex(100)}
+        if method == "bub_call" and params[0].get("data") != "0x":
+            # an inner contract query
+            result = json.dumps({"Code": 0, "Ret": []}).encode()
+            return {"jsonrpc": "2.0", "id": 0, "result": "0x" + result.hex()}
+        if method == "bub_call":
+            return {"jsonrpc": "2.0", "id": 0, "result": "0x01"}
+        number = 100 if params[0] == "latest" else int(params[0], 16)
+        return {"jsonrpc": "2.0", "id": 0, "result": _block(number)}
+
+    def make_request(self, method, params):
+        self.requests.append((method, params))
+        return self._response(method, params)
+
+    def make_batch_request(self, requests):
+        self.batches.append(list(requests))
+        return [self._response(method, params) for method, params in requests]
+
+
+class BatchProvider(BaseProvider):
+    def __init__(self):
+        self.batches = []
+        self.requests = []
+
+    def make_request(self, method, params):
+        self.requests.append(method)
+        return _response(method, params)
+
+    def make_batch_request(self, requests):
+        self.batches.append(list(requests))
+        return [_response(method, params) for method, params in requests]
+
+
+class AsyncBatchProvider(AsyncBaseProvider):
+    def __init__(self):
+        self.batches = []
+        self.requests = []
+
+    async def make_request(self, method, params):
+        self.requests.append(method)
+        return _response(method, params)
+
+    async def make_batch_request(self, requests):
+        self.batches.append(list(requests))
+        return [_response(method, params) for method, params in requests]
+
+
+def _sent(provider):
+    return sum(len(batch) for batch in provider.batches) + len(provider.requests)
+
+
+def _run_in_thread(func):
+    # a hang fails the test instead of blocking the test run
+    results = []
+    thread = threading.Thread(target=lambda: results.append(func()), daemon=True)
+    thread.start()
+    thread.join(10)
+    if thread.is_alive():
+        pytest.fail("the batch did not complete")
+    return results[0]
+
+
+def test_batch_with_duplicate_requests_and_coalescing():
+    provider = BatchProvider()
+    w3 = Web3(provider, middlewares=[construct_request_coalescing_middleware()])
+
+    def execute():
+        with w3.batch_requests() as batch:
+            batch.add(w3.bub.get_block, "latest")
+            batch.add(w3.bub.get_block, "latest")
+            batch.add(w3.bub.get_block, 1)
+            return batch.execute()
+
+    results = _run_in_thread(execute)
+    assert [block["number"] for block in results] == [1, 1, 1]
+    assert _sent(provider) == 3
+
+
+def test_batch_larger_than_request_limit():
+    provider = BatchProvider()
+    limiter = RequestLimiter(initial_limit=2)
+    w3 = Web3(provider, middlewares=[construct_request_limiting_middleware(limiter)])
+
+    def execute():
+        with w3.batch_requests() as batch:
+            for block_number in range(5):
+                batch.add(w3.bub.get_block, block_number)
+            return batch.execute()
+
+    results = _run_in_thread(execute)
+    assert len(results) == 5
+    assert [len(batch) for batch in provider.batches] == [5]
+    assert limiter.in_flight == 0
+
+
+def test_batches_share_the_middlewares_of_single_requests():
+    provider = BatchProvider()
+    constructed = []
+
+    def counting_middleware(make_request, w3):
+        constructed.append(make_request)
+        return make_request
+
+    w3 = Web3(provider, middlewares=[counting_middleware])
+
+    def execute():
+        with w3.batch_requests() as batch:
+            batch.add(w3.bub.get_block, 1)
+            batch.add(w3.bub.get_block, 2)
+            return batch.execute()
+
+    w3.bub.get_block(1)
+    _run_in_thread(execute)
+    _run_in_thread(execute)
+    assert len(constructed) == 1
+    assert [len(batch) for batch in provider.batches] == [2, 2]
+
+
+def test_batch_keeps_the_chain_head_of_the_finalized_cache():
+    provider = ChainProvider()
+    w3 = Web3(
+        provider,
+        middlewares=[construct_finalized_cache_middleware(head_refresh_interval=60)],
+    )
+
+    def execute():
+        with w3.batch_requests() as batch:
+            for block_number in range(1, 6):
+                batch.add(w3.bub.get_block, block_number)
+            return batch.execute()
+
+    first = _run_in_thread(execute)
+    second = _run_in_thread(execute)
+    assert [block["number"] for block in second] == [1, 2, 3, 4, 5]
+    assert first == second
+    # the head is requested once, on its own rather than in the place of a block
+    assert provider.requests == [("bub_getBlockByNumber", ["latest", False])]
+
+
+def test_batch_of_calls_with_call_cache():
+    provider = ChainProvider()
+    w3 = Web3(provider, middlewares=[construct_call_cache_middleware()])
+
+    def execute():
+        with w3.batch_requests() as batch:
+            for index in range(5):
+                batch.add(w3.bub.call, {"to": f"0x{index + 1:040x}", "data": "0x"})
+            return batch.execute()
+
+    results = _run_in_thread(execute)
+    assert results == [b"\x01"] * 5
+    assert [[method for method, _params in batch] for batch in provider.batches] == [
+        ["bub_call"] * 5
+    ]
+    # the latest block is requested once, on its own
+    assert provider.requests == [("bub_getBlockByNumber", ["latest", False])]
+
+
+def test_batch_of_inner_contract_queries_with_epoch_cache():
+    provider = ChainProvider()
+    schedule = EpochSchedule(40, 240, 1)
+    w3 = Web3(
+        provider, middlewares=[construct_epoch_cache_middleware(schedule=schedule)]
+    )
+
+    def execute():
+        with w3.batch_requests() as batch:
+            for _ in range(3):
+                batch.add(w3.dpos.staking.get_verifier_list())
+            return batch.execute()
+
+    # the head is unknown: the queries bypass the cache rather than ask for it
+    _run_in_thread(execute)
+    assert [len(batch) for batch in provider.batches] == [3]
+    assert provider.requests == []
+
+    # once a query on its own learnt the head, the batch is served from the cache
+    w3.dpos.staking.get_verifier_list().call()
+    _run_in_thread(execute)
+    assert [len(batch) for batch in provider.batches] == [3]
+    assert [method for method, _params in provider.requests] == [
+        "bub_blockNumber",
+        "bub_call",
+    ]
+
+
+def test_batch_larger_than_default_request_limit():
+    sending = threading.Event()
+    release = threading.Event()
+
+    class SlowBatchProvider(BatchProvider):
+        def make_batch_request(self, requests):
+            sending.set()
+            release.wait(10)
+            return super().make_batch_request(requests)
+
+    provider = SlowBatchProvider()
+    w3 = Web3(provider, middlewares=[construct_request_limiting_middleware()])
+
+    def execute():
+        with w3.batch_requests() as batch:
+            # more than the initial limit of 16
+            for block_number in range(20):
+                batch.add(w3.bub.get_block, block_number)
+            return batch.execute()
+
+    batch_thread = threading.Thread(target=execute, daemon=True)
+    batch_thread.start()
+    assert sending.wait(10)
+    request_thread = threading.Thread(target=w3.bub.get_block, args=(1,), daemon=True)
+    request_thread.start()
+    # the request following the batch waits for it with the default limiter too
+    request_thread.join(0.2)
+    assert provider.requests == []
+
+    release.set()
+    batch_thread.join(10)
+    request_thread.join(10)
+    assert [len(batch) for batch in provider.batches] == [20]
+    assert provider.requests == ["bub_getBlockByNumber"]
+
+
+def test_batch_with_request_held_back_by_middleware():
+    provider = BatchProvider()
+    released = threading.Event()
+
+    def holding_middleware(make_request, w3):
+        def middleware(method, params):
+            if params[0] == "0x1":
+                # held back until the other request of the batch completes
+                released.wait()
+                return make_request(method, params)
+            response = make_request(method, params)
+            released.set()
+            return response
+
+        return middleware
+
+    w3 = Web3(provider, middlewares=[holding_middleware])
+
+    def execute():
+        with w3.batch_requests() as batch:
+            batch.add(w3.bub.get_block, 1)
+            batch.add(w3.bub.get_block, 2)
+            return batch.execute()
+
+    assert [block["number"] for block in _run_in_thread(execute)] == [1, 1]
+    assert [len(batch) for batch in provider.batches] == [1, 1]
+
+
+def test_async_batch_with_duplicate_requests_and_coalescing():
+    provider = AsyncBatchProvider()
+
+    async def execute():
+        middleware = await async_construct_request_coalescing_middleware()
+        async_w3 = AsyncWeb3(provider, middlewares=[middleware])
+        async with async_w3.batch_requests() as batch:
+            batch.add(async_w3.bub.get_block, "latest")
+            batch.add(async_w3.bub.get_block, "latest")
+            return await batch.execute()
+
+    results = asyncio.run(asyncio.wait_for(execute(), 10))
+    assert [block["number"] for block in results] == [1, 1]
+    assert _sent(provider) == 2
+
+
+def test_async_batch_larger_than_request_limit():
+    provider = AsyncBatchProvider()
+
+    async def execute():
+        limiter = AsyncRequestLimiter(initial_limit=2)
+        middleware = await async_construct_request_limiting_middleware(limiter)
+        async_w3 = AsyncWeb3(provider, middlewares=[middleware])
+        async with async_w3.batch_requests() as batch:
+            for block_number in range(5):
+                batch.add(async_w3.bub.get_block, block_number)
+            results = await batch.execute()
+        assert limiter.in_flight == 0
+        return results
+
+    results = asyncio.run(asyncio.wait_for(execute(), 10))
+    assert len(results) == 5
+    assert [len(batch) for batch in provider.batches] == [5]